@@ -0,0 +1 @@
+"""Benchmark delle parti critiche del motore di gioco (da eseguire dalla cartella solitario)"""
@@ -0,0 +1,105 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Tempo di avvio: importazioni misurate con python -X importtime in processi nuovi.
+#
+#     python -m benchmark.avvio [--ripetizioni N] [--moduli N]
+#
+# Per ogni scenario riporta la mediana del tempo di importazione (al netto dei moduli
+# che l'interprete carica comunque, misurati con "pass"), i moduli più lenti
+# (tempo proprio) e il confronto con il budget; esce con codice 1 se uno scenario supera
+# il budget, se il motore headless importa codice di interfaccia o database, o se
+# l'avvio dell'interfaccia apre il database. I bytecode vengono scritti e riusati come
+# in un'installazione normale, anche se PYTHONDONTWRITEBYTECODE è impostata.
+
+CARTELLA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Scenario:
+    """Codice eseguito in un processo nuovo e budget del suo tempo di importazione"""
+    def __init__(self, nome: str, codice: str, budget_ms: float, vietati: tuple[str, ...] = ()):
+        self.nome = nome
+        self.codice = codice
+        self.budget_ms = budget_ms
+        self.vietati = vietati  # Pacchetti che lo scenario non deve importare
+
+SCENARI = [
+    Scenario('motore', "import models.gioco", 20,
+             vietati=('ui', 'database', 'colorama', 'sqlite3', 'concurrent')),
+    # Fino al menu: l'interfaccia si crea senza aprire il database
+    Scenario('interfaccia',
+             "import main\n"
+             "from ui.cli import InterfacciaSolitario\n"
+             "from database import db\n"
+             "InterfacciaSolitario()\n"
+             "print('database aperto' if db._database_pronti else 'database chiuso')",
+             40),
+]
+
+def _esegui(codice: str) -> tuple[list[tuple[str, int, int]], str]:
+    """Esegue il codice con -X importtime: (modulo, tempo proprio µs, cumulativo µs) e stdout"""
+    ambiente = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', codice], cwd=CARTELLA,
+                              env=ambiente, capture_output=True, text=True, check=True)
+    moduli = []
+    for riga in processo.stderr.splitlines():
+        if not riga.startswith('import time:') or 'self [us]' in riga:
+            continue
+        proprio, cumulativo, nome = riga[len('import time:'):].split('|')
+        moduli.append((nome.rstrip(), int(proprio), int(cumulativo)))
+    return moduli, processo.stdout
+
+def _totale_ms(moduli: list[tuple[str, int, int]]) -> float:
+    """Tempo di importazione complessivo: somma dei moduli importati al primo livello"""
+    return sum(cumulativo for nome, _, cumulativo in moduli if not nome.startswith('  ')) / 1000
+
+def tempo_interprete(ripetizioni: int) -> float:
+    """Importazioni dell'interprete senza codice del gioco (site, encodings...), in ms"""
+    return statistics.median(_totale_ms(_esegui("pass")[0]) for _ in range(ripetizioni))
+
+def misura_scenario(scenario: Scenario, ripetizioni: int, base_ms: float = 0.0) -> dict:
+    """Mediane del tempo totale (meno base_ms) e dei tempi propri dei moduli su più processi"""
+    _esegui(scenario.codice)  # Scrive i bytecode
+    totali, tempi_propri, importati, uscite = [], {}, set(), set()
+    for _ in range(ripetizioni):
+        moduli, uscita = _esegui(scenario.codice)
+        totali.append(_totale_ms(moduli))
+        for nome, proprio, _ in moduli:
+            tempi_propri.setdefault(nome.strip(), []).append(proprio)
+            importati.add(nome.strip())
+        uscite.add(uscita.strip())
+    return {
+        'totale_ms': statistics.median(totali) - base_ms,
+        'moduli': sorted(((nome, statistics.median(tempi) / 1000) for nome, tempi in tempi_propri.items()),
+                         key=lambda voce: voce[1], reverse=True),
+        'vietati': sorted(nome for nome in importati if nome.split('.')[0] in scenario.vietati),
+        'uscita': ', '.join(sorted(uscita for uscita in uscite if uscita)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo di avvio e moduli importati")
+    parser.add_argument('--ripetizioni', type=int, default=7, help="processi misurati per scenario")
+    parser.add_argument('--moduli', type=int, default=10, help="moduli più lenti mostrati per scenario")
+    args = parser.parse_args()
+
+    base_ms = tempo_interprete(args.ripetizioni)
+    print(f"interprete: {base_ms:.1f} ms (escluso dai tempi degli scenari)")
+    errori = 0
+    for scenario in SCENARI:
+        risultato = misura_scenario(scenario, args.ripetizioni, base_ms)
+        entro_budget = risultato['totale_ms'] <= scenario.budget_ms
+        print(f"{scenario.nome}: {risultato['totale_ms']:.1f} ms (budget {scenario.budget_ms} ms)"
+              f"{'' if entro_budget else '  OLTRE IL BUDGET'}")
+        for nome, proprio_ms in risultato['moduli'][:args.moduli]:
+            print(f"    {proprio_ms:>7.2f} ms  {nome}")
+        if risultato['vietati']:
+            print(f"    moduli da non importare: {', '.join(risultato['vietati'])}")
+        if 'database aperto' in risultato['uscita']:
+            print("    il database viene aperto prima del menu")
+        errori += (not entro_budget) + bool(risultato['vietati']) + ('database aperto' in risultato['uscita'])
+    sys.exit(1 if errori else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+from models.gioco import GiocoSolitario
+from models.lotti import LottoStati
+from models.profilazione import aggiungi_opzioni, profilatore
+from models.suggerimenti import mosse_utili, valuta_posizione
+
+# Valutazione a lotti contro quella per partita: posizioni al secondo per mosse legali
+# e punteggio euristico, con un ciclo Python su GiocoSolitario e con LottoStati.
+#
+#     python -m benchmark.lotti [--posizioni N] [--profile]
+
+def posizioni_casuali(quante: int) -> list[GiocoSolitario]:
+    """Posizioni di metà partita ottenute con mosse utili casuali"""
+    rng = random.Random(0)
+    partite = []
+    for seme in range(quante):
+        gioco = GiocoSolitario(limite_undo=0, seed=seme)
+        gioco.verboso = False
+        for _ in range(rng.randint(0, 120)):
+            mosse = mosse_utili(gioco)
+            if not mosse:
+                break
+            gioco.applica_mossa(rng.choice(mosse))
+        partite.append(gioco)
+    return partite
+
+def migliore_tempo(funzione, ripetizioni: int = 3) -> float:
+    """Tempo migliore su alcune ripetizioni (la prima paga anche l'allocazione degli array)"""
+    tempi = []
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione()
+        tempi.append(time.perf_counter() - inizio)
+    return min(tempi)
+
+def main():
+    parser = argparse.ArgumentParser(description="Valutazione di posizioni: ciclo Python contro lotti NumPy")
+    parser.add_argument('--posizioni', type=int, default=2000)
+    aggiungi_opzioni(parser)
+    args = parser.parse_args()
+
+    with profilatore(args, "benchmark-lotti"):
+        partite = posizioni_casuali(args.posizioni)
+
+        def valuta_python():
+            for gioco in partite:
+                gioco.mosse_legali()
+                valuta_posizione(gioco)
+
+        def valuta_lotto():
+            lotto.mosse_legali()
+            lotto.punteggi()
+
+        inizio = time.perf_counter()
+        lotto = LottoStati.da_partite(partite)
+        tempo_impacchettamento = time.perf_counter() - inizio
+        tempo_python = migliore_tempo(valuta_python)
+        tempo_lotto = migliore_tempo(valuta_lotto)
+
+        print(f"Python:          {args.posizioni / tempo_python:>12,.0f} posizioni/s")
+        print(f"Lotto:           {args.posizioni / tempo_lotto:>12,.0f} posizioni/s  (x{tempo_python / tempo_lotto:.0f})")
+        print(f"Impacchettamento:{args.posizioni / tempo_impacchettamento:>12,.0f} posizioni/s")
+
+if __name__ == "__main__":
+    main()
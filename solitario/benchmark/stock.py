@@ -0,0 +1,45 @@
+import argparse
+import time
+from models.carte import PilaStock
+from models.gioco import GiocoSolitario
+from models.profilazione import aggiungi_opzioni, profilatore
+
+# Microbenchmark di stock e scarti: pescate al secondo sul tallone da solo e su una
+# partita completa (senza undo, come nelle simulazioni).
+#
+#     python -m benchmark.stock [--pescate N]
+
+def pescate_tallone(pescate: int) -> float:
+    """Pescate al secondo sul solo tallone, riciclando quando lo stock finisce"""
+    gioco = GiocoSolitario(seed=0)
+    tallone = PilaStock()
+    tallone.carte = list(gioco.stock.carte)
+
+    inizio = time.perf_counter()
+    for _ in range(pescate):
+        if tallone.pesca() is None:
+            tallone.ricicla()
+    return pescate / (time.perf_counter() - inizio)
+
+def pescate_partita(pescate: int) -> float:
+    """Pescate al secondo con GiocoSolitario.pesca_dallo_stock, ricicli e punteggio compresi"""
+    gioco = GiocoSolitario(limite_undo=0, seed=0)
+    gioco.verboso = False
+
+    inizio = time.perf_counter()
+    for _ in range(pescate):
+        gioco.pesca_dallo_stock()
+    return pescate / (time.perf_counter() - inizio)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pescate al secondo dallo stock")
+    parser.add_argument('--pescate', type=int, default=200_000)
+    aggiungi_opzioni(parser)
+    args = parser.parse_args()
+
+    with profilatore(args, "benchmark-stock"):
+        print(f"Tallone:  {pescate_tallone(args.pescate):>12,.0f} pescate/s")
+        print(f"Partita:  {pescate_partita(args.pescate):>12,.0f} pescate/s")
+
+if __name__ == "__main__":
+    main()
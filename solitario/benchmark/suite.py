@@ -0,0 +1,369 @@
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple
+from colorama import Fore, Style
+from models.carte import Carta, Seme, SEMI, VALORI
+from models.gioco import GiocoSolitario
+from models.profilazione import aggiungi_opzioni, profilatore
+from models.regole import VARIANTI
+from models.suggerimenti import mosse_utili
+
+# Suite di benchmark dei percorsi critici: motore di gioco, rendering della CLI e
+# query del database. I risultati si salvano in JSON e si confrontano con una
+# baseline salvata in precedenza, segnalando le regressioni oltre una soglia.
+#
+#     python -m benchmark.suite [--rapido] [--filtro TESTO] [--output FILE]
+#     python -m benchmark.suite --confronta baseline.json [--soglia 0.20]
+
+VERSIONE_RISULTATI = 1
+SOGLIA_PREDEFINITA = 0.20  # Rallentamento relativo oltre il quale un benchmark è una regressione
+
+class Misura(NamedTuple):
+    """Tempo per operazione di un benchmark, in nanosecondi"""
+    mediana: float
+    minimo: float
+    operazioni: int  # Operazioni per ripetizione
+    ripetizioni: int
+
+def misura(operazione: Callable[[], object], operazioni: int, ripetizioni: int = 5,
+           ripristina: Callable[[], object] | None = None) -> Misura:
+    """
+    Esegue l'operazione a blocchi e restituisce il tempo per operazione.
+    Con ripristina (chiamata dopo ogni operazione, fuori dal tempo misurato) ogni
+    operazione è cronometrata da sola
+    """
+    # Riscaldamento: cache, allocatore e branch predictor non pesano sulla prima ripetizione
+    for _ in range(min(operazioni, 100)):
+        operazione()
+        if ripristina is not None:
+            ripristina()
+    tempi = []
+    for _ in range(ripetizioni):
+        if ripristina is None:
+            inizio = time.perf_counter_ns()
+            for _ in range(operazioni):
+                operazione()
+            totale = time.perf_counter_ns() - inizio
+        else:
+            totale = 0
+            for _ in range(operazioni):
+                inizio = time.perf_counter_ns()
+                operazione()
+                totale += time.perf_counter_ns() - inizio
+                ripristina()
+        tempi.append(totale / operazioni)
+    return Misura(statistics.median(tempi), min(tempi), operazioni, ripetizioni)
+
+# --- Posizioni di prova ---
+
+def _partita_vuota(limite_undo: int | None = 1) -> GiocoSolitario:
+    """Tavolo senza carte, da riempire a mano"""
+    gioco = GiocoSolitario(limite_undo=limite_undo, distribuisci=False, seed=0)
+    gioco.verboso = False
+    return gioco
+
+def _carta(seme: Seme, valore: int, visibile: bool = True) -> Carta:
+    """Carta con l'indice del valore (0 = asso)"""
+    carta = Carta(seme, VALORI[valore])
+    carta.visibile = visibile
+    return carta
+
+def _partita_avanzata(seme: int = 0, mosse: int = 60, limite_undo: int | None = 50) -> GiocoSolitario:
+    """Posizione di metà partita raggiunta con mosse utili casuali"""
+    gioco = GiocoSolitario(limite_undo=limite_undo, seed=seme)
+    gioco.verboso = False
+    rng = random.Random(seme)
+    for _ in range(mosse):
+        candidate = mosse_utili(gioco)
+        if not candidate:
+            break
+        gioco.applica_mossa(rng.choice(candidate))
+    return gioco
+
+def _posizione_mossa(tipo: str) -> tuple[GiocoSolitario, tuple[str, str, int]]:
+    """Posizione in cui la mossa del tipo indicato è valida, con la mossa"""
+    gioco = _partita_vuota()
+    tableau = gioco.tableau
+    if tipo == 'scarti_tableau':
+        gioco.stock.carte = [_carta(Seme.CUORI, 1)]
+        gioco.stock.cursore = 1
+        tableau[0].aggiungi_carta(_carta(Seme.PICCHE, 2))
+        mossa = ('scarti', 'tableau1', 1)
+    elif tipo == 'scarti_fondazione':
+        gioco.stock.carte = [_carta(Seme.CUORI, 0)]
+        gioco.stock.cursore = 1
+        mossa = ('scarti', 'fondazione_cuori', 1)
+    elif tipo == 'tableau_fondazione':
+        tableau[0].aggiungi_carta(_carta(Seme.QUADRI, 4, visibile=False))
+        tableau[0].aggiungi_carta(_carta(Seme.PICCHE, 0))
+        mossa = ('tableau1', 'fondazione_cuori', 1)
+    elif tipo == 'tableau_tableau':
+        tableau[0].aggiungi_carta(_carta(Seme.QUADRI, 4, visibile=False))
+        tableau[0].aggiungi_carta(_carta(Seme.CUORI, 1))
+        tableau[1].aggiungi_carta(_carta(Seme.PICCHE, 2))
+        mossa = ('tableau1', 'tableau2', 1)
+    elif tipo == 'sequenza_12':
+        # Dal re al due a colori alterni sopra tre carte coperte
+        for valore in (12, 11, 10):
+            tableau[0].aggiungi_carta(_carta(Seme.FIORI, valore, visibile=False))
+        for i in range(12):
+            tableau[0].aggiungi_carta(_carta(Seme.CUORI if i % 2 == 0 else Seme.PICCHE, 12 - i))
+        mossa = ('tableau1', 'tableau2', 12)
+    elif tipo == 'fondazione_tableau':
+        for valore in (0, 1):
+            gioco.fondazioni[Seme.CUORI].aggiungi_carta(_carta(Seme.CUORI, valore))
+        tableau[0].aggiungi_carta(_carta(Seme.PICCHE, 2))
+        mossa = ('fondazione_cuori', 'tableau1', 1)
+    else:
+        raise ValueError(f"Tipo di mossa sconosciuto: {tipo}")
+    gioco.ricalcola_contatori()
+    return gioco, mossa
+
+TIPI_MOSSA = ['scarti_tableau', 'scarti_fondazione', 'tableau_fondazione',
+              'tableau_tableau', 'sequenza_12', 'fondazione_tableau']
+
+def _posizione_finale() -> GiocoSolitario:
+    """Tutte le carte scoperte nel tableau in ordine decrescente: l'autocompletamento vince"""
+    gioco = _partita_vuota(limite_undo=0)
+    carte = sorted((_carta(seme, valore) for seme in SEMI for valore in range(13)),
+                   key=lambda carta: -(carta.codice % 13))
+    for i, carta in enumerate(carte):
+        gioco.tableau[i % 7].carte.append(carta)
+    gioco.ricalcola_contatori()
+    return gioco
+
+# --- Benchmark ---
+
+def bench_puo_stare_sopra(scala: float) -> dict[str, Misura]:
+    carte = [_carta(seme, valore) for seme in SEMI for valore in range(13)]
+    rng = random.Random(0)
+    coppie = [(rng.choice(carte), rng.choice(carte)) for _ in range(1000)]
+
+    def operazione():
+        for carta, altra in coppie:
+            carta.puo_stare_sopra(altra)
+
+    risultato = misura(operazione, max(1, int(20 * scala)))
+    # Tempo per singolo confronto
+    return {'carta.puo_stare_sopra': Misura(*(valore / len(coppie) for valore in risultato[:2]),
+                                            risultato.operazioni * len(coppie), risultato.ripetizioni)}
+
+def bench_muovi_carta(scala: float) -> dict[str, Misura]:
+    risultati = {}
+    for tipo in TIPI_MOSSA:
+        gioco, (sorgente, destinazione, conteggio) = _posizione_mossa(tipo)
+        if not gioco.muovi_carta(sorgente, destinazione, conteggio):
+            raise RuntimeError(f"Mossa di prova non valida: {tipo}")
+        gioco.annulla()
+        risultati[f'muovi_carta.{tipo}'] = misura(
+            lambda: gioco.muovi_carta(sorgente, destinazione, conteggio),
+            max(1, int(2000 * scala)), ripristina=gioco.annulla)
+    return risultati
+
+def bench_pesca(scala: float) -> dict[str, Misura]:
+    risultati = {}
+    for nome in ('standard', 'pesca3'):
+        gioco = GiocoSolitario(limite_undo=0, seed=0, regole=VARIANTI[nome])
+        gioco.verboso = False
+        # Operazioni abbastanza lunghe da comprendere più ricicli del tallone
+        risultati[f'pesca_dallo_stock.{nome}'] = misura(gioco.pesca_dallo_stock, max(50, int(20000 * scala)))
+    return risultati
+
+def bench_stato(scala: float) -> dict[str, Misura]:
+    gioco = _partita_avanzata()
+    operazioni = max(1, int(5000 * scala))
+    risultati = {'stato.salva': misura(gioco._salva_stato, operazioni, ripristina=gioco.stati_undo.pop),
+                 'stato.chiave_posizione': misura(gioco.chiave_posizione, operazioni),
+                 'stato.chiave_canonica': misura(gioco.chiave_canonica, operazioni)}
+    gioco.pesca_dallo_stock()
+    risultati['stato.annulla'] = misura(gioco.annulla, operazioni, ripristina=gioco.ripeti)
+    return risultati
+
+def bench_autocompletamento(scala: float) -> dict[str, Misura]:
+    finale = _posizione_finale()
+    partite = [finale.copia()]
+
+    def ripristina():
+        partite[0] = finale.copia()
+
+    def operazione():
+        if not partite[0].autocompletamento():
+            raise RuntimeError("Autocompletamento di prova non riuscito")
+
+    return {'autocompletamento': misura(operazione, max(1, int(500 * scala)), ripristina=ripristina)}
+
+def bench_mostra_gioco(scala: float) -> dict[str, Misura]:
+    from ui.cli import InterfacciaSolitario
+
+    interfaccia = InterfacciaSolitario()
+    interfaccia.pulisci_schermo = lambda: None  # Niente comando di sistema per pulire lo schermo
+    interfaccia.gioco = _partita_avanzata()
+    with open(os.devnull, 'w', encoding='utf-8') as nullo, contextlib.redirect_stdout(nullo):
+        return {'mostra_gioco': misura(interfaccia.mostra_gioco, max(1, int(2000 * scala)))}
+
+def bench_bot(scala: float) -> dict[str, Misura]:
+    from models.bot import gioca
+    from models.politiche import PoliticaCasuale, PoliticaScopriPrima
+
+    partite = max(1, int(20 * scala))
+    risultati = {}
+    for politica in (PoliticaCasuale(), PoliticaScopriPrima()):
+        # Ogni ripetizione gioca gli stessi seed: tempo per partita intera
+        semi = itertools.cycle(range(partite))
+        risultati[f'bot.{politica.nome}'] = misura(lambda: gioca(politica, next(semi)), partite)
+    return risultati
+
+def _popola_database(percorso: str, utenti: int, sessioni: int):
+    """Crea un database con molti utenti, sessioni e replay"""
+    rng = random.Random(0)
+    with sqlite3.connect(percorso) as conn:
+        cursor = conn.cursor()
+        cursor.executemany("INSERT INTO utenti (username, password_hash) VALUES (?, ?)",
+                           [(f"utente{i}", 'x') for i in range(utenti)])
+        righe = []
+        for i in range(sessioni):
+            durata = rng.randint(60, 3600)
+            righe.append((rng.randint(1, utenti), f"2024-01-01 00:{i % 60:02d}:00", f"2024-01-01 01:{i % 60:02d}:00",
+                          rng.randint(0, 1500), durata, rng.random() < 0.3))
+        cursor.executemany("""
+            INSERT INTO sessioni_gioco (user_id, start_time, end_time, score, duration, won)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, righe)
+        cursor.executemany("INSERT INTO replay_partite (sessione_id, seed, mosse) VALUES (?, ?, ?)",
+                           [(i, rng.randrange(2 ** 32), bytes(rng.randrange(256) for _ in range(200)))
+                            for i in range(1, sessioni + 1)])
+        cursor.executemany("INSERT INTO punteggi_migliori (user_id, score, duration) VALUES (?, ?, ?)",
+                           [(i, rng.randint(500, 1500), rng.randint(60, 3600)) for i in range(1, utenti + 1)])
+        conn.commit()
+
+def bench_database(scala: float) -> dict[str, Misura]:
+    from database import db
+    from models import statistiche, utenti
+
+    utenti_db = max(10, int(2000 * scala))
+    sessioni_db = max(100, int(100_000 * scala))
+    originale = db.NOME_DB
+    with tempfile.TemporaryDirectory() as cartella:
+        # Il database di prova sostituisce quello del gioco per la durata del benchmark
+        db.NOME_DB = os.path.join(cartella, "benchmark.db")
+        try:
+            db.inizializza_db()
+            _popola_database(db.NOME_DB, utenti_db, sessioni_db)
+            gestore = utenti.GestoreUtenti()
+            gestore.registra("giocatore", "password")
+            rapporti = statistiche.GestoreStatistiche()
+            operazioni = max(1, int(50 * scala))
+            return {
+                'utenti.login': misura(lambda: gestore.login("giocatore", "password"), operazioni),
+                'utenti.punteggi_migliori': misura(gestore.get_punteggi_migliori, operazioni),
+                'utenti.sessioni_tutte': misura(gestore.get_sessioni_gioco, operazioni),
+                'utenti.sessioni_utente': misura(lambda: gestore.get_sessioni_gioco(utenti_db // 2), operazioni),
+                'utenti.replay_utente': misura(lambda: gestore.get_replay(user_id=utenti_db // 2, limite=10), operazioni),
+                'statistiche.rapporto': misura(lambda: (rapporti.totali(), rapporti.utente(utenti_db // 2),
+                                                        rapporti.giornalieri(), rapporti.settimanali()), operazioni),
+            }
+        finally:
+            db.NOME_DB = originale
+
+BENCHMARK = [bench_puo_stare_sopra, bench_muovi_carta, bench_pesca, bench_stato,
+             bench_autocompletamento, bench_mostra_gioco, bench_bot, bench_database]
+
+def esegui(scala: float = 1.0, filtro: str | None = None) -> dict[str, Misura]:
+    """Esegue i benchmark (quelli con il filtro nel nome della funzione) e restituisce le misure"""
+    risultati = {}
+    for benchmark in BENCHMARK:
+        if filtro and filtro not in benchmark.__name__:
+            continue
+        risultati.update(benchmark(scala))
+    return risultati
+
+def salva(risultati: dict[str, Misura], percorso: str, scala: float = 1.0):
+    """Salva le misure in JSON con le informazioni sull'ambiente"""
+    dati = {
+        'versione': VERSIONE_RISULTATI,
+        'scala': scala,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'piattaforma': platform.platform(),
+        'risultati': {nome: misura._asdict() for nome, misura in risultati.items()},
+    }
+    with open(percorso, 'w', encoding='utf-8') as file:
+        json.dump(dati, file, indent=2)
+
+def carica(percorso: str) -> tuple[dict[str, Misura], float]:
+    """Legge le misure salvate con salva() e la scala con cui sono state ottenute"""
+    with open(percorso, encoding='utf-8') as file:
+        dati = json.load(file)
+    if dati.get('versione') != VERSIONE_RISULTATI:
+        raise ValueError(f"Versione dei risultati non supportata: {dati.get('versione')}")
+    return {nome: Misura(**misura) for nome, misura in dati['risultati'].items()}, dati['scala']
+
+def confronta(attuali: dict[str, Misura], baseline: dict[str, Misura],
+              soglia: float = SOGLIA_PREDEFINITA) -> list[tuple[str, float, float, bool]]:
+    """
+    Confronta i tempi minimi (meno sensibili al rumore della macchina delle mediane) con la
+    baseline: (nome, baseline, attuale, regressione) per ogni benchmark presente in entrambe
+    """
+    confronti = []
+    for nome, misura_attuale in attuali.items():
+        if nome in baseline:
+            precedente = baseline[nome].minimo
+            confronti.append((nome, precedente, misura_attuale.minimo,
+                              misura_attuale.minimo > precedente * (1 + soglia)))
+    return confronti
+
+def _formatta_tempo(nanosecondi: float) -> str:
+    """Tempo con l'unità più leggibile"""
+    for unita, fattore in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+        if nanosecondi >= fattore:
+            return f"{nanosecondi / fattore:.2f} {unita}"
+    return f"{nanosecondi:.0f} ns"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dei percorsi critici del gioco")
+    parser.add_argument('--output', help="salva i risultati in questo file JSON")
+    parser.add_argument('--confronta', metavar='BASELINE', help="confronta con una baseline JSON salvata")
+    parser.add_argument('--soglia', type=float, default=SOGLIA_PREDEFINITA,
+                        help="rallentamento relativo considerato regressione (predefinita 0.20)")
+    parser.add_argument('--filtro', help="esegue solo i benchmark con questo testo nel nome (es. muovi)")
+    parser.add_argument('--rapido', action='store_true', help="meno operazioni e database più piccolo")
+    aggiungi_opzioni(parser)
+    args = parser.parse_args()
+
+    scala = 0.1 if args.rapido else 1.0
+    with profilatore(args, "benchmark-suite"):
+        risultati = esegui(scala, args.filtro)
+    if args.output:
+        salva(risultati, args.output, scala)
+
+    if not args.confronta:
+        for nome, risultato in risultati.items():
+            print(f"{nome:<36}{_formatta_tempo(risultato.mediana):>12}  (min {_formatta_tempo(risultato.minimo)})")
+        return
+
+    baseline, scala_baseline = carica(args.confronta)
+    if scala_baseline != scala:
+        # Con un database di dimensioni diverse i tempi delle query non sono confrontabili
+        print(f"{Fore.RED}Attenzione: baseline ottenuta con scala {scala_baseline}, questa esecuzione usa {scala}{Style.RESET_ALL}")
+    regressioni = 0
+    for nome, precedente, attuale, regressione in confronta(risultati, baseline, args.soglia):
+        variazione = (attuale - precedente) / precedente
+        stato = f"{Fore.RED}REGRESSIONE{Style.RESET_ALL}" if regressione else ""
+        regressioni += regressione
+        print(f"{nome:<36}{_formatta_tempo(precedente):>12}{_formatta_tempo(attuale):>12}{variazione:>+9.1%}  {stato}")
+    print(f"\nRegressioni oltre il {args.soglia:.0%}: {regressioni}")
+    sys.exit(1 if regressioni else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,255 @@
-import os
-import sqlite3
-
-# Percorso della cartella 'data' nella root del progetto
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
-
-NOME_DB = os.path.join(DATA_DIR, "solitario.db")
-
-def inizializza_db():
-    with sqlite3.connect(NOME_DB) as conn:
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS utenti (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        # Tabella sessioni di gioco
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sessioni_gioco (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            start_time TIMESTAMP NOT NULL,
-            end_time TIMESTAMP,
-            score INTEGER DEFAULT 0,
-            duration INTEGER DEFAULT 0,
-            won BOOLEAN DEFAULT FALSE,
-            FOREIGN KEY (user_id) REFERENCES utenti(id)
-        )
-        """)
-        
-        # Tabella punteggi migliori
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS punteggi_migliori (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            score INTEGER NOT NULL,
-            duration INTEGER NOT NULL,
-            achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES utenti(id)
-        )
-        """)
-
-        conn.commit()
-
-def controllo_punteggio(user_id):
-    with sqlite3.connect(NOME_DB) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT score FROM punteggi_migliori WHERE user_id = ?
-        """, (user_id,))
-        risultati = cursor.fetchall()
-        if risultati:
-            score = risultati[0][0]
-        else:
-            score = 0        
-        
+import os
+import sqlite3
+import threading
+
+# Percorso della cartella 'data' nella root del progetto
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+NOME_DB = os.path.join(DATA_DIR, "solitario.db")
+
+# Database il cui schema è già stato verificato da questo processo
+_database_pronti: set[str] = set()
+_lock_inizializzazione = threading.Lock()
+
+# Tabelle dei riepiloghi: (tabella, colonna chiave, tipo, espressione della chiave sulla sessione {s})
+_RIEPILOGHI = (
+    ("riepiloghi_giornalieri", "giorno", "TEXT", "date({s}.start_time)"),
+    ("riepiloghi_settimanali", "settimana", "TEXT", "strftime('%Y-%W', {s}.start_time)"),
+    ("riepiloghi_utenti", "user_id", "INTEGER", "{s}.user_id"),
+)
+
+def connetti() -> sqlite3.Connection:
+    """
+    Connessione al database. Il primo accesso del processo crea la cartella data/ e
+    verifica lo schema: l'avvio del gioco non tocca il disco finché un'azione non lo richiede
+    """
+    if NOME_DB not in _database_pronti:
+        with _lock_inizializzazione:
+            if NOME_DB not in _database_pronti:
+                inizializza_db()
+    return sqlite3.connect(NOME_DB)
+
+def _aggiungi_colonna(cursor, tabella: str, colonna: str, definizione: str):
+    """Aggiunge una colonna a una tabella esistente, se manca"""
+    cursor.execute(f"PRAGMA table_info({tabella})")
+    if colonna not in (riga[1] for riga in cursor.fetchall()):
+        cursor.execute(f"ALTER TABLE {tabella} ADD COLUMN {colonna} {definizione}")
+
+def inizializza_db():
+    os.makedirs(os.path.dirname(NOME_DB), exist_ok=True)
+    with sqlite3.connect(NOME_DB) as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS utenti (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        
+        # Tabella sessioni di gioco
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessioni_gioco (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            score INTEGER DEFAULT 0,
+            duration INTEGER DEFAULT 0,
+            won BOOLEAN DEFAULT FALSE,
+            regole TEXT NOT NULL DEFAULT 'standard',
+            FOREIGN KEY (user_id) REFERENCES utenti(id)
+        )
+        """)
+        # Database creati prima delle varianti di regole
+        _aggiungi_colonna(cursor, "sessioni_gioco", "regole", "TEXT NOT NULL DEFAULT 'standard'")
+        
+        # Tabella punteggi migliori
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS punteggi_migliori (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            achieved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES utenti(id)
+        )
+        """)
+
+        # Tabella partite salvate (una per utente, formato binario di models/codifica.py)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS partite_salvate (
+            user_id INTEGER PRIMARY KEY,
+            dati BLOB NOT NULL,
+            saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES utenti(id)
+        )
+        """)
+
+        # Tabella replay: seed e mosse codificate (models/mosse.py) di ogni sessione
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS replay_partite (
+            sessione_id INTEGER PRIMARY KEY,
+            seed INTEGER NOT NULL,
+            mosse BLOB NOT NULL,
+            FOREIGN KEY (sessione_id) REFERENCES sessioni_gioco(id)
+        )
+        """)
+
+        # Riserva di distribuzioni vincibili (models/riserva.py): seed, difficoltà e soluzione
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS distribuzioni_vincibili (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            seed INTEGER NOT NULL,
+            regole TEXT NOT NULL DEFAULT 'standard',
+            difficolta REAL NOT NULL,
+            soluzione BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (regole, seed)
+        )
+        """)
+
+        # Tornei e sfide del giorno (models/tornei.py): una distribuzione condivisa per torneo
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tornei (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            seed INTEGER NOT NULL,
+            regole TEXT NOT NULL DEFAULT 'standard',
+            giorno TEXT UNIQUE,
+            inizio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fine TIMESTAMP
+        )
+        """)
+
+        # Ogni risultato inviato, con le mosse per la verifica headless
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS partecipazioni_tornei (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            torneo_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            won BOOLEAN NOT NULL,
+            mosse BLOB NOT NULL,
+            submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (torneo_id) REFERENCES tornei(id),
+            FOREIGN KEY (user_id) REFERENCES utenti(id)
+        )
+        """)
+
+        # Classifica aggiornata a ogni invio: il miglior risultato di ogni giocatore per torneo
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS classifiche_tornei (
+            torneo_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            won BOOLEAN NOT NULL,
+            partecipazione_id INTEGER NOT NULL,
+            PRIMARY KEY (torneo_id, user_id),
+            FOREIGN KEY (torneo_id) REFERENCES tornei(id),
+            FOREIGN KEY (user_id) REFERENCES utenti(id),
+            FOREIGN KEY (partecipazione_id) REFERENCES partecipazioni_tornei(id)
+        )
+        """)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_classifiche_tornei_ordine
+        ON classifiche_tornei (torneo_id, score DESC, duration ASC, partecipazione_id ASC)
+        """)
+
+        # Difficoltà delle distribuzioni (models/difficolta.py): metriche, punteggio e fascia per seed
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS difficolta_distribuzioni (
+            regole TEXT NOT NULL DEFAULT 'standard',
+            seed INTEGER NOT NULL,
+            punteggio REAL NOT NULL,
+            fascia TEXT NOT NULL,
+            nodi INTEGER NOT NULL,
+            profondita_coperte INTEGER NOT NULL,
+            ricicli INTEGER NOT NULL,
+            perse REAL NOT NULL,
+            soluzione BLOB NOT NULL,
+            scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (regole, seed)
+        )
+        """)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_difficolta_distribuzioni_fascia
+        ON difficolta_distribuzioni (regole, fascia, seed)
+        """)
+        # Partite già giocate con un seed: esclusione delle distribuzioni note senza scansioni
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_replay_partite_seed ON replay_partite (seed)")
+
+        # Sessioni per data: compattazione e ultime sessioni senza scorrere la tabella
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessioni_gioco_inizio ON sessioni_gioco (start_time)")
+
+        # Riepiloghi delle sessioni (models/statistiche.py), aggiornati dal trigger a ogni nuova sessione
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'riepiloghi_utenti'")
+        riepiloghi_nuovi = cursor.fetchone() is None
+        for tabella, colonna, tipo, _ in _RIEPILOGHI:
+            cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {tabella} (
+                {colonna} {tipo} NOT NULL PRIMARY KEY,
+                games INTEGER NOT NULL DEFAULT 0,
+                wins INTEGER NOT NULL DEFAULT 0,
+                total_score INTEGER NOT NULL DEFAULT 0,
+                total_duration INTEGER NOT NULL DEFAULT 0,
+                last_played TIMESTAMP
+            )
+            """)
+        if riepiloghi_nuovi:
+            # Database creati prima dei riepiloghi: si parte dalle sessioni già salvate
+            ricostruisci_riepiloghi(cursor)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS aggiorna_riepiloghi AFTER INSERT ON sessioni_gioco
+        BEGIN
+            {''.join(_aggiornamento_riepilogo(*riepilogo) for riepilogo in _RIEPILOGHI)}
+        END
+        """)
+
+        conn.commit()
+    _database_pronti.add(NOME_DB)
+
+def _aggiornamento_riepilogo(tabella: str, colonna: str, tipo: str, espressione: str) -> str:
+    """Upsert che aggiunge la nuova sessione (NEW) al riepilogo della sua chiave"""
+    return f"""
+            INSERT INTO {tabella} ({colonna}, games, wins, total_score, total_duration, last_played)
+            VALUES ({espressione.format(s='NEW')}, 1, coalesce(NEW.won, 0), coalesce(NEW.score, 0),
+                    coalesce(NEW.duration, 0), NEW.start_time)
+            ON CONFLICT ({colonna}) DO UPDATE SET
+                games = games + 1,
+                wins = wins + excluded.wins,
+                total_score = total_score + excluded.total_score,
+                total_duration = total_duration + excluded.total_duration,
+                last_played = max(coalesce(last_played, ''), excluded.last_played);"""
+
+def ricostruisci_riepiloghi(cursor):
+    """Ricalcola tutti i riepiloghi dalle sessioni presenti (le sessioni archiviate non vengono contate)"""
+    for tabella, colonna, _, espressione in _RIEPILOGHI:
+        chiave = espressione.format(s='s')
+        cursor.execute(f"DELETE FROM {tabella}")
+        cursor.execute(f"""
+        INSERT INTO {tabella} ({colonna}, games, wins, total_score, total_duration, last_played)
+        SELECT {chiave}, count(*), sum(coalesce(s.won, 0)), sum(coalesce(s.score, 0)),
+               sum(coalesce(s.duration, 0)), max(s.start_time)
+        FROM sessioni_gioco s
+        GROUP BY {chiave}
+        """)
+
+def controllo_punteggio(user_id):
+    with connetti() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT score FROM punteggi_migliori WHERE user_id = ?
+        """, (user_id,))
+        risultati = cursor.fetchall()
+        if risultati:
+            score = risultati[0][0]
+        else:
+            score = 0        
+        
         return score
\ No newline at end of file
@@ -1,15 +1,124 @@
-from database.db import inizializza_db
-from ui.cli import InterfacciaSolitario
-
-def main():
-    try:
-        inizializza_db()    
-        ui = InterfacciaSolitario()
-        ui.esegui()
-    except KeyboardInterrupt:
-        print("\nGioco terminato dall'utente.")
-    except Exception as e:
-        print(f"\nSi è verificato un errore: {e}")
-
-if __name__ == "__main__":
+import argparse
+from models import gioco, metriche
+from models.profilazione import CampionatoreProfili, aggiungi_opzioni, campionatore, profilatore
+
+def verifica_replay_salvati(processi: int | None = None, profili: CampionatoreProfili | None = None):
+    """
+    Riproduce tutti i replay salvati e segnala quelli con esito o punteggio non coerenti.
+    Con un campionatore di profili i replay vengono verificati in questo processo, così
+    cProfile vede le partite campionate invece dell'attesa sul pool
+    """
+    from models.replay import verifica_replay, verifica_tutti
+    from models.utenti import GestoreUtenti
+
+    replay = GestoreUtenti().get_replay()
+    if profili is None:
+        esiti = verifica_tutti(replay, processi)
+    else:
+        esiti = []
+        for indice, singolo in enumerate(replay):
+            with profili.partita(indice):
+                esiti.append(verifica_replay(singolo))
+        print(f"Replay profilati: {profili.profilate} (rapporti in {profili.cartella})")
+    non_validi = [esito for esito in esiti if not esito.valido]
+
+    print(f"Replay verificati: {len(esiti)}, non validi: {len(non_validi)}")
+    for esito in non_validi:
+        print(f"  sessione {esito.sessione_id}: punteggio ricalcolato {esito.punteggio}, vinto {esito.vinto}")
+
+def compatta_sessioni(giorni: int, archivio: str | None = None):
+    """Archivia le sessioni più vecchie di `giorni` giorni; le statistiche restano invariate"""
+    from models.statistiche import GestoreStatistiche, ARCHIVIO_PREDEFINITO
+
+    archivio = archivio or ARCHIVIO_PREDEFINITO
+    spostate = GestoreStatistiche().compatta(giorni, archivio)
+    print(f"Sessioni archiviate: {spostate} (in {archivio})")
+
+def valuta_distribuzioni(quanti: int, processi: int | None = None):
+    """Valuta la difficoltà di `quanti` seed casuali nuovi a blocchi su un pool di processi"""
+    from models.difficolta import GestoreDifficolta
+
+    gestore = GestoreDifficolta(processi=processi)
+    valutati = gestore.valuta_casuali(quanti)
+    conteggi = ", ".join(f"{fascia} {numero}" for fascia, numero in sorted(gestore.conteggi().items()))
+    print(f"Distribuzioni valutate: {valutati} (totale per fascia: {conteggi})")
+
+def confronta_bot(partite: int, politiche: list[str] | None = None, regole: str | None = None,
+                  processi: int | None = 1, args=None):
+    """Gioca `partite` partite con ogni politica sugli stessi seed e stampa il confronto"""
+    from models.bot import esegui_bot
+    from models.politiche import POLITICHE
+    from models.regole import Regole
+
+    sconosciute = [nome for nome in politiche or () if nome not in POLITICHE]
+    if sconosciute:
+        print(f"Politiche sconosciute: {', '.join(sconosciute)} (disponibili: {', '.join(POLITICHE)})")
+        return
+    regole = Regole.da_testo(regole)
+    print(f"Bot: {partite} partite per politica, regole {regole.testo()}")
+    print(f"{'Politica':<12} {'Vittorie':>9} {'Punteggio':>10} {'Mosse':>7} {'Partite/s':>10}")
+    for nome in politiche or POLITICHE:
+        profili = campionatore(args, f"bot-{nome}") if args is not None else None
+        rapporto = esegui_bot(nome, partite, regole, processi=processi, profili=profili)
+        print(f"{rapporto.politica:<12} {rapporto.percentuale_vittorie:>8.1f}% {rapporto.punteggio_medio:>10.1f} "
+              f"{rapporto.mosse_medie:>7.1f} {rapporto.partite_al_secondo:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Solitario Python")
+    parser.add_argument('--verifica-replay', action='store_true',
+                        help="verifica tutti i replay salvati ed esce")
+    parser.add_argument('--processi', type=int, default=None,
+                        help="numero di processi per le elaborazioni in parallelo")
+    parser.add_argument('--debug', action='store_true',
+                        help="confronta i contatori incrementali della partita con un ricalcolo completo")
+    parser.add_argument('--metriche', action='store_true',
+                        help="registra le latenze delle operazioni (comando 'stats' durante la partita)")
+    parser.add_argument('--valuta-distribuzioni', type=int, default=None, metavar='N',
+                        help="valuta la difficoltà di N distribuzioni casuali ed esce")
+    parser.add_argument('--compatta', type=int, default=None, metavar='GIORNI',
+                        help="sposta nell'archivio le sessioni più vecchie di GIORNI giorni ed esce")
+    parser.add_argument('--archivio', default=None,
+                        help="database di archivio per --compatta (predefinito data/archivio.db)")
+    parser.add_argument('--bot', type=int, default=None, metavar='N',
+                        help="gioca N partite con ogni politica dei bot, ne confronta i risultati ed esce")
+    parser.add_argument('--politiche', default=None,
+                        help="politiche per --bot separate da virgole (casuale, fondazioni, scopri, euristica, lookahead)")
+    parser.add_argument('--regole', default=None,
+                        help="variante di regole per --bot (predefinita standard)")
+    aggiungi_opzioni(parser)
+    args = parser.parse_args()
+    if args.debug:
+        gioco.CONTROLLO_CONTATORI = True
+    if args.metriche:
+        metriche.ATTIVE = True
+
+    try:
+        if args.verifica_replay:
+            verifica_replay_salvati(args.processi, campionatore(args, "verifica-replay"))
+            return
+        if args.valuta_distribuzioni is not None:
+            valuta_distribuzioni(args.valuta_distribuzioni, args.processi)
+            return
+        if args.bot is not None:
+            politiche = args.politiche.split(',') if args.politiche else None
+            confronta_bot(args.bot, politiche, args.regole, args.processi or 1, args)
+            return
+        if args.compatta is not None:
+            compatta_sessioni(args.compatta, args.archivio)
+            return
+        with profilatore(args, "sessione") as profilo:
+            from ui.cli import InterfacciaSolitario
+            ui = InterfacciaSolitario()
+            try:
+                ui.esegui()
+            finally:
+                ui.chiudi()
+        if args.profile:
+            print(f"Profilo della sessione salvato in: {', '.join(profilo.file)}")
+    except KeyboardInterrupt:
+        print("\nGioco terminato dall'utente.")
+    except Exception as e:
+        print(f"\nSi è verificato un errore: {e}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,115 @@
+import os
+import random
+import time
+from typing import NamedTuple
+from models.gioco import GiocoSolitario
+from models.mosse import PESCA
+from models.politiche import Politica, POLITICHE, mosse_candidate
+from models.probabilita import MAX_MOSSE
+from models.regole import Regole, REGOLE_STANDARD
+from models.stallo import ControlloStallo
+
+# Bot che giocano partite intere senza interfaccia, guidati da una politica.
+#
+# L'esecutore genera le mosse candidate (legali, utili e mai dalle fondazioni al
+# tableau) e una politica di models/politiche.py, le stesse delle simulazioni di
+# models/probabilita.py, ne sceglie una. La partita finisce con la vittoria, quando
+# non ci sono più mosse, quando models.stallo.ControlloStallo la riconosce persa o
+# dopo MAX_MOSSE mosse. Tutte le politiche giocano gli stessi seed, così i rapporti
+# si possono confrontare tra loro e tra varianti di regole. Il punteggio è quello di
+# calcola_punteggio_finale con durata zero: i bonus di tempo non dipendono dalla
+# velocità della macchina.
+
+SEMI_PER_BLOCCO = 50  # Partite per attività inviata al pool
+
+class EsitoBot(NamedTuple):
+    """Risultato di una partita giocata da un bot"""
+    seed: int
+    vinta: bool
+    punteggio: int  # calcola_punteggio_finale con durata zero
+    mosse: int
+
+class RapportoBot(NamedTuple):
+    """Risultati di una politica su più partite"""
+    politica: str
+    partite: int
+    vittorie: int
+    punteggio_medio: float
+    mosse_medie: float
+    partite_al_secondo: float  # Per processo: partite diviso il tempo passato a giocarle
+
+    @property
+    def percentuale_vittorie(self) -> float:
+        return 100 * self.vittorie / self.partite if self.partite else 0.0
+
+def gioca(politica: Politica, seed: int, regole: Regole | None = None,
+          max_mosse: int = MAX_MOSSE) -> EsitoBot:
+    """Gioca una partita con la politica indicata, dalla distribuzione del seed"""
+    gioco = GiocoSolitario(limite_undo=0, seed=seed, regole=regole)
+    gioco.verboso = False
+    rng = random.Random(seed)
+    controllo = ControlloStallo(gioco)
+    mossa = candidate = None
+    mosse = 0
+    while mosse < max_mosse and not gioco.ha_vinto():
+        if gioco.vittoria_certa():
+            gioco.autocompletamento()
+            break
+        candidate = mosse_candidate(gioco, candidate if mossa is not None and mossa.tipo == PESCA else None)
+        if not candidate:
+            break
+        mossa = politica.scegli(gioco, candidate, rng)
+        if controllo.ferma(mossa, candidate):
+            break
+        gioco.applica_mossa(mossa)
+        mosse += 1
+    return EsitoBot(seed, gioco.ha_vinto(), gioco.calcola_punteggio_finale(0), mosse)
+
+def riepiloga(nome: str, esiti: list[EsitoBot], secondi: float) -> RapportoBot:
+    """Rapporto di una politica a partire dagli esiti delle sue partite"""
+    partite = len(esiti)
+    return RapportoBot(
+        nome, partite, sum(esito.vinta for esito in esiti),
+        sum(esito.punteggio for esito in esiti) / partite if partite else 0.0,
+        sum(esito.mosse for esito in esiti) / partite if partite else 0.0,
+        partite / secondi if secondi > 0 else 0.0)
+
+def _gioca_blocco(nome: str, semi: list[int], testo_regole: str) -> tuple[list[EsitoBot], float]:
+    """Gioca un blocco di partite con la politica indicata; restituisce esiti e secondi impiegati (eseguito nel pool)"""
+    politica = POLITICHE[nome]()
+    regole = Regole.da_testo(testo_regole)
+    inizio = time.perf_counter()
+    esiti = [gioca(politica, seed, regole) for seed in semi]
+    return esiti, time.perf_counter() - inizio
+
+def esegui_bot(nome: str, partite: int, regole: Regole | None = None, primo_seed: int = 0,
+               processi: int | None = 1, profili=None) -> RapportoBot:
+    """
+    Gioca `partite` partite (seed primo_seed, primo_seed + 1, ...) con la politica `nome`.
+    Con più processi le partite sono divise a blocchi su un pool; con un campionatore di
+    profili (models/profilazione.py) si gioca in questo processo, profilando le partite campionate
+    """
+    regole = regole or REGOLE_STANDARD
+    semi = list(range(primo_seed, primo_seed + partite))
+    processi = processi or max(1, (os.cpu_count() or 1) - 1)
+    if processi == 1 or profili is not None:
+        politica = POLITICHE[nome]()
+        esiti = []
+        inizio = time.perf_counter()
+        for indice, seed in enumerate(semi):
+            if profili is None:
+                esiti.append(gioca(politica, seed, regole))
+            else:
+                with profili.partita(indice):
+                    esiti.append(gioca(politica, seed, regole))
+        return riepiloga(nome, esiti, time.perf_counter() - inizio)
+
+    from concurrent.futures import ProcessPoolExecutor
+    blocchi = [semi[i:i + SEMI_PER_BLOCCO] for i in range(0, len(semi), SEMI_PER_BLOCCO)]
+    esiti, secondi = [], 0.0
+    with ProcessPoolExecutor(max_workers=processi) as pool:
+        for esiti_blocco, secondi_blocco in pool.map(_gioca_blocco, [nome] * len(blocchi), blocchi,
+                                                     [regole.testo()] * len(blocchi)):
+            esiti += esiti_blocco
+            secondi += secondi_blocco
+    return riepiloga(nome, esiti, secondi)
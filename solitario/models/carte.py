@@ -1,198 +1,328 @@
-import random
-from enum import Enum
-from colorama import Fore, Back, Style
-
-
-class Seme(Enum):
-    """Rappresenta i semi delle carte"""
-    CUORI = '♥'
-    QUADRI = '♦'
-    FIORI = '♣'
-    PICCHE = '♠'
-    
-    @property
-    def colore(self):
-        return 'rosso' if self in [Seme.CUORI, Seme.QUADRI] else 'nero'
-
-class Valore(Enum):
-    """Rappresenta i valori delle carte"""
-    ASSO = 'A'
-    DUE = '2'
-    TRE = '3'
-    QUATTRO = '4'
-    CINQUE = '5'
-    SEI = '6'
-    SETTE = '7'
-    OTTO = '8'
-    NOVE = '9'
-    DIECI = '10'
-    JACK = 'J'
-    DONNA = 'Q'
-    RE = 'K'
-    
-    @classmethod
-    def valori(cls):
-        """Restituisce tutti i valori in ordine"""
-        return [cls.ASSO, cls.DUE, cls.TRE, cls.QUATTRO, cls.CINQUE, 
-                cls.SEI, cls.SETTE, cls.OTTO, cls.NOVE, cls.DIECI,
-                cls.JACK, cls.DONNA, cls.RE]
-
-class Carta:
-    """Classe che rappresenta una singola carta da gioco"""
-    def __init__(self, seme: Seme, valore: Valore):
-        self.seme = seme
-        self.valore = valore
-        self.visibile = False 
-    
-    def __str__(self):
-        if not self.visibile:
-            return Fore.WHITE + Back.BLUE + Style.DIM + '[X]' + Style.RESET_ALL
-        
-        # Colori diversi per semi rossi e neri
-        colore = Fore.RED + Back.WHITE + Style.BRIGHT if self.seme.colore == 'rosso' else Fore.BLACK + Back.WHITE + Style.BRIGHT
-        return colore + f'[{self.valore.value}{self.seme.value}]' + Style.RESET_ALL
-    
-    def __repr__(self):
-        return f'Carta({self.seme}, {self.valore}, visibile={self.visibile})'
-    
-    @property
-    def colore(self):
-        return self.seme.colore
-    
-    def gira(self):
-        """Gira la carta (da coperta a scoperta o viceversa)"""
-        self.visibile = not self.visibile
-        return self
-    
-    def puo_stare_sopra(self, altra_carta) -> bool:
-        """
-        Verifica se questa carta può essere posizionata sopra un'altra carta nelle colonne di gioco
-        Regole: colore alternato e valore inferiore di uno
-        """
-        if not altra_carta or not altra_carta.visibile:
-            return False
-        
-        indice_valore_corrente = Valore.valori().index(self.valore)
-        indice_valore_altra = Valore.valori().index(altra_carta.valore)
-        
-        return (self.colore != altra_carta.colore and 
-                indice_valore_corrente == indice_valore_altra - 1)
-    
-    def puo_stare_su_fondazione(self, carta_fondazione) -> bool:
-        """
-        Verifica se questa carta può essere posizionata su una fondazione
-        Regole: stesso seme e valore superiore di uno
-        """
-        if carta_fondazione is None:
-            return self.valore == Valore.ASSO  # Solo gli assi possono iniziare una fondazione
-        
-        indice_valore_corrente = Valore.valori().index(self.valore)
-        indice_valore_fondazione = Valore.valori().index(carta_fondazione.valore)
-        
-        return (self.seme == carta_fondazione.seme and 
-                indice_valore_corrente == indice_valore_fondazione + 1)
-
-class Mazzo:
-    """Classe che rappresenta un mazzo di carte"""
-    def __init__(self):
-        self.carte: list[Carta] = []
-        self._crea_mazzo()
-        self.mescola()
-    
-    def _crea_mazzo(self):
-        """Crea un mazzo standard di 52 carte"""
-        self.carte = [Carta(seme, valore) 
-                     for seme in Seme 
-                     for valore in Valore]
-    
-    def mescola(self):
-        """Mescola il mazzo"""
-        random.shuffle(self.carte)
-    
-    def pesca(self) -> Carta:
-        """Pesca una carta dal mazzo"""
-        if not self.carte:
-            self._crea_mazzo()
-            self.mescola()
-        return self.carte.pop()
-    
-    def e_vuoto(self) -> bool:
-        """Verifica se il mazzo è vuoto"""
-        return len(self.carte) == 0
-    
-    def __len__(self):
-        return len(self.carte)
-
-class Pila:
-    """Classe per rappresentare una pila di carte (tableau, fondazioni, ecc.)"""
-    def __init__(self):
-        self.carte: list[Carta] = []
-    
-    def aggiungi_carta(self, carta: Carta):
-        """Aggiunge una carta in cima alla pila"""
-        self.carte.append(carta)
-    
-    def rimuovi_carta(self) -> Carta:
-        """Rimuove e restituisce la carta in cima alla pila"""
-        if not self.carte:
-            raise IndexError("Pila vuota")
-        return self.carte.pop()
-    
-    def carta_in_cima(self) -> Carta | None:
-        """Restituisce la carta in cima alla pila senza rimuoverla"""
-        return self.carte[-1] if self.carte else None
-    
-    def puo_aggiungere_carta(self, carta: Carta) -> bool:
-        """Verifica se una carta può essere aggiunta a questa pila"""
-        carta_in_cima = self.carta_in_cima()
-        if carta_in_cima is None:
-            return carta.valore == Valore.RE  # Solo i re possono stare su pile vuote
-        return carta.puo_stare_sopra(carta_in_cima)
-    
-    def puo_aggiungere_sequenza(self, carte: list[Carta]) -> bool:
-        """Verifica se una sequenza di carte può essere aggiunta a questa pila"""
-        if not carte:
-            return False
-        
-        # Verifica che la sequenza sia valida internamente
-        for i in range(len(carte) - 1):
-            if not carte[i].puo_stare_sopra(carte[i + 1]):
-                return False
-        
-        # Verifica che la prima carta possa essere posizionata sulla pila
-        return self.puo_aggiungere_carta(carte[0])
-    
-    def __len__(self):
-        return len(self.carte)
-    
-    def __str__(self):
-        return ' '.join(str(carta) for carta in self.carte)
-
-class PilaFondazione(Pila):
-    """Classe per le pile di fondazione"""
-    def puo_aggiungere_carta(self, carta: Carta) -> bool:
-        """Verifica se una carta può essere aggiunta alla fondazione"""
-        carta_in_cima = self.carta_in_cima()
-        return carta.puo_stare_su_fondazione(carta_in_cima)
-
-class PilaStock(Pila):
-    """Classe per lo stock (le carte coperte)"""
-    def __init__(self):
-        super().__init__()
-        self.posizione = 0  # Per tenere traccia della carta corrente quando si sfogliano
-    
-    def prossima_carta(self) -> Carta | None:
-        """Restituisce la prossima carta nello stock"""
-        if not self.carte:
-            return None
-        
-        if self.posizione >= len(self.carte):
-            self.posizione = 0
-        
-        carta = self.carte[self.posizione]
-        self.posizione += 1
-        return carta
-    
-    def resetta(self):
-        """Resetta la posizione corrente"""
-        self.posizione = 0
+import random
+from enum import Enum
+
+
+class Seme(Enum):
+    """Rappresenta i semi delle carte"""
+    CUORI = '♥'
+    QUADRI = '♦'
+    FIORI = '♣'
+    PICCHE = '♠'
+    
+    @property
+    def colore(self):
+        return 'rosso' if self in [Seme.CUORI, Seme.QUADRI] else 'nero'
+
+class Valore(Enum):
+    """Rappresenta i valori delle carte"""
+    ASSO = 'A'
+    DUE = '2'
+    TRE = '3'
+    QUATTRO = '4'
+    CINQUE = '5'
+    SEI = '6'
+    SETTE = '7'
+    OTTO = '8'
+    NOVE = '9'
+    DIECI = '10'
+    JACK = 'J'
+    DONNA = 'Q'
+    RE = 'K'
+    
+    @classmethod
+    def valori(cls):
+        """Restituisce tutti i valori in ordine"""
+        return [cls.ASSO, cls.DUE, cls.TRE, cls.QUATTRO, cls.CINQUE, 
+                cls.SEI, cls.SETTE, cls.OTTO, cls.NOVE, cls.DIECI,
+                cls.JACK, cls.DONNA, cls.RE]
+
+# Ordine canonico di semi e valori usato per i codici compatti delle carte (0-51)
+SEMI = list(Seme)
+VALORI = Valore.valori()
+_INDICE_SEME = {seme: i for i, seme in enumerate(SEMI)}
+_INDICE_VALORE = {valore: i for i, valore in enumerate(VALORI)}
+
+# Tabelle delle regole per coppie di codici, calcolate una volta sola: [carta][carta sotto]
+# per le colonne (colori alternati e valore inferiore di uno; CUORI e QUADRI sono i semi
+# rossi) e [carta][cima della fondazione] per le fondazioni (stesso seme e valore superiore di uno)
+PUO_STARE_SOPRA = tuple(
+    tuple((codice // 13 < 2) != (sotto // 13 < 2) and codice % 13 + 1 == sotto % 13 for sotto in range(52))
+    for codice in range(52))
+PUO_STARE_SU_FONDAZIONE = tuple(
+    tuple(codice // 13 == cima // 13 and codice % 13 == cima % 13 + 1 for cima in range(52))
+    for codice in range(52))
+
+_COLORI = None  # (carta coperta, carta rossa, carta nera, reset), calcolati al primo disegno
+
+def _colori() -> tuple[str, str, str, str]:
+    """Codici colore delle carte: colorama si importa solo quando una carta viene disegnata"""
+    global _COLORI
+    if _COLORI is None:
+        from colorama import Fore, Back, Style
+        _COLORI = (Fore.WHITE + Back.BLUE + Style.DIM + '[X]' + Style.RESET_ALL,
+                   Fore.RED + Back.WHITE + Style.BRIGHT,
+                   Fore.BLACK + Back.WHITE + Style.BRIGHT,
+                   Style.RESET_ALL)
+    return _COLORI
+
+class Carta:
+    """Classe che rappresenta una singola carta da gioco"""
+    __slots__ = ('seme', 'valore', 'visibile', 'codice')
+
+    def __init__(self, seme: Seme, valore: Valore):
+        self.seme = seme
+        self.valore = valore
+        self.visibile = False 
+        # Codice compatto (0-51): indice del seme * 13 + indice del valore
+        self.codice = _INDICE_SEME[seme] * 13 + _INDICE_VALORE[valore]
+    
+    def __str__(self):
+        coperta, rossa, nera, reset = _colori()
+        if not self.visibile:
+            return coperta
+        
+        # Colori diversi per semi rossi e neri
+        colore = rossa if self.seme.colore == 'rosso' else nera
+        return colore + f'[{self.valore.value}{self.seme.value}]' + reset
+    
+    def __repr__(self):
+        return f'Carta({self.seme}, {self.valore}, visibile={self.visibile})'
+    
+    @property
+    def colore(self):
+        return self.seme.colore
+    
+    @classmethod
+    def da_codice(cls, codice: int) -> 'Carta':
+        """Crea la carta (coperta) corrispondente a un codice compatto"""
+        return cls(SEMI[codice // 13], VALORI[codice % 13])
+    
+    def gira(self):
+        """Gira la carta (da coperta a scoperta o viceversa)"""
+        self.visibile = not self.visibile
+        return self
+    
+    def puo_stare_sopra(self, altra_carta) -> bool:
+        """
+        Verifica se questa carta può essere posizionata sopra un'altra carta nelle colonne di gioco
+        Regole: colore alternato e valore inferiore di uno
+        """
+        if not altra_carta or not altra_carta.visibile:
+            return False
+        return PUO_STARE_SOPRA[self.codice][altra_carta.codice]
+    
+    def puo_stare_su_fondazione(self, carta_fondazione) -> bool:
+        """
+        Verifica se questa carta può essere posizionata su una fondazione
+        Regole: stesso seme e valore superiore di uno
+        """
+        if carta_fondazione is None:
+            return self.codice % 13 == 0  # Solo gli assi possono iniziare una fondazione
+        return PUO_STARE_SU_FONDAZIONE[self.codice][carta_fondazione.codice]
+
+class Mazzo:
+    """Classe che rappresenta un mazzo di carte"""
+    def __init__(self, rng: random.Random | None = None):
+        self._rng = rng or random.Random()
+        self.carte: list[Carta] = []
+        self._crea_mazzo()
+        self.mescola()
+    
+    def _crea_mazzo(self):
+        """Crea un mazzo standard di 52 carte"""
+        self.carte = [Carta(seme, valore) 
+                     for seme in Seme 
+                     for valore in Valore]
+    
+    def mescola(self):
+        """Mescola il mazzo"""
+        self._rng.shuffle(self.carte)
+    
+    def pesca(self) -> Carta:
+        """Pesca una carta dal mazzo"""
+        if not self.carte:
+            self._crea_mazzo()
+            self.mescola()
+        return self.carte.pop()
+    
+    def e_vuoto(self) -> bool:
+        """Verifica se il mazzo è vuoto"""
+        return len(self.carte) == 0
+    
+    def __len__(self):
+        return len(self.carte)
+
+class Pila:
+    """Classe per rappresentare una pila di carte (tableau, fondazioni, ecc.)"""
+    def __init__(self):
+        self.carte: list[Carta] = []
+    
+    def aggiungi_carta(self, carta: Carta):
+        """Aggiunge una carta in cima alla pila"""
+        self.carte.append(carta)
+    
+    def rimuovi_carta(self) -> Carta:
+        """Rimuove e restituisce la carta in cima alla pila"""
+        if not self.carte:
+            raise IndexError("Pila vuota")
+        return self.carte.pop()
+    
+    def carta_in_cima(self) -> Carta | None:
+        """Restituisce la carta in cima alla pila senza rimuoverla"""
+        return self.carte[-1] if self.carte else None
+    
+    def puo_aggiungere_carta(self, carta: Carta) -> bool:
+        """Verifica se una carta può essere aggiunta a questa pila"""
+        carta_in_cima = self.carta_in_cima()
+        if carta_in_cima is None:
+            return carta.valore == Valore.RE  # Solo i re possono stare su pile vuote
+        return carta.puo_stare_sopra(carta_in_cima)
+    
+    def puo_aggiungere_sequenza(self, carte: list[Carta]) -> bool:
+        """Verifica se una sequenza di carte può essere aggiunta a questa pila"""
+        if not carte:
+            return False
+        
+        # Verifica che la sequenza sia valida internamente
+        for i in range(len(carte) - 1):
+            if not carte[i].puo_stare_sopra(carte[i + 1]):
+                return False
+        
+        # Verifica che la prima carta possa essere posizionata sulla pila
+        return self.puo_aggiungere_carta(carte[0])
+    
+    def __len__(self):
+        return len(self.carte)
+    
+    def __str__(self):
+        return ' '.join(str(carta) for carta in self.carte)
+
+class PilaFondazione(Pila):
+    """Classe per le pile di fondazione"""
+    def puo_aggiungere_carta(self, carta: Carta) -> bool:
+        """Verifica se una carta può essere aggiunta alla fondazione"""
+        carta_in_cima = self.carta_in_cima()
+        return carta.puo_stare_su_fondazione(carta_in_cima)
+
+class PilaTableau(Pila):
+    """
+    Colonna del tableau: le carte coperte stanno sotto, quelle scoperte formano la cima.
+    inizio_scoperte è l'indice della prima carta scoperta (len(carte) se non ce ne sono)
+    ed è aggiornato a ogni modifica, così una sequenza si valida e si sposta senza
+    scorrere la colonna. La lunghezza della sequenza valida in cima è calcolata alla prima
+    richiesta e tenuta finché la colonna non cambia: chi sostituisce le carte della
+    colonna chiama ricalcola_scoperte()
+    """
+    def __init__(self):
+        super().__init__()
+        self.inizio_scoperte = 0
+        self._sequenza: int | None = None  # Lunghezza della sequenza valida in cima (None = da calcolare)
+    
+    def aggiungi_carta(self, carta: Carta):
+        """Aggiunge una carta in cima alla colonna"""
+        self.carte.append(carta)
+        self._sequenza = None
+        if not carta.visibile:
+            self.inizio_scoperte = len(self.carte)
+    
+    def rimuovi_carta(self) -> Carta:
+        """Rimuove e restituisce la carta in cima alla colonna"""
+        carta = super().rimuovi_carta()
+        self._sequenza = None
+        if self.inizio_scoperte > len(self.carte):
+            self.inizio_scoperte = len(self.carte)
+        return carta
+    
+    def scopri_cima(self) -> bool:
+        """Gira la carta in cima se è coperta; restituisce True se l'ha girata"""
+        if not self.carte or self.carte[-1].visibile:
+            return False
+        self.carte[-1].gira()
+        self.inizio_scoperte = len(self.carte) - 1
+        self._sequenza = 1
+        return True
+    
+    def lunghezza_sequenza(self) -> int:
+        """Numero di carte in cima che formano una sequenza valida: scoperte, a colori alterni e valori decrescenti"""
+        if self._sequenza is None:
+            carte = self.carte
+            fine = len(carte)
+            inizio = fine - 1 if fine > self.inizio_scoperte else fine
+            while inizio > self.inizio_scoperte and PUO_STARE_SOPRA[carte[inizio].codice][carte[inizio - 1].codice]:
+                inizio -= 1
+            self._sequenza = fine - inizio
+        return self._sequenza
+    
+    def e_sequenza_valida(self, conteggio: int) -> bool:
+        """Verifica che le ultime `conteggio` carte siano scoperte e a colori alterni e valori decrescenti"""
+        return 1 <= conteggio <= self.lunghezza_sequenza()
+    
+    def sposta_sequenza(self, destinazione: 'PilaTableau', conteggio: int):
+        """Sposta le ultime `conteggio` carte (scoperte) in cima alla destinazione"""
+        if destinazione is self:
+            return
+        inizio = len(self.carte) - conteggio
+        destinazione.carte += self.carte[inizio:]
+        destinazione._sequenza = None
+        del self.carte[inizio:]
+        self._sequenza = None
+        if self.inizio_scoperte > inizio:
+            self.inizio_scoperte = inizio
+    
+    def ricalcola_scoperte(self):
+        """Ricalcola inizio_scoperte dopo aver sostituito le carte della colonna"""
+        inizio = len(self.carte)
+        while inizio and self.carte[inizio - 1].visibile:
+            inizio -= 1
+        self.inizio_scoperte = inizio
+        self._sequenza = None
+
+class PilaStock(Pila):
+    """
+    Stock e scarti in un unico array con un cursore: carte[:cursore] sono gli scarti
+    (in cima c'è carte[cursore - 1]), carte[cursore:] è lo stock (la prossima carta
+    è carte[cursore]). Pescare, annullare una pesca e riciclare spostano solo il cursore.
+    Le carte del tallone restano sempre scoperte: è il cursore a dire se sono coperte
+    nello stock o visibili negli scarti.
+    """
+    def __init__(self):
+        super().__init__()
+        self.cursore = 0
+    
+    def conteggio_stock(self) -> int:
+        """Numero di carte ancora da pescare"""
+        return len(self.carte) - self.cursore
+    
+    def conteggio_scarti(self) -> int:
+        """Numero di carte negli scarti"""
+        return self.cursore
+    
+    def carta_in_cima(self) -> Carta | None:
+        """Restituisce la carta in cima agli scarti"""
+        return self.carte[self.cursore - 1] if self.cursore else None
+    
+    def rimuovi_carta(self) -> Carta:
+        """Rimuove e restituisce la carta in cima agli scarti"""
+        if not self.cursore:
+            raise IndexError("Scarti vuoti")
+        self.cursore -= 1
+        return self.carte.pop(self.cursore)
+    
+    def pesca(self, carte: int = 1) -> Carta | None:
+        """Sposta le prossime carte dello stock (al massimo `carte`) in cima agli scarti e restituisce la nuova cima"""
+        if self.cursore >= len(self.carte):
+            return None
+        self.cursore = min(len(self.carte), self.cursore + carte)
+        return self.carte[self.cursore - 1]
+    
+    def ricicla(self):
+        """Rimette tutti gli scarti nello stock, nello stesso ordine"""
+        self.cursore = 0
+    
+    def scarti(self) -> list[Carta]:
+        """Restituisce una copia degli scarti (dal fondo alla cima)"""
+        return self.carte[:self.cursore]
+    
+    def stock(self) -> list[Carta]:
+        """Restituisce una copia dello stock (dalla prossima carta all'ultima)"""
+        return self.carte[self.cursore:]
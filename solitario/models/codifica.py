@@ -0,0 +1,153 @@
+import time
+import struct
+from models.carte import Carta, SEMI, VALORI
+from models.gioco import GiocoSolitario
+from models.regole import Regole, REGOLE_STANDARD, PUNTEGGIO_STANDARD, PUNTEGGIO_VEGAS
+
+# Formato binario compatto di una partita in corso (little endian):
+#
+#     versione (1 byte), flag (1 byte), punteggio (int32), tempo trascorso (uint32),
+#     posizione stock (1 byte, sempre 0), 4 fondazioni (1 byte ciascuna: altezza | seme << 4),
+#     lunghezze delle pile: 7 colonne del tableau, stock, scarti (9 byte),
+#     seed della partita (uint32), numero di ricicli degli scarti (uint16),
+#     regole (1 byte: carte per pesca | rimescola << 4 | vegas << 5),
+#     limite dei ricicli (1 byte, 255 = illimitati),
+#     un byte per carta di tableau, stock e scarti (codice 0-51, bit 7 = visibile),
+#     [se FLAG_REGISTRO: lunghezza (uint32) + registro delle mosse]
+#
+# La versione 2 non contiene le regole (partite con le regole standard); la versione 1
+# non contiene neanche seed e ricicli e ha la lunghezza del registro a 16 bit.
+# Le fondazioni sono ricostruite da altezza e seme: contengono sempre le carte di un
+# solo seme dall'Asso in su. Una posizione occupa al massimo 84 byte.
+
+VERSIONE = 3
+FLAG_REGISTRO = 0x01
+BIT_VISIBILE = 0x80
+BIT_RIMESCOLA = 0x10
+BIT_VEGAS = 0x20
+_RICICLI_ILLIMITATI = 0xFF
+
+_INTESTAZIONE = struct.Struct('<BBiIB4B9BIHBB')
+_INTESTAZIONE_V2 = struct.Struct('<BBiIB4B9BIH')
+_INTESTAZIONE_V1 = struct.Struct('<BBiIB4B9B')
+_LUNGHEZZA_REGISTRO = struct.Struct('<I')
+_LUNGHEZZA_REGISTRO_V1 = struct.Struct('<H')
+
+class ErroreCodifica(ValueError):
+    """Dati di una partita salvata non validi o in un formato non supportato"""
+
+def _codifica_fondazione(carte: list[Carta]) -> int:
+    """Codifica una fondazione in un byte: altezza nei 4 bit bassi, seme delle carte nei successivi"""
+    if not carte:
+        return 0
+    return len(carte) | (carte[0].codice // 13) << 4
+
+def _codifica_regole(regole: Regole) -> tuple[int, int]:
+    """Codifica le regole nei due byte dell'intestazione"""
+    opzioni = regole.carte_per_pesca
+    if regole.rimescola_scarti:
+        opzioni |= BIT_RIMESCOLA
+    if regole.punteggio == PUNTEGGIO_VEGAS:
+        opzioni |= BIT_VEGAS
+    limite = _RICICLI_ILLIMITATI if regole.limite_ricicli is None else regole.limite_ricicli
+    return opzioni, limite
+
+def _decodifica_regole(opzioni: int, limite: int) -> Regole:
+    """Ricostruisce le regole dai due byte dell'intestazione"""
+    return Regole(
+        carte_per_pesca=opzioni & 0x0F,
+        limite_ricicli=None if limite == _RICICLI_ILLIMITATI else limite,
+        rimescola_scarti=bool(opzioni & BIT_RIMESCOLA),
+        punteggio=PUNTEGGIO_VEGAS if opzioni & BIT_VEGAS else PUNTEGGIO_STANDARD
+    )
+
+def codifica_partita(gioco: GiocoSolitario, includi_registro: bool = False) -> bytes:
+    """
+    Codifica la posizione corrente della partita nel formato binario compatto
+
+    :param includi_registro: Se True accoda il registro delle mosse (necessario per i replay)
+    """
+    registro = gioco.registro_mosse if includi_registro else b''
+    pile = [pila.carte for pila in gioco.tableau]
+    pile.append(gioco.stock.stock())
+    pile.append(gioco.stock.scarti())
+
+    dati = bytearray(_INTESTAZIONE.pack(
+        VERSIONE,
+        FLAG_REGISTRO if registro else 0,
+        gioco.punteggio,
+        gioco.get_tempo_trascorso(),
+        0,
+        *(_codifica_fondazione(gioco.fondazioni[seme].carte) for seme in SEMI),
+        *(len(carte) for carte in pile),
+        gioco.seed,
+        gioco.ricicli,
+        *_codifica_regole(gioco.regole)
+    ))
+    for carte in pile:
+        dati.extend(carta.codice | BIT_VISIBILE if carta.visibile else carta.codice
+                    for carta in carte)
+
+    if registro:
+        dati += _LUNGHEZZA_REGISTRO.pack(len(registro))
+        dati += registro
+    return bytes(dati)
+
+def decodifica_partita(dati: bytes, limite_undo: int | None = None) -> GiocoSolitario:
+    """Ricostruisce una partita (e il suo registro delle mosse, se presente) dal formato binario compatto"""
+    if not dati:
+        raise ErroreCodifica("Dati vuoti")
+
+    versione = dati[0]
+    if versione == VERSIONE:
+        intestazione, lunghezza_registro = _INTESTAZIONE, _LUNGHEZZA_REGISTRO
+    elif versione == 2:
+        intestazione, lunghezza_registro = _INTESTAZIONE_V2, _LUNGHEZZA_REGISTRO
+    elif versione == 1:
+        intestazione, lunghezza_registro = _INTESTAZIONE_V1, _LUNGHEZZA_REGISTRO_V1
+    else:
+        raise ErroreCodifica(f"Versione del formato non supportata: {versione}")
+    if len(dati) < intestazione.size:
+        raise ErroreCodifica("Dati troppo corti")
+
+    campi = intestazione.unpack_from(dati)
+    _, flag, punteggio, trascorso = campi[:4]
+    fondazioni = campi[5:9]
+    lunghezze = campi[9:18]
+    seed, ricicli = campi[18:20] if versione >= 2 else (None, 0)
+    regole = _decodifica_regole(*campi[20:22]) if versione == VERSIONE else REGOLE_STANDARD
+
+    try:
+        gioco = GiocoSolitario(limite_undo=limite_undo, distribuisci=False, seed=seed, regole=regole)
+    except ValueError as e:
+        raise ErroreCodifica(str(e)) from e
+    for seme, byte in zip(SEMI, fondazioni):
+        seme_carte = SEMI[byte >> 4]
+        for valore in VALORI[:byte & 0x0F]:
+            gioco.fondazioni[seme].aggiungi_carta(Carta(seme_carte, valore).gira())
+
+    offset = intestazione.size
+    pile = [pila.carte for pila in gioco.tableau]
+    stock, scarti = [], []
+    pile += [stock, scarti]
+    for carte, lunghezza in zip(pile, lunghezze):
+        for byte in dati[offset:offset + lunghezza]:
+            carta = Carta.da_codice(byte & ~BIT_VISIBILE)
+            carta.visibile = bool(byte & BIT_VISIBILE)
+            carte.append(carta)
+        offset += lunghezza
+    if offset > len(dati):
+        raise ErroreCodifica("Dati delle carte incompleti")
+    gioco.stock.carte = scarti + stock
+    gioco.stock.cursore = len(scarti)
+    gioco.ricalcola_contatori()
+
+    if flag & FLAG_REGISTRO:
+        (lunghezza,) = lunghezza_registro.unpack_from(dati, offset)
+        offset += lunghezza_registro.size
+        gioco.registro_mosse = bytearray(dati[offset:offset + lunghezza])
+
+    gioco.punteggio = punteggio
+    gioco.ricicli = ricicli
+    gioco.tempo_inizio = time.time() - trascorso
+    return gioco
@@ -0,0 +1,247 @@
+import os
+import random
+import sqlite3
+from typing import NamedTuple
+from database.db import connetti
+from models.carte import Valore
+from models.gioco import GiocoSolitario
+from models.probabilita import simula, POLITICA_EURISTICA
+from models.regole import Regole, REGOLE_STANDARD
+
+# Difficoltà delle distribuzioni.
+#
+# Ogni seed viene giocato a carte scoperte con un budget fisso di partite euristiche
+# e se ne registrano le metriche: mosse giocate fino alla
+# prima vittoria (nodi), profondità a cui assi e due sono sepolti sotto le carte
+# coperte, ricicli dello stock necessari alla soluzione più corta e frazione di partite
+# perse. Il punteggio combinato (0 = facile, 1 = difficilissima) e la fascia sono salvati
+# in difficolta_distribuzioni con un indice (regole, fascia, seed): trovare una
+# distribuzione di una fascia che il giocatore non ha ancora giocato costa una ricerca
+# nell'indice, non una scansione. La valutazione procede a blocchi di seed su un pool
+# di processi. Anche la riserva di distribuzioni vincibili (models/riserva.py) usa
+# questa valutazione e ne salva i risultati qui: ogni seed viene giocato una volta sola.
+
+TENTATIVI_PREDEFINITI = 20  # Partite euristiche per seed: il budget fisso della valutazione
+SEMI_PER_BLOCCO = 8  # Seed valutati per attività inviata al pool
+
+FACILE = 'facile'
+MEDIA = 'media'
+DIFFICILE = 'difficile'
+IRRISOLTA = 'irrisolta'  # Nessuna vittoria entro il budget: forse impossibile, mai proposta
+# Limite superiore del punteggio di ogni fascia delle distribuzioni risolte (terzili
+# misurati su 150 seed con le regole standard)
+FASCE = ((FACILE, 0.15), (MEDIA, 0.33), (DIFFICILE, 1.0))
+
+# Valori oltre i quali una metrica conta come massima nel punteggio
+NODI_MASSIMI = 1000
+PROFONDITA_MASSIMA = 20
+RICICLI_MASSIMI = 4
+
+_VALORI_BASSI = (Valore.ASSO, Valore.DUE)
+
+class ValutazioneDifficolta(NamedTuple):
+    """Metriche e punteggio di difficoltà di una distribuzione"""
+    seed: int
+    punteggio: float  # 0 = facile, 1 = difficilissima (1 anche se irrisolta)
+    fascia: str
+    nodi: int  # Mosse giocate fino alla prima vittoria (tutte quelle del budget se irrisolta)
+    profondita_coperte: int  # Carte sopra assi e due coperti nel tableau, sommate
+    ricicli: int  # Ricicli dello stock della soluzione più corta (0 se irrisolta)
+    perse: float  # Frazione di partite del budget perse
+    soluzione: bytes  # Mosse codificate della soluzione più corta (vuote se irrisolta)
+
+def profondita_coperte(gioco: GiocoSolitario) -> int:
+    """Somma, per ogni asso e due coperto nel tableau, delle carte che lo coprono"""
+    profondita = 0
+    for pila in gioco.tableau:
+        for i in range(pila.inizio_scoperte):
+            if pila.carte[i].valore in _VALORI_BASSI:
+                profondita += len(pila.carte) - 1 - i
+    return profondita
+
+def fascia_di(punteggio: float) -> str:
+    """Fascia di una distribuzione risolta con il punteggio indicato"""
+    for fascia, limite in FASCE:
+        if punteggio <= limite:
+            return fascia
+    return DIFFICILE
+
+def punteggio_difficolta(nodi: int, profondita: int, ricicli: int, perse: float) -> float:
+    """Combina le metriche di una distribuzione risolta in un punteggio tra 0 e 1"""
+    return round(0.45 * perse
+                 + 0.25 * min(1.0, nodi / NODI_MASSIMI)
+                 + 0.15 * min(1.0, profondita / PROFONDITA_MASSIMA)
+                 + 0.15 * min(1.0, ricicli / RICICLI_MASSIMI), 4)
+
+def valuta_distribuzione(seed: int, regole: Regole | None = None,
+                         tentativi: int = TENTATIVI_PREDEFINITI) -> ValutazioneDifficolta:
+    """Gioca la distribuzione `tentativi` volte con la politica euristica e ne misura la difficoltà"""
+    iniziale = GiocoSolitario(limite_undo=0, seed=seed, regole=regole)
+    profondita = profondita_coperte(iniziale)
+    nodi = 0
+    nodi_soluzione = None
+    soluzione = None
+    ricicli = 0
+    vittorie = 0
+    for tentativo in range(tentativi):
+        gioco = GiocoSolitario(limite_undo=0, seed=seed, regole=regole)
+        gioco.verboso = False
+        vinta = simula(gioco, random.Random(seed * 1_000_003 + tentativo), POLITICA_EURISTICA)
+        if vinta:
+            gioco.autocompletamento()
+            vinta = gioco.ha_vinto()
+        nodi += len(gioco.registro_mosse) // 2
+        if not vinta:
+            continue
+        vittorie += 1
+        if nodi_soluzione is None:
+            nodi_soluzione = nodi
+        if soluzione is None or len(gioco.registro_mosse) < len(soluzione):
+            soluzione = bytes(gioco.registro_mosse)
+            ricicli = gioco.ricicli
+    perse = 1 - vittorie / tentativi
+    if soluzione is None:
+        return ValutazioneDifficolta(seed, 1.0, IRRISOLTA, nodi, profondita, 0, perse, b'')
+    punteggio = punteggio_difficolta(nodi_soluzione, profondita, ricicli, perse)
+    return ValutazioneDifficolta(seed, punteggio, fascia_di(punteggio), nodi_soluzione,
+                                 profondita, ricicli, perse, soluzione)
+
+def inserisci_valutazioni(cursor: sqlite3.Cursor, valutazioni: list[ValutazioneDifficolta], regole: Regole):
+    """Salva (o sostituisce) le valutazioni nella transazione del cursore (anche per la riserva)"""
+    cursor.executemany("""
+        INSERT OR REPLACE INTO difficolta_distribuzioni
+        (regole, seed, punteggio, fascia, nodi, profondita_coperte, ricicli, perse, soluzione)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(regole.testo(), v.seed, v.punteggio, v.fascia, v.nodi, v.profondita_coperte,
+           v.ricicli, v.perse, v.soluzione) for v in valutazioni])
+
+def valuta_semi(semi: list[int], testo_regole: str, tentativi: int) -> list[ValutazioneDifficolta]:
+    """Valuta un blocco di seed (eseguito nel pool)"""
+    regole = Regole.da_testo(testo_regole)
+    return [valuta_distribuzione(seed, regole, tentativi) for seed in semi]
+
+class GestoreDifficolta:
+    """Valutazione a blocchi delle distribuzioni e ricerca per fascia di difficoltà"""
+    def __init__(self, processi: int | None = None, tentativi: int = TENTATIVI_PREDEFINITI):
+        self.processi = processi or max(1, (os.cpu_count() or 1) - 1)
+        self.tentativi = tentativi
+
+    def valuta(self, semi: list[int], regole: Regole | None = None, rivaluta: bool = False) -> int:
+        """
+        Valuta i seed non ancora valutati per la variante (tutti con rivaluta=True) e salva
+        ogni blocco appena è pronto. Restituisce i seed valutati
+        """
+        regole = regole or REGOLE_STANDARD
+        if not rivaluta:
+            gia_valutati = self._valutati(semi, regole)
+            semi = [seed for seed in dict.fromkeys(semi) if seed not in gia_valutati]
+        blocchi = [semi[i:i + SEMI_PER_BLOCCO] for i in range(0, len(semi), SEMI_PER_BLOCCO)]
+        valutati = 0
+        if self.processi == 1 or len(blocchi) <= 1:
+            for blocco in blocchi:
+                valutati += self._salva(valuta_semi(blocco, regole.testo(), self.tentativi), regole)
+            return valutati
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=self.processi) as pool:
+            futures = [pool.submit(valuta_semi, blocco, regole.testo(), self.tentativi) for blocco in blocchi]
+            for future in as_completed(futures):
+                valutati += self._salva(future.result(), regole)
+        return valutati
+
+    def valuta_casuali(self, quanti: int, regole: Regole | None = None) -> int:
+        """Valuta `quanti` seed casuali nuovi. Restituisce i seed valutati"""
+        rng = random.Random()
+        return self.valuta([rng.randrange(2 ** 32) for _ in range(quanti)], regole)
+
+    def _valutati(self, semi: list[int], regole: Regole) -> set[int]:
+        """Seed già presenti nella tabella per la variante"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                trovati = set()
+                # A gruppi, sotto il limite di parametri di SQLite
+                for i in range(0, len(semi), 500):
+                    gruppo = semi[i:i + 500]
+                    cursor.execute(f"""
+                        SELECT seed FROM difficolta_distribuzioni
+                        WHERE regole = ? AND seed IN ({', '.join('?' * len(gruppo))})
+                    """, (regole.testo(), *gruppo))
+                    trovati.update(riga[0] for riga in cursor.fetchall())
+                return trovati
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return set()
+
+    def _salva(self, valutazioni: list[ValutazioneDifficolta], regole: Regole) -> int:
+        """Salva (o sostituisce) le valutazioni di un blocco. Restituisce quante sono state salvate"""
+        try:
+            with connetti() as conn:
+                inserisci_valutazioni(conn.cursor(), valutazioni, regole)
+                conn.commit()
+                return len(valutazioni)
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return 0
+
+    def valutazione(self, seed: int, regole: Regole | None = None) -> ValutazioneDifficolta | None:
+        """Valutazione salvata di un seed (None se non è ancora stato valutato)"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT seed, punteggio, fascia, nodi, profondita_coperte, ricicli, perse, soluzione
+                    FROM difficolta_distribuzioni WHERE regole = ? AND seed = ?
+                """, ((regole or REGOLE_STANDARD).testo(), seed))
+                riga = cursor.fetchone()
+                return ValutazioneDifficolta(*riga) if riga else None
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return None
+
+    def conteggi(self, regole: Regole | None = None) -> dict[str, int]:
+        """Distribuzioni valutate per fascia"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT fascia, COUNT(*) FROM difficolta_distribuzioni
+                    WHERE regole = ? GROUP BY fascia
+                """, ((regole or REGOLE_STANDARD).testo(),))
+                return dict(cursor.fetchall())
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return {}
+
+    def non_giocata(self, user_id: int | None, fascia: str, regole: Regole | None = None,
+                    rng: random.Random | None = None) -> ValutazioneDifficolta | None:
+        """
+        Una distribuzione della fascia che il giocatore non ha mai giocato con queste regole
+        (None se non ce ne sono). La ricerca parte da un seed casuale nell'indice
+        (regole, fascia, seed) e scarta i seed già giocati con l'indice dei replay per seed
+        """
+        regole = regole or REGOLE_STANDARD
+        partenza = (rng or random).randrange(2 ** 32)
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                # Prima i seed da quello casuale in su, poi (se serve) quelli sotto
+                for confronto, ordine in (('>=', 'ASC'), ('<', 'DESC')):
+                    cursor.execute(f"""
+                        SELECT d.seed, d.punteggio, d.fascia, d.nodi, d.profondita_coperte,
+                               d.ricicli, d.perse, d.soluzione
+                        FROM difficolta_distribuzioni d
+                        WHERE d.regole = ? AND d.fascia = ? AND d.seed {confronto} ?
+                          AND NOT EXISTS (
+                              SELECT 1 FROM replay_partite r
+                              JOIN sessioni_gioco s ON s.id = r.sessione_id
+                              WHERE r.seed = d.seed AND s.user_id = ? AND s.regole = d.regole
+                          )
+                        ORDER BY d.seed {ordine} LIMIT 1
+                    """, (regole.testo(), fascia, partenza, user_id))
+                    riga = cursor.fetchone()
+                    if riga:
+                        return ValutazioneDifficolta(*riga)
+                return None
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return None
@@ -0,0 +1,77 @@
+from typing import Callable, NamedTuple
+from models.carte import Carta
+
+# Eventi della partita.
+#
+# GiocoSolitario pubblica un evento tipizzato per ogni cambiamento del tavolo: gli
+# osservatori (interfaccia, registri, metriche...) si aggiornano in modo incrementale
+# invece di rileggere tutta la posizione a ogni turno. Gli eventi arrivano in ordine e
+# in modo sincrono, a modifica già applicata; le pile sono indicate con i nomi canonici
+# ('scarti', 'tableau1'-'tableau7', 'fondazione_<seme>'). Una partita senza iscritti non
+# crea il bus né gli eventi: il costo per mossa è un controllo.
+
+class CartaSpostata(NamedTuple):
+    """Una carta o una sequenza spostata tra due pile (anche dall'autocompletamento)"""
+    sorgente: str
+    destinazione: str
+    conteggio: int
+    punteggio: int  # Punteggio dopo la mossa
+
+class CartaScoperta(NamedTuple):
+    """La cima coperta di una colonna è stata girata"""
+    pila: str
+    carta: Carta
+
+class StockPescato(NamedTuple):
+    """Carte passate dallo stock agli scarti"""
+    carte: int
+    cima: Carta  # Nuova cima degli scarti
+    punteggio: int
+
+class StockRiciclato(NamedTuple):
+    """Gli scarti sono tornati nello stock"""
+    ricicli: int
+    punteggio: int
+
+class MossaAnnullata(NamedTuple):
+    """Undo: qualsiasi pila può essere cambiata, la posizione va riletta"""
+    punteggio: int
+
+class MossaRipetuta(NamedTuple):
+    """Redo: qualsiasi pila può essere cambiata, la posizione va riletta"""
+    punteggio: int
+
+class PartitaVinta(NamedTuple):
+    """Tutte le 52 carte sono nelle fondazioni"""
+    punteggio: int
+
+class BusEventi:
+    """Osservatori di una partita, ciascuno iscritto a tutti gli eventi o solo ad alcuni tipi"""
+    __slots__ = ('_iscritti',)
+
+    def __init__(self):
+        self._iscritti: list[tuple[Callable, tuple[type, ...]]] = []
+
+    def iscrivi(self, osservatore: Callable, *tipi: type) -> Callable[[], None]:
+        """
+        Iscrive l'osservatore agli eventi dei tipi indicati (nessun tipo = tutti).
+        Restituisce la funzione che annulla l'iscrizione
+        """
+        voce = (osservatore, tipi)
+        self._iscritti.append(voce)
+
+        def disiscrivi():
+            if voce in self._iscritti:
+                self._iscritti.remove(voce)
+        return disiscrivi
+
+    def pubblica(self, evento):
+        """Consegna l'evento agli osservatori interessati, nell'ordine di iscrizione"""
+        tipo = type(evento)
+        # Copia: un osservatore può annullare la propria iscrizione durante la consegna
+        for osservatore, tipi in tuple(self._iscritti):
+            if not tipi or tipo in tipi:
+                osservatore(evento)
+
+    def __len__(self):
+        return len(self._iscritti)
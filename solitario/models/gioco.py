@@ -1,552 +1,978 @@
-import time
-import random
-from datetime import timedelta
-from models.carte import Carta, Mazzo, Pila, PilaFondazione, PilaStock, Seme, Valore
-
-class StatoGioco:
-    """Classe per rappresentare uno stato del gioco per undo/redo"""
-    def __init__(self, tableau, fondazioni, stock, scarti):
-        self.tableau = [[carta for carta in pila.carte] for pila in tableau]
-        self.fondazioni = {seme: [carta for carta in pila.carte] for seme, pila in fondazioni.items()}
-        self.stock = [carta for carta in stock.carte]
-        self.scarti = [carta for carta in scarti]
-        self.posizione_stock = stock.posizione
-        self.carte_visibili = self._get_carte_visibili(tableau)
-        self.carte_coperte = self._get_carte_coperte(tableau)
-
-    def _get_carte_visibili(self, tableau):
-        """Restituisce un set di tutte le carte visibili nel tableau"""
-        visibili = set()
-        for pila in tableau:
-            for carta in pila.carte:
-                if carta.visibile:
-                    visibili.add((carta.seme, carta.valore))
-        return visibili
-
-    def _get_carte_coperte(self, tableau):
-        """Restituisce un set di tutte le carte coperte nel tableau"""
-        coperte = set()
-        for pila in tableau:
-            for carta in pila.carte:
-                if not carta.visibile:
-                    coperte.add((carta.seme, carta.valore))
-        return coperte
-
-class GiocoSolitario:
-    """Classe principale che gestisce la logica del gioco"""
-    def __init__(self):
-        self.mazzo = Mazzo()
-        self.tableau: list[Pila] = [Pila() for _ in range(7)] 
-        self.fondazioni: dict[Seme, PilaFondazione] = {
-            seme: PilaFondazione() for seme in Seme
-        }
-        self.stock = PilaStock()
-        self.scarti: list[Carta] = []
-        self.stati_undo: list[StatoGioco] = []  # Stack per undo
-        self.stati_redo: list[StatoGioco] = []  # Stack per redo
-        self.tempo_inizio = None
-        self.punteggio = 0
-        self._distribuisci_carte()
-
-    
-    def _salva_stato(self):
-        """Salva lo stato corrente del gioco nello stack undo"""
-        stato = StatoGioco(
-            self.tableau,
-            self.fondazioni,
-            self.stock,
-            self.scarti
-        )
-        self.stati_undo.append(stato)
-        self.stati_redo.clear()
-    
-    def annulla(self):
-        """Annulla l'ultima mossa"""
-        if not self.stati_undo:
-            return False
-        
-        # Salva lo stato corrente nello stack redo
-        stato_corrente = StatoGioco(
-            self.tableau,
-            self.fondazioni,
-            self.stock,
-            self.scarti
-        )
-        self.stati_redo.append(stato_corrente)
-        
-        # Ripristina lo stato precedente
-        stato = self.stati_undo.pop()
-        self._ripristina_stato(stato)
-        
-        # Penalità punteggio per undo
-        self.punteggio = max(0, self.punteggio - 15)
-        
-        return True
-
-    def ripeti(self):
-        """Ripete l'ultima mossa annullata"""
-        if not self.stati_redo:
-            return False
-        
-        # Salva lo stato corrente nello stack undo
-        stato_corrente = StatoGioco(
-            self.tableau,
-            self.fondazioni,
-            self.stock,
-            self.scarti
-        )
-        self.stati_undo.append(stato_corrente)
-        
-        # Ripristina lo stato successivo
-        stato = self.stati_redo.pop()
-        self._ripristina_stato(stato)
-
-        return True
-    
-    def _ripristina_stato(self, stato: StatoGioco):
-        """Ripristina lo stato del gioco da uno stato salvato"""
-        # Ripristina tableau
-        for i in range(7):
-            self.tableau[i].carte = []
-            for carta in stato.tableau[i]:
-                # Ripristina lo stato originale della carta
-                if (carta.seme, carta.valore) in stato.carte_visibili:
-                    carta.visibile = True
-                elif (carta.seme, carta.valore) in stato.carte_coperte:
-                    carta.visibile = False
-                self.tableau[i].aggiungi_carta(carta)
-            
-            # Assicura che solo l'ultima carta sia visibile
-            if self.tableau[i].carte:
-                for carta in self.tableau[i].carte[:-1]:
-                    if (carta.seme, carta.valore) not in stato.carte_visibili:
-                        carta.visibile = False
-                self.tableau[i].carte[-1].visibile = True
-        
-        # Ripristina fondazioni
-        for seme in Seme:
-            self.fondazioni[seme].carte = [carta for carta in stato.fondazioni[seme]]
-        
-        # Ripristina stock e scarti
-        self.stock.carte = [carta for carta in stato.stock]
-        self.stock.posizione = stato.posizione_stock
-        self.scarti = [carta for carta in stato.scarti]
-
-    def _distribuisci_carte(self):
-        """Distribuisce le carte per iniziare il gioco"""
-        for i in range(7):
-            for j in range(i + 1):
-                carta = self.mazzo.pesca()
-                if j == i:  # Ultima carta della colonna è visibile
-                    carta.gira()
-                self.tableau[i].aggiungi_carta(carta)
-        
-        # Le carte rimanenti vanno nello stock
-        while not self.mazzo.e_vuoto():
-            carta = self.mazzo.pesca()
-            carta.gira()  # Le carte nello stock sono coperte
-            self.stock.aggiungi_carta(carta)
-        
-        # Avvia il timer di gioco
-        self.tempo_inizio = time.time()
-    
-    def pesca_dallo_stock(self):
-        """Pesca una carta dallo stock"""
-        self._salva_stato()
-        
-        if not self.stock.carte:
-            if self.scarti:
-                self._ripristina_stock()
-            else:
-                return
-        
-        carta = self.stock.prossima_carta()
-        if carta:
-            if not carta.visibile:
-                carta.gira()
-
-            self.scarti.append(carta) 
-            self.stock.carte.remove(carta)
-            if self.stock.posizione > 0:
-                self.stock.posizione -= 1
-            
-            # Aggiorna punteggio per aver pescato una carta
-            self.punteggio += 2
-
-    def _ripristina_stock(self):
-        """Ripristina lo stock dagli scarti (mescolando le carte e mettendole tutte coperte)"""
-        if not self.scarti:
-            return
-            
-        # Mette tutte le carte coperte
-        for carta in self.scarti:
-            if carta.visibile:
-                carta.gira()
-        
-        # Mescola le carte
-        random.shuffle(self.scarti)
-        
-        # Sposta tutte le carte nello stock
-        for carta in self.scarti:
-            self.stock.aggiungi_carta(carta)
-            
-        self.scarti = []
-        self.stock.posizione = 0
-        
-        # Penalità punteggio per riciclo scarti
-        self.punteggio = max(0, self.punteggio - 20)
-
-    def autocompletamento(self) -> bool:
-        """Tenta di completare automaticamente il gioco spostando tutte le carte possibili nelle fondazioni"""
-        if not self._puo_autocompletare():
-            return False
-        
-        self._salva_stato()
-        
-        mosse_effettuate = False
-        # Continua a provare finché non ci sono più mosse possibili
-        while True:
-            mossa_effettuata = False
-            
-            # Controlla prima gli scarti
-            if self.scarti:
-                carta_scarti = self.scarti[-1]
-                for seme in Seme:
-                    fondazione = self.fondazioni[seme]
-                    if fondazione.puo_aggiungere_carta(carta_scarti):
-                        carta_mossa = self.scarti.pop()
-                        fondazione.aggiungi_carta(carta_mossa)
-                        self.punteggio += 15
-                        mossa_effettuata = True
-                        mosse_effettuate = True
-                        break
-            
-            # Controlla tableau
-            for pila in self.tableau:
-                if pila.carte:
-                    carta_in_cima = pila.carta_in_cima()
-                    if carta_in_cima and carta_in_cima.visibile:
-                        for seme in Seme:
-                            fondazione = self.fondazioni[seme]
-                            if fondazione.puo_aggiungere_carta(carta_in_cima):
-                                carta_mossa = pila.rimuovi_carta()
-                                fondazione.aggiungi_carta(carta_mossa)
-                                self.punteggio += 5
-                                mossa_effettuata = True
-                                mosse_effettuate = True
-                                
-                                if pila.carte and not pila.carta_in_cima().visibile:
-                                    pila.carta_in_cima().gira()
-                                break
-            
-            if not mossa_effettuata:
-                break
-        
-        return mosse_effettuate
-    
-    def _puo_autocompletare(self) -> bool:
-        """Verifica se l'autocompletamento è permesso (scarti vuoti e tutte le carte scoperte)"""
-        # Verifica se gli scarti sono vuoti
-        if self.scarti:
-            return False
-        
-        # Verifica se tutte le carte nel tableau sono scoperte
-        for pila in self.tableau:
-            for carta in pila.carte:
-                if not carta.visibile:
-                    return False
-        
-        return True
-    
-    def muovi_carta(self, sorgente: str, destinazione: str, conteggio: int) -> bool:
-        """
-        Sposta una carta o una sequenza di carte
-
-        :param sorgente: Origine ('tableau1-7', 't1-7', '1-7', 'scarti', 's', 'foundation_<seme>', 'f_<seme>', '<seme>')
-        :param destinazione: Destinazione ('tableau1-7', 't1-7', '1-7', 'foundation_<seme>', 'f_<seme>', '<seme>')
-        :param conteggio: Numero di carte da spostare (solo per tableau)
-        :return: True se la mossa è valida ed è stata eseguita
-        """
-
-        self._salva_stato()
-
-        # Movimento da fondazione a tableau
-        if sorgente.startswith('fondazione_') and destinazione.startswith('tableau'):
-            # Estrai il seme dalla sorgente
-            parti = sorgente.split('_')
-            if len(parti) != 2:
-                return False
-
-            nome_seme = parti[1].lower()
-            try:
-                seme = next(s for s in Seme if s.name.lower() == nome_seme)
-            except StopIteration:
-                return False
-
-            pila_fondazione = self.fondazioni[seme]
-            if not pila_fondazione.carte:
-                return False
-
-            carta_da_spostare = pila_fondazione.carta_in_cima()
-
-            # Ottieni la pila di destinazione
-            idx_dest = int(destinazione[7:]) - 1
-            if idx_dest < 0 or idx_dest >= 7:
-                return False
-
-            pila_destinazione = self.tableau[idx_dest]
-
-            # Verifica le regole per lo spostamento
-            carta_dest_in_cima = pila_destinazione.carta_in_cima()
-            if carta_dest_in_cima is None:
-                # Solo i re possono essere posizionati su un tableau vuoto
-                if carta_da_spostare.valore != Valore.RE:
-                    return False
-            else:
-                # Colori alternati e valore inferiore di uno
-                if not carta_da_spostare.puo_stare_sopra(carta_dest_in_cima):
-                    return False
-
-            # Esegui lo spostamento
-            carta_mossa = pila_fondazione.rimuovi_carta()
-            pila_destinazione.aggiungi_carta(carta_mossa)
-
-            # Aggiorna il punteggio (penalità per spostare dalla fondazione)
-            self.punteggio = max(0, self.punteggio - 5)
-            print(f"Spostata 1 carta da {sorgente} a {destinazione}.")
-            return True
-        
-        # Movimento verso fondazione (sempre 1 carta)
-        if destinazione.startswith('fondazione_'):
-            pila_sorgente, carta_sorgente = self._get_sorgente(sorgente)
-            if not carta_sorgente:
-                print(f"Sorgente non valida: {sorgente}. Nessuna carta disponibile.")
-                return False
-            
-            pila_destinazione = self._get_destinazione(destinazione)
-            if pila_destinazione is None:
-                print(f"ERRORE: Impossibile trovare la pila di destinazione per {destinazione}")
-                return False
-
-            # Verifica validità mossa
-            carta_fondazione_in_cima = pila_destinazione.carta_in_cima()
-            if carta_fondazione_in_cima is None:
-                if carta_sorgente.valore != Valore.ASSO:
-                    return False
-            elif not carta_sorgente.puo_stare_su_fondazione(carta_fondazione_in_cima):
-                return False
-            
-            # Esegui il movimento
-            if sorgente == 'scarti':
-                carta_mossa = self.scarti.pop()
-                pila_destinazione.aggiungi_carta(carta_mossa)
-                self.punteggio += 15
-            elif sorgente.startswith('tableau'):
-                idx = int(sorgente[7:]) - 1
-                carta_mossa = self.tableau[idx].rimuovi_carta()
-                pila_destinazione.aggiungi_carta(carta_mossa)
-                self.punteggio += 5
-                
-                # Rivela l'ultima carta se la colonna non è vuota
-                if self.tableau[idx].carte and not self.tableau[idx].carta_in_cima().visibile:
-                    self.tableau[idx].carta_in_cima().gira()
-            
-            print(f"Spostata 1 carta da {sorgente} a {destinazione}.")
-            return True
-        
-        # Movimento verso tableau
-        elif destinazione.startswith('tableau'):
-            pila_sorgente, carta_sorgente = self._get_sorgente(sorgente)
-            if not carta_sorgente:
-                print(f"Sorgente non valida: {sorgente}. Nessuna carta disponibile.")
-                return False
-            
-            pila_destinazione = self._get_destinazione(destinazione)
-            if pila_destinazione is None:
-                print(f"ERRORE: Impossibile trovare la pila di destinazione per {destinazione}")
-                return False
-
-            # Spostamento singola carta (conteggio = 1)
-            if conteggio == 1:
-                # Verifica validità mossa
-                carta_destinazione_in_cima = pila_destinazione.carta_in_cima()
-                if carta_destinazione_in_cima is None:
-                    if carta_sorgente.valore != Valore.RE:
-                        return False
-                elif not carta_sorgente.puo_stare_sopra(carta_destinazione_in_cima):
-                    return False
-                
-                # Esegui il movimento
-                if sorgente == 'scarti':
-                    carta_mossa = self.scarti.pop()
-                    pila_destinazione.aggiungi_carta(carta_mossa)
-                    self.punteggio += 10
-                elif sorgente.startswith('tableau'):
-                    idx = int(sorgente[7:]) - 1
-                    carta_mossa = self.tableau[idx].rimuovi_carta()
-                    pila_destinazione.aggiungi_carta(carta_mossa)
-                    
-                    # Rivela l'ultima carta se la colonna non è vuota
-                    if self.tableau[idx].carte and not self.tableau[idx].carta_in_cima().visibile:
-                        self.tableau[idx].carta_in_cima().gira()
-                
-                print(f"Spostata 1 carta da {sorgente} a {destinazione}.")
-                return True
-            
-            # Spostamento multiplo carte (conteggio > 1)
-            elif conteggio > 1:
-                if not sorgente.startswith('tableau'):
-                    return False
-                    
-                idx = int(sorgente[7:]) - 1
-                carte_visibili = [carta for carta in self.tableau[idx].carte if carta.visibile]
-                
-                # Verifica validità mossa
-                if conteggio > len(carte_visibili):
-                    return False
-
-                # Verifica che la sequenza sia valida internamente
-                for i in range(len(carte_visibili)-conteggio, len(carte_visibili)-1):
-                    if not carte_visibili[i+1].puo_stare_sopra(carte_visibili[i]):
-                        return False
-
-                # Verifica che la prima carta possa essere posizionata sul target
-                prima_carta_da_spostare = carte_visibili[-conteggio]
-                carta_destinazione_in_cima = pila_destinazione.carta_in_cima()
-
-                if carta_destinazione_in_cima is None:
-                    if prima_carta_da_spostare.valore != Valore.RE:
-                        return False
-                elif not prima_carta_da_spostare.puo_stare_sopra(carta_destinazione_in_cima):
-                    return False
-                
-                # Esegui il movimento
-                carte_mosse = []
-                for _ in range(conteggio):
-                    if self.tableau[idx].carte:
-                        carte_mosse.append(self.tableau[idx].rimuovi_carta())
-                
-                # Aggiungi le carte in ordine inverso per mantenere la sequenza corretta
-                for carta in reversed(carte_mosse):
-                    pila_destinazione.aggiungi_carta(carta)
-                
-                # Rivela l'ultima carta se la colonna non è vuota
-                if self.tableau[idx].carte and not self.tableau[idx].carta_in_cima().visibile:
-                    self.tableau[idx].carta_in_cima().gira()
-                
-                print(f"Spostate {conteggio} carte da {sorgente} a {destinazione}.")
-                return True
-        
-        return False
-
-    def _get_sorgente(self, sorgente: str) -> tuple[Pila | None, Carta | None]:
-        """Restituisce la pila e la carta sorgente"""
-        
-        if sorgente == 'scarti':
-            if not self.scarti:
-                return None, None
-            return None, self.scarti[-1]
-        
-        if sorgente.startswith('tableau'):
-            idx = int(sorgente[7:]) - 1
-            if idx < 0 or idx >= 7 or not self.tableau[idx].carte:
-                return None, None
-            return self.tableau[idx], self.tableau[idx].carta_in_cima()
-        
-        if sorgente.startswith('fondazione_'):
-            parti = sorgente.split('_')
-            if len(parti) != 2:
-                return None, None
-                
-            nome_seme = parti[1].lower()  
-            
-            try:
-                for seme in Seme:
-                    if seme.name.lower() == nome_seme:
-                        return self.fondazioni[seme], self.fondazioni[seme].carta_in_cima()
-                return None, None
-            except:
-                return None, None
-        
-        return None, None
-    
-    def _get_destinazione(self, destinazione: str) -> Pila | None:
-        """Restituisce la pila di destinazione"""
-        
-        if destinazione.startswith('tableau'):
-            idx = int(destinazione[7:]) - 1
-            if idx < 0 or idx >= 7:
-                return None
-            return self.tableau[idx]
-        
-        if destinazione.startswith('fondazione_'):
-            parti = destinazione.split('_')
-            if len(parti) != 2:
-                return None
-                
-            nome_seme = parti[1].lower()  
-            
-            try:
-                for seme in Seme:
-                    if seme.name.lower() == nome_seme:
-                        return self.fondazioni[seme]
-                return None
-            except:
-                return None
-        
-        return None
-    
-    def get_tempo_trascorso(self) -> int:
-        """Restituisce il tempo trascorso in secondi"""
-        if not self.tempo_inizio:
-            return 0
-        return int(time.time() - self.tempo_inizio)
-    
-    def formatta_tempo(self, secondi: int) -> str:
-        """Formatta i secondi in HH:MM:SS"""
-        return str(timedelta(seconds=secondi))
-    
-    def ha_vinto(self) -> bool:
-        """Verifica se il giocatore ha vinto"""
-        return all(len(pila) == 13 for pila in self.fondazioni.values())
-    
-    def get_stato_gioco(self) -> dict:
-        """Restituisce lo stato corrente del gioco per la visualizzazione"""
-        return {
-            'tableau': [{'carte': pila.carte, 'conteggio': len(pila)} for pila in self.tableau],
-            'fondazioni': {seme.name: {'in_cima': pila.carta_in_cima(), 'conteggio': len(pila)} 
-                            for seme, pila in self.fondazioni.items()},
-            'scarti': self.scarti[-1] if self.scarti else None,  # Mostra solo l'ultima carta degli scarti
-            'conteggio_stock': len(self.stock.carte),
-            'conteggio_scarti': len(self.scarti),
-            'punteggio': self.punteggio,
-            'tempo': self.get_tempo_trascorso()
-        }
-
-    def calcola_punteggio_finale(self) -> int:
-        """Calcola il punteggio finale con bonus/penalità di tempo"""
-        trascorso = self.get_tempo_trascorso()
-        minuti = trascorso // 60
-        
-        # Punteggio base
-        punteggio_finale = self.punteggio
-        
-        # Bonus completamento
-        punteggio_finale += 100
-        
-        # Bonus tempo
-        if minuti < 5:
-            punteggio_finale += 350
-        elif minuti < 10:
-            punteggio_finale += 250
-        elif minuti < 15:
-            punteggio_finale += 150
-        elif minuti < 20:
-            punteggio_finale += 50
-        
-        # Penalità tempo (dopo 20 minuti)
-        if trascorso > 1200:  # 20 minuti
-            punteggio_finale -= ((trascorso - 1200) // 30) # 1 punto ogni 30 secondi 
-        
-        return max(0, punteggio_finale)
+import os
+import sys
+import time
+import heapq
+import random
+import struct
+from collections import deque
+from datetime import timedelta
+from models.carte import (Carta, Mazzo, Pila, PilaFondazione, PilaStock, PilaTableau, Seme, Valore, SEMI,
+                          PUO_STARE_SOPRA)
+from models.eventi import (BusEventi, CartaSpostata, CartaScoperta, StockPescato, StockRiciclato,
+                           MossaAnnullata, MossaRipetuta, PartitaVinta)
+from models.metriche import strumentato
+from models.mosse import Mossa, PESCA, MUOVI, AUTOCOMPLETA, ANNULLA, RIPETI, codifica_mossa
+from models.regole import Regole, REGOLE_STANDARD, compila
+
+NOMI_TABLEAU = [f'tableau{i}' for i in range(1, 8)]
+NOMI_FONDAZIONI = {seme: f'fondazione_{seme.name.lower()}' for seme in Seme}
+_SEME_FONDAZIONE = {nome: seme for seme, nome in NOMI_FONDAZIONI.items()}
+_NOMI_FONDAZIONI_IN_ORDINE = tuple(NOMI_FONDAZIONI.values())  # Stesso ordine di GiocoSolitario.fondazioni
+_ASSI = (0, 13, 26, 39)  # Codici degli assi (codice = seme * 13 + valore)
+
+# Con SOLITARIO_CONTROLLO_CONTATORI=1 (o main.py --debug) ogni lettura dei contatori
+# incrementali li confronta con un ricalcolo completo della posizione
+CONTROLLO_CONTATORI = os.environ.get('SOLITARIO_CONTROLLO_CONTATORI') == '1'
+
+def _tipo_mossa(gioco, sorgente: str, destinazione: str, conteggio: int = 1) -> str:
+    """Etichetta delle metriche di muovi_carta: tipo di sorgente e di destinazione"""
+    def tipo(pila: str) -> str:
+        return pila.rstrip('1234567') if pila.startswith('tableau') else pila.split('_')[0]
+    return f"{tipo(sorgente)}_{tipo(destinazione)}" + ("_sequenza" if conteggio > 1 else "")
+
+def _dimensione_carta() -> int:
+    """Memoria occupata da un oggetto Carta (con __slots__ gli attributi sono nell'oggetto)"""
+    return sys.getsizeof(Carta(Seme.CUORI, Valore.ASSO))
+
+_DIMENSIONE_CARTA = _dimensione_carta()
+
+# Stato per undo/redo: un blob di dimensione fissa. L'intestazione contiene punteggio,
+# ricicli, le lunghezze delle 7 colonne, delle 4 fondazioni (ordine di SEMI) e del
+# tallone e il cursore dello stock; segue un byte per carta, nell'ordine delle pile,
+# con il codice nei 7 bit bassi e la visibilità nel bit alto
+_INTESTAZIONE_STATO = struct.Struct('<iI13B')
+_VISIBILE = 0x80
+_CODICE = 0x7F
+
+class StatoGioco:
+    """Classe per rappresentare uno stato del gioco per undo/redo"""
+    __slots__ = ('dati',)
+
+    def __init__(self, tableau, fondazioni, stock, ricicli=0, punteggio=0):
+        pile = [pila.carte for pila in tableau]
+        pile += [fondazioni[seme].carte for seme in SEMI]
+        pile.append(stock.carte)
+        self.dati = _INTESTAZIONE_STATO.pack(punteggio, ricicli, *map(len, pile), stock.cursore) + bytes(
+            [carta.codice | _VISIBILE if carta.visibile else carta.codice for carte in pile for carta in carte])
+
+    @property
+    def punteggio(self) -> int:
+        """Punteggio al momento del salvataggio (ripristinato dall'undo solo se il sistema di punteggio lo prevede)"""
+        return _INTESTAZIONE_STATO.unpack_from(self.dati)[0]
+
+    def pile(self, carte_per_codice: list[Carta]) -> tuple[int, int, list[list[Carta]]]:
+        """
+        Decodifica lo stato: (ricicli, cursore dello stock, carte di colonne, fondazioni e
+        tallone). Le carte sono prese da carte_per_codice e la loro visibilità è impostata
+        a quella salvata
+        """
+        _, ricicli, *lunghezze, cursore = _INTESTAZIONE_STATO.unpack_from(self.dati)
+        carte = []
+        for byte in self.dati[_INTESTAZIONE_STATO.size:]:
+            carta = carte_per_codice[byte & _CODICE]
+            carta.visibile = byte >= _VISIBILE
+            carte.append(carta)
+        pile = []
+        inizio = 0
+        for lunghezza in lunghezze:
+            pile.append(carte[inizio:inizio + lunghezza])
+            inizio += lunghezza
+        return ricicli, cursore, pile
+
+    def memoria_stimata(self) -> int:
+        """Stima in byte la memoria occupata dallo stato salvato"""
+        return sys.getsizeof(self) + sys.getsizeof(self.dati)
+
+class GiocoSolitario:
+    """Classe principale che gestisce la logica del gioco"""
+    def __init__(self, limite_undo: int | None = None, distribuisci: bool = True,
+                 seed: int | None = None, regole: Regole | None = None):
+        """
+        :param limite_undo: Numero massimo di stati conservati per undo/redo
+                            (None = illimitato, 0 = undo disabilitato)
+        :param distribuisci: Se False crea un tavolo vuoto (usato per ripristinare partite salvate)
+        :param seed: Seme casuale della distribuzione (None = casuale). Con lo stesso seed
+                     e le stesse mosse la partita si riproduce identica
+        :param regole: Variante delle regole (None = pesca da una carta, ricicli illimitati,
+                       punteggio standard)
+        """
+        self.regole = regole or REGOLE_STANDARD
+        # Le regole sono specializzate una volta per variante: i percorsi critici leggono
+        # valori già pronti invece di controllare le opzioni a ogni mossa
+        self._regole = compila(self.regole)
+        self._punti = self._regole.punti
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.mazzo = Mazzo(random.Random(self.seed)) if distribuisci else None
+        self.tableau: list[PilaTableau] = [PilaTableau() for _ in range(7)] 
+        self.fondazioni: dict[Seme, PilaFondazione] = {
+            seme: PilaFondazione() for seme in Seme
+        }
+        self.stock = PilaStock()  # Stock e scarti, separati dal cursore
+        self.limite_undo = limite_undo
+        # Stack per undo/redo: con un limite gli stati più vecchi vengono scartati
+        self.stati_undo: deque[StatoGioco] = deque(maxlen=limite_undo)
+        self.stati_redo: deque[StatoGioco] = deque(maxlen=limite_undo)
+        self.tempo_inizio = None
+        self.punteggio = self._punti.iniziale
+        self.ricicli = 0  # Numero di ricicli degli scarti, determina il rimescolamento
+        self.registro_mosse = bytearray()  # Mosse codificate con models.mosse.codifica_mossa
+        self.verboso = True  # Se False non stampa messaggi (partite headless)
+        self._esplorazioni: list[tuple[StatoGioco | None, int, int, int]] = []  # Stack di esplora()/ritira()
+        # Contatori aggiornati a ogni mossa: vittoria e autocompletamento si verificano in O(1)
+        # (la dimensione degli scarti è il cursore dello stock)
+        self.carte_in_fondazione = 0
+        self.carte_coperte = 0  # Carte coperte nel tableau
+        self.controllo_contatori = CONTROLLO_CONTATORI
+        self._bus: BusEventi | None = None  # Creato alla prima iscrizione (vedi models/eventi.py)
+        if distribuisci:
+            self._distribuisci_carte()
+
+    
+    def iscrivi(self, osservatore, *tipi: type):
+        """
+        Iscrive un osservatore agli eventi della partita (tutti, o solo i tipi indicati di
+        models.eventi). Restituisce la funzione che annulla l'iscrizione
+        """
+        if self._bus is None:
+            self._bus = BusEventi()
+        return self._bus.iscrivi(osservatore, *tipi)
+
+    def __getstate__(self):
+        """Stato per pickle e copy: gli osservatori non seguono la partita (spesso non sono serializzabili)"""
+        stato = self.__dict__.copy()
+        stato['_bus'] = None
+        return stato
+
+    def __setstate__(self, stato):
+        self.__dict__.update(stato)
+        self._bus = None
+
+    def _registra(self, mossa: Mossa):
+        """Aggiunge una mossa al registro della partita"""
+        self.registro_mosse += codifica_mossa(mossa)
+
+    def applica_mossa(self, mossa: Mossa) -> bool:
+        """Esegue una mossa nel formato dei comandi della CLI"""
+        if mossa.tipo == MUOVI:
+            return self.muovi_carta(mossa.sorgente, mossa.destinazione, mossa.conteggio)
+        if mossa.tipo == PESCA:
+            self.pesca_dallo_stock()
+            return True
+        if mossa.tipo == AUTOCOMPLETA:
+            return self.autocompletamento()
+        if mossa.tipo == ANNULLA:
+            return self.annulla()
+        if mossa.tipo == RIPETI:
+            return self.ripeti()
+        return False
+
+    @property
+    def ricicli_residui(self) -> int:
+        """Ricicli dello stock ancora consentiti dalle regole (molto grande se illimitati)"""
+        return max(0, self._regole.ricicli_massimi - self.ricicli)
+
+    @property
+    def scarti(self) -> list[Carta]:
+        """Carte negli scarti, dal fondo alla cima (copia in sola lettura)"""
+        return self.stock.scarti()
+
+    def copia(self, limite_undo: int | None = 0) -> 'GiocoSolitario':
+        """Copia indipendente della posizione corrente (senza undo/redo), per ricerca e simulazioni"""
+        copia = GiocoSolitario(limite_undo=limite_undo, distribuisci=False, seed=self.seed,
+                               regole=self.regole)
+        copia.verboso = False
+
+        def duplica(carte: list[Carta]) -> list[Carta]:
+            nuove = []
+            for carta in carte:
+                nuova = Carta(carta.seme, carta.valore)
+                nuova.visibile = carta.visibile
+                nuove.append(nuova)
+            return nuove
+
+        for pila, originale in zip(copia.tableau, self.tableau):
+            pila.carte = duplica(originale.carte)
+            pila.inizio_scoperte = originale.inizio_scoperte
+        for seme in Seme:
+            copia.fondazioni[seme].carte = duplica(self.fondazioni[seme].carte)
+        copia.stock.carte = duplica(self.stock.carte)
+        copia.stock.cursore = self.stock.cursore
+        copia.ricicli = self.ricicli
+        copia.carte_in_fondazione = self.carte_in_fondazione
+        copia.carte_coperte = self.carte_coperte
+        copia.punteggio = self.punteggio
+        copia.tempo_inizio = self.tempo_inizio
+        return copia
+
+    def esplora(self, mossa: Mossa) -> bool:
+        """
+        Esegue una mossa che può essere ritirata con ritira() senza penalità.
+        Pensato per la ricerca su una copia della partita (vedi copia())
+        """
+        if mossa.tipo == PESCA and self.stock.conteggio_stock():
+            # Una pesca senza riciclo si ritira rimettendo il cursore dov'era
+            stato = None
+        else:
+            stato = StatoGioco(self.tableau, self.fondazioni, self.stock, self.ricicli, self.punteggio)
+        self._esplorazioni.append((stato, self.punteggio, len(self.registro_mosse), self.stock.cursore))
+        return self.applica_mossa(mossa)
+
+    def ritira(self):
+        """Ritira l'ultima mossa eseguita con esplora()"""
+        stato, punteggio, lunghezza_registro, cursore = self._esplorazioni.pop()
+        if stato is None:
+            self.stock.cursore = cursore
+        else:
+            self._ripristina_stato(stato)
+        self.punteggio = punteggio
+        del self.registro_mosse[lunghezza_registro:]
+
+    def _prossime_in_fondazione(self) -> dict[int, str]:
+        """Codici delle carte che possono salire in fondazione, con il nome della fondazione che le accoglie"""
+        prossime = {}
+        vuota = None
+        for nome, pila in zip(_NOMI_FONDAZIONI_IN_ORDINE, self.fondazioni.values()):
+            if pila.carte:
+                codice = pila.carte[-1].codice
+                if codice % 13 != 12:
+                    prossime[codice + 1] = nome
+            elif vuota is None:
+                vuota = nome
+        if vuota is not None:
+            for asso in _ASSI:
+                prossime.setdefault(asso, vuota)
+        return prossime
+
+    def mosse_legali(self, dalle_fondazioni: bool = True, solo_utili: bool = False) -> list[Mossa]:
+        """
+        Restituisce le mosse valide nella posizione corrente.
+        Le mosse equivalenti verso colonne (o fondazioni) vuote sono proposte una sola volta
+        e i re già alla base di una colonna non vengono spostati su colonne vuote.
+
+        :param dalle_fondazioni: Se False esclude le mosse dalle fondazioni al tableau
+        :param solo_utili: Se True esclude gli spostamenti tra colonne che non scoprono nulla:
+                           la carta che resterebbe in cima era già scoperta e non può andare
+                           in fondazione (evita le oscillazioni tra colonne equivalenti)
+        """
+        prossime = self._prossime_in_fondazione()
+        cime, colonna_vuota = self._cime_tableau()
+        mosse = self._mosse_dagli_scarti(prossime, cime, colonna_vuota)
+
+        # Dal tableau
+        for i, pila in enumerate(self.tableau):
+            carte = pila.carte
+            if not carte:
+                continue
+            sorgente = NOMI_TABLEAU[i]
+            fondazione = prossime.get(carte[-1].codice)
+            if fondazione:
+                mosse.append(Mossa(MUOVI, sorgente, fondazione))
+
+            # Sequenze valide di carte scoperte a partire dalla cima
+            lunghezza = len(carte)
+            for conteggio in range(1, pila.lunghezza_sequenza() + 1):
+                if solo_utili and conteggio < lunghezza:
+                    # Utile solo se scopre una carta coperta o una che può salire in fondazione
+                    sotto = carte[-conteggio - 1]
+                    if sotto.visibile and sotto.codice not in prossime:
+                        continue
+                codice = carte[-conteggio].codice
+                compatibili = PUO_STARE_SOPRA[codice]
+                for j, destinazione, cima in cime:
+                    if j != i and compatibili[cima]:
+                        mosse.append(Mossa(MUOVI, sorgente, destinazione, conteggio))
+                if colonna_vuota and codice % 13 == 12 and conteggio < lunghezza:
+                    mosse.append(Mossa(MUOVI, sorgente, colonna_vuota, conteggio))
+
+        # Dalle fondazioni
+        if dalle_fondazioni:
+            for seme, pila in self.fondazioni.items():
+                carta = pila.carta_in_cima()
+                if carta is None:
+                    continue
+                compatibili = PUO_STARE_SOPRA[carta.codice]
+                for _, nome, cima in cime:
+                    if compatibili[cima]:
+                        mosse.append(Mossa(MUOVI, NOMI_FONDAZIONI[seme], nome))
+                if colonna_vuota and carta.valore == Valore.RE:
+                    mosse.append(Mossa(MUOVI, NOMI_FONDAZIONI[seme], colonna_vuota))
+
+        if self._puo_pescare():
+            mosse.append(Mossa(PESCA))
+        return mosse
+
+    def mosse_dopo_pesca(self, precedenti: list[Mossa]) -> list[Mossa]:
+        """
+        Mosse legali dopo una pesca, ricavate da quelle della posizione precedente (con gli
+        stessi filtri): la pesca cambia solo stock e scarti, quindi si ricalcolano soltanto
+        le mosse dagli scarti e la pesca
+        """
+        mosse = self._mosse_dagli_scarti(self._prossime_in_fondazione(), *self._cime_tableau())
+        mosse += [mossa for mossa in precedenti if mossa.sorgente != 'scarti' and mossa.tipo != PESCA]
+        if self._puo_pescare():
+            mosse.append(Mossa(PESCA))
+        return mosse
+
+    def _cime_tableau(self) -> tuple[list[tuple[int, str, int]], str | None]:
+        """
+        Cime scoperte delle colonne (indice, nome, codice), le uniche carte su cui appoggiarne
+        altre, e nome della prima colonna vuota
+        """
+        cime = []
+        colonna_vuota = None
+        for j, pila in enumerate(self.tableau):
+            carte = pila.carte
+            if not carte:
+                if colonna_vuota is None:
+                    colonna_vuota = NOMI_TABLEAU[j]
+            elif carte[-1].visibile:
+                cime.append((j, NOMI_TABLEAU[j], carte[-1].codice))
+        return cime, colonna_vuota
+
+    def _mosse_dagli_scarti(self, prossime: dict[int, str], cime: list[tuple[int, str, int]],
+                            colonna_vuota: str | None) -> list[Mossa]:
+        """Mosse della cima degli scarti verso fondazioni e colonne"""
+        mosse = []
+        carta = self.stock.carta_in_cima()
+        if carta:
+            fondazione = prossime.get(carta.codice)
+            if fondazione:
+                mosse.append(Mossa(MUOVI, 'scarti', fondazione))
+            compatibili = PUO_STARE_SOPRA[carta.codice]
+            for _, nome, cima in cime:
+                if compatibili[cima]:
+                    mosse.append(Mossa(MUOVI, 'scarti', nome))
+            if colonna_vuota and carta.codice % 13 == 12:
+                mosse.append(Mossa(MUOVI, 'scarti', colonna_vuota))
+        return mosse
+
+    def _puo_pescare(self) -> bool:
+        """Lo stock ha ancora carte, o gli scarti si possono riciclare"""
+        return bool(self.stock.conteggio_stock()
+                    or (self.stock.cursore and self.ricicli < self._regole.ricicli_massimi))
+
+    def chiave_posizione(self) -> bytes:
+        """Chiave compatta della disposizione delle carte (senza punteggio e tempo), per cache e tabelle hash"""
+        chiave = bytearray()
+        for pila in self.tableau:
+            chiave.extend(carta.codice | 0x80 if carta.visibile else carta.codice for carta in pila.carte)
+            chiave.append(0xFF)
+        for seme in Seme:
+            chiave.append(len(self.fondazioni[seme]))
+        chiave.extend(carta.codice for carta in self.stock.carte)
+        chiave.append(self.stock.cursore)
+        return bytes(chiave)
+
+    def chiave_canonica(self) -> bytes:
+        """
+        Chiave della posizione a meno delle simmetrie, per deduplicare le posizioni nelle ricerche.
+        Le colonne sono ordinate per contenuto, quindi le posizioni che differiscono solo per
+        l'ordine delle colonne o per la colonna vuota scelta da un re hanno la stessa chiave;
+        i ricicli contano solo finché cambiano il seguito della partita (ricicli rimasti con
+        un limite, rimescolamento di almeno due carte). Due posizioni con la stessa chiave
+        hanno le stesse continuazioni e la stessa valutazione, ma le mosse nominano colonne
+        diverse: per le cache di mosse serve chiave_posizione()
+        """
+        colonne = sorted([bytes([carta.codice | 0x80 if carta.visibile else carta.codice for carta in pila.carte])
+                          for pila in self.tableau])
+        chiave = bytearray(b'\xff'.join(colonne))
+        chiave.append(0xFF)
+        for seme in Seme:
+            chiave.append(len(self.fondazioni[seme]))
+        # Il tallone non ha simmetrie: l'ordine sotto la cima degli scarti decide quali carte
+        # diventano giocabili, quindi restano ordine e cursore
+        tallone = self.stock.carte
+        chiave.extend(carta.codice for carta in tallone)
+        chiave.append(self.stock.cursore)
+        if self._regole.regole.limite_ricicli is not None:
+            if tallone:
+                chiave.append(self.ricicli_residui)
+        elif self._regole.rimescola_scarti and len(tallone) > 1:
+            # Il rimescolamento del prossimo riciclo dipende dal numero di ricicli
+            chiave.extend(min(self.ricicli, 0xFFFF).to_bytes(2, 'little'))
+        return bytes(chiave)
+
+    @strumentato('salva_stato')
+    def _salva_stato(self):
+        """Salva lo stato corrente del gioco nello stack undo"""
+        if self.limite_undo == 0:
+            return
+        stato = StatoGioco(
+            self.tableau,
+            self.fondazioni,
+            self.stock,
+            self.ricicli,
+            self.punteggio
+        )
+        self.stati_undo.append(stato)
+        self.stati_redo.clear()
+    
+    def annulla(self):
+        """Annulla l'ultima mossa"""
+        if not self.stati_undo:
+            return False
+        self._registra(Mossa(ANNULLA))
+        
+        # Salva lo stato corrente nello stack redo
+        stato_corrente = StatoGioco(
+            self.tableau,
+            self.fondazioni,
+            self.stock,
+            self.ricicli,
+            self.punteggio
+        )
+        self.stati_redo.append(stato_corrente)
+        
+        # Ripristina lo stato precedente
+        stato = self.stati_undo.pop()
+        self._ripristina_stato(stato)
+        
+        # Penalità punteggio per undo (o punteggio precedente, se il sistema lo prevede)
+        if self._punti.annulla is None:
+            self.punteggio = stato.punteggio
+        else:
+            self.punteggio = max(self._punti.minimo, self.punteggio + self._punti.annulla)
+        
+        if self._bus is not None:
+            self._bus.pubblica(MossaAnnullata(self.punteggio))
+        return True
+
+    def ripeti(self):
+        """Ripete l'ultima mossa annullata"""
+        if not self.stati_redo:
+            return False
+        self._registra(Mossa(RIPETI))
+        
+        # Salva lo stato corrente nello stack undo
+        stato_corrente = StatoGioco(
+            self.tableau,
+            self.fondazioni,
+            self.stock,
+            self.ricicli,
+            self.punteggio
+        )
+        self.stati_undo.append(stato_corrente)
+        
+        # Ripristina lo stato successivo
+        stato = self.stati_redo.pop()
+        self._ripristina_stato(stato)
+        if self._punti.annulla is None:
+            self.punteggio = stato.punteggio
+
+        if self._bus is not None:
+            self._bus.pubblica(MossaRipetuta(self.punteggio))
+            if self.carte_in_fondazione == 52:
+                self._bus.pubblica(PartitaVinta(self.punteggio))
+        return True
+    
+    def _ripristina_stato(self, stato: StatoGioco):
+        """Ripristina lo stato del gioco da uno stato salvato, compresa la visibilità di ogni carta"""
+        # Le mosse non creano né distruggono carte: lo stato usa le stesse carte della posizione attuale
+        carte_per_codice = [None] * 52
+        for carte in self._tutte_le_pile():
+            for carta in carte:
+                carte_per_codice[carta.codice] = carta
+        self.ricicli, self.stock.cursore, pile = stato.pile(carte_per_codice)
+
+        self.carte_coperte = 0
+        for pila, carte in zip(self.tableau, pile):
+            pila.carte = carte
+            pila.ricalcola_scoperte()
+            self.carte_coperte += pila.inizio_scoperte
+        self.carte_in_fondazione = 0
+        for seme, carte in zip(SEMI, pile[7:11]):
+            self.fondazioni[seme].carte = carte
+            self.carte_in_fondazione += len(carte)
+        self.stock.carte = pile[11]
+
+    def _tutte_le_pile(self) -> list[list[Carta]]:
+        """Liste di carte di colonne, fondazioni (ordine di SEMI) e tallone"""
+        pile = [pila.carte for pila in self.tableau]
+        pile += [self.fondazioni[seme].carte for seme in SEMI]
+        pile.append(self.stock.carte)
+        return pile
+
+    def memoria_stimata(self) -> int:
+        """Stima in byte la memoria occupata dalla partita, stack undo/redo compresi"""
+        totale = sys.getsizeof(self)
+        totale += sum(sys.getsizeof(pila.carte) for pila in self.tableau)
+        totale += sum(sys.getsizeof(pila.carte) for pila in self.fondazioni.values())
+        totale += sys.getsizeof(self.stock.carte)
+        totale += 52 * _DIMENSIONE_CARTA
+        for stati in (self.stati_undo, self.stati_redo):
+            totale += sys.getsizeof(stati)
+            totale += sum(stato.memoria_stimata() for stato in stati)
+        return totale
+
+    def _distribuisci_carte(self):
+        """Distribuisce le carte per iniziare il gioco"""
+        for i in range(7):
+            for j in range(i + 1):
+                carta = self.mazzo.pesca()
+                if j == i:  # Ultima carta della colonna è visibile
+                    carta.gira()
+                else:
+                    self.carte_coperte += 1
+                self.tableau[i].aggiungi_carta(carta)
+        
+        # Le carte rimanenti vanno nello stock
+        while not self.mazzo.e_vuoto():
+            carta = self.mazzo.pesca()
+            carta.gira()  # Le carte nello stock sono coperte
+            self.stock.aggiungi_carta(carta)
+        
+        # Avvia il timer di gioco
+        self.tempo_inizio = time.time()
+    
+    def pesca_dallo_stock(self):
+        """Pesca una carta dallo stock"""
+        self._registra(Mossa(PESCA))
+        self._salva_stato()
+        
+        if not self.stock.conteggio_stock():
+            if self.stock.conteggio_scarti() and self.ricicli < self._regole.ricicli_massimi:
+                self._ripristina_stock()
+            else:
+                return
+        
+        cursore = self.stock.cursore
+        cima = self.stock.pesca(self._regole.carte_per_pesca)
+        if cima:
+            # Aggiorna punteggio per aver pescato
+            self.punteggio += self._punti.pesca
+            if self._bus is not None:
+                self._bus.pubblica(StockPescato(self.stock.cursore - cursore, cima, self.punteggio))
+
+    def _ripristina_stock(self):
+        """Ripristina lo stock dagli scarti (mescolandoli)"""
+        if not self.stock.conteggio_scarti():
+            return
+        
+        # Lo stock è vuoto, quindi tutto il tallone sono scarti: si mescola sul posto.
+        # Il rimescolamento dipende solo da seed e numero di ricicli,
+        # così un replay delle stesse mosse produce lo stesso ordine.
+        # Con l'ordine classico gli scarti tornano nello stock nell'ordine in cui sono stati pescati
+        if self._regole.rimescola_scarti:
+            random.Random(self.seed * 1000 + self.ricicli).shuffle(self.stock.carte)
+        self.ricicli += 1
+        self.stock.ricicla()
+        
+        # Penalità punteggio per riciclo scarti
+        self.punteggio = max(self._punti.minimo, self.punteggio + self._punti.riciclo)
+        if self._bus is not None:
+            self._bus.pubblica(StockRiciclato(self.ricicli, self.punteggio))
+
+    def autocompletamento(self) -> bool:
+        """Tenta di completare automaticamente il gioco spostando tutte le carte possibili nelle fondazioni"""
+        if not self._puo_autocompletare():
+            return False
+        
+        self._registra(Mossa(AUTOCOMPLETA))
+        self._salva_stato()
+        
+        mosse = self.mosse_autocompletamento()
+        for mossa in mosse:
+            pila = self.tableau[int(mossa.sorgente[7:]) - 1]
+            self.fondazioni[_SEME_FONDAZIONE[mossa.destinazione]].aggiungi_carta(pila.rimuovi_carta())
+        self.carte_in_fondazione += len(mosse)
+        self.punteggio += self._punti.tableau_fondazione * len(mosse)
+        if self._bus is not None:
+            for mossa in mosse:
+                self._bus.pubblica(CartaSpostata(mossa.sorgente, mossa.destinazione, 1, self.punteggio))
+            self._pubblica_vittoria()
+        return bool(mosse)
+
+    def mosse_autocompletamento(self) -> list[Mossa]:
+        """
+        Restituisce, senza eseguirle, le mosse verso le fondazioni che l'autocompletamento
+        farebbe, nello stesso ordine delle passate sulle colonne 1-7 (da cui dipende in quale
+        fondazione vuota finisce ciascun asso). Lista vuota se l'autocompletamento non è permesso.
+
+        Ogni carta è esaminata una volta sola: una coda ordinata per (passata, colonna) contiene
+        le cime pronte per la fondazione del loro seme, mentre le cime che aspettano la carta
+        precedente del seme restano in attesa finché questa non sale in fondazione.
+        Con tallone vuoto e nessuna carta coperta le mosse portano sempre alla vittoria
+        (vedi vittoria_certa()).
+        """
+        if not self._puo_autocompletare():
+            return []
+
+        # Fondazione che contiene ciascun seme, altezza raggiunta e (passata, colonna)
+        # dell'ultima carta del seme salita durante l'autocompletamento
+        fondazione_del_seme = {}
+        altezze = dict.fromkeys(Seme, 0)
+        libere = []
+        for seme, pila in self.fondazioni.items():
+            if pila.carte:
+                fondazione_del_seme[pila.carte[0].seme] = seme
+                altezze[pila.carte[0].seme] = len(pila.carte)
+            else:
+                libere.append(seme)
+        ultima_salita = dict.fromkeys(Seme, (0, -1))
+
+        colonne = [list(pila.carte) for pila in self.tableau]
+        pronte: list[tuple[int, int]] = []  # Heap di (passata, colonna)
+        in_attesa: dict[tuple[Seme, int], tuple[int, int]] = {}  # (seme, valore) -> (colonna, passata)
+
+        def accoda(colonna: int, passata: int):
+            """Accoda la cima della colonna, scoperta dalla passata indicata"""
+            carta = colonne[colonna][-1]
+            valore = carta.codice % 13
+            if altezze[carta.seme] != valore:
+                in_attesa[(carta.seme, valore)] = (colonna, passata)
+                return
+            passata_salita, colonna_salita = ultima_salita[carta.seme]
+            # La carta precedente è già in fondazione quando la passata arriva a questa colonna?
+            disponibile = passata_salita if colonna_salita < colonna else passata_salita + 1
+            heapq.heappush(pronte, (max(passata, disponibile), colonna))
+
+        for colonna, carte in enumerate(colonne):
+            if carte:
+                accoda(colonna, 0)
+
+        mosse = []
+        while pronte:
+            passata, colonna = heapq.heappop(pronte)
+            carta = colonne[colonna].pop()
+            if carta.seme not in fondazione_del_seme:
+                fondazione_del_seme[carta.seme] = libere.pop(0)
+            mosse.append(Mossa(MUOVI, NOMI_TABLEAU[colonna], NOMI_FONDAZIONI[fondazione_del_seme[carta.seme]]))
+            altezze[carta.seme] += 1
+            ultima_salita[carta.seme] = (passata, colonna)
+
+            # Ogni colonna sposta al massimo una carta per passata
+            if colonne[colonna]:
+                accoda(colonna, passata + 1)
+            successiva = in_attesa.pop((carta.seme, altezze[carta.seme]), None)
+            if successiva:
+                accoda(*successiva)
+        return mosse
+
+    def vittoria_certa(self) -> bool:
+        """
+        Con tallone vuoto e tutte le carte scoperte la partita è vinta: ogni colonna è una
+        sequenza decrescente e la cima di valore minore può sempre salire in fondazione.
+        Un risolutore può fermare la ricerca e completare con mosse_autocompletamento()
+        """
+        return not self.stock.carte and not self.carte_coperte
+    
+    def _puo_autocompletare(self) -> bool:
+        """Verifica se l'autocompletamento è permesso (scarti vuoti e tutte le carte scoperte)"""
+        if self.controllo_contatori:
+            self.verifica_contatori()
+        return not self.stock.conteggio_scarti() and not self.carte_coperte
+
+    def _scopri_cima(self, pila: PilaTableau):
+        """Scopre l'ultima carta di una colonna del tableau, se è coperta"""
+        if pila.scopri_cima():
+            self.carte_coperte -= 1
+            if self._bus is not None:
+                self._bus.pubblica(CartaScoperta(NOMI_TABLEAU[self.tableau.index(pila)], pila.carte[-1]))
+
+    def _pubblica_spostamento(self, sorgente: str, destinazione: str, conteggio: int = 1):
+        """Pubblica lo spostamento appena eseguito (solo se la partita ha osservatori)"""
+        if self._bus is not None:
+            self._bus.pubblica(CartaSpostata(sorgente, destinazione, conteggio, self.punteggio))
+
+    def _pubblica_vittoria(self):
+        """Pubblica la vittoria se l'ultima mossa ha completato le fondazioni"""
+        if self._bus is not None and self.carte_in_fondazione == 52:
+            self._bus.pubblica(PartitaVinta(self.punteggio))
+
+    def ricalcola_contatori(self):
+        """Ricalcola da zero i contatori incrementali (dopo aver composto la posizione a mano)"""
+        for pila in self.tableau:
+            pila.ricalcola_scoperte()
+        self.carte_in_fondazione = sum(len(pila) for pila in self.fondazioni.values())
+        self.carte_coperte = sum(pila.inizio_scoperte for pila in self.tableau)
+
+    def verifica_contatori(self):
+        """Confronta i contatori incrementali con un ricalcolo completo e solleva RuntimeError se differiscono"""
+        attesi = (sum(len(pila) for pila in self.fondazioni.values()),
+                  sum(1 for pila in self.tableau for carta in pila.carte if not carta.visibile))
+        if (self.carte_in_fondazione, self.carte_coperte) != attesi:
+            raise RuntimeError(
+                f"Contatori incoerenti: fondazioni {self.carte_in_fondazione} (attese {attesi[0]}), "
+                f"coperte {self.carte_coperte} (attese {attesi[1]})")
+        for nome, pila in zip(NOMI_TABLEAU, self.tableau):
+            inizio = pila.inizio_scoperte
+            if any(not carta.visibile for carta in pila.carte[inizio:]) or (inizio and pila.carte[inizio - 1].visibile):
+                raise RuntimeError(f"Inizio delle carte scoperte di {nome} non valido: {inizio}")
+    
+    @strumentato('muovi_carta', _tipo_mossa)
+    def muovi_carta(self, sorgente: str, destinazione: str, conteggio: int) -> bool:
+        """
+        Sposta una carta o una sequenza di carte
+
+        :param sorgente: Origine ('tableau1-7', 't1-7', '1-7', 'scarti', 's', 'foundation_<seme>', 'f_<seme>', '<seme>')
+        :param destinazione: Destinazione ('tableau1-7', 't1-7', '1-7', 'foundation_<seme>', 'f_<seme>', '<seme>')
+        :param conteggio: Numero di carte da spostare (solo per tableau)
+        :return: True se la mossa è valida ed è stata eseguita
+        """
+
+        self._registra(Mossa(MUOVI, sorgente, destinazione, conteggio))
+        self._salva_stato()
+
+        # Movimento da fondazione a tableau
+        if sorgente.startswith('fondazione_') and destinazione.startswith('tableau'):
+            # Estrai il seme dalla sorgente
+            seme = _SEME_FONDAZIONE.get(sorgente.lower())
+            if seme is None:
+                return False
+
+            pila_fondazione = self.fondazioni[seme]
+            if not pila_fondazione.carte:
+                return False
+
+            carta_da_spostare = pila_fondazione.carta_in_cima()
+
+            # Ottieni la pila di destinazione
+            idx_dest = int(destinazione[7:]) - 1
+            if idx_dest < 0 or idx_dest >= 7:
+                return False
+
+            pila_destinazione = self.tableau[idx_dest]
+
+            # Verifica le regole per lo spostamento
+            carta_dest_in_cima = pila_destinazione.carta_in_cima()
+            if carta_dest_in_cima is None:
+                # Solo i re possono essere posizionati su un tableau vuoto
+                if carta_da_spostare.valore != Valore.RE:
+                    return False
+            else:
+                # Colori alternati e valore inferiore di uno
+                if not carta_da_spostare.puo_stare_sopra(carta_dest_in_cima):
+                    return False
+
+            # Esegui lo spostamento
+            carta_mossa = pila_fondazione.rimuovi_carta()
+            pila_destinazione.aggiungi_carta(carta_mossa)
+            self.carte_in_fondazione -= 1
+
+            # Aggiorna il punteggio (penalità per spostare dalla fondazione)
+            self.punteggio = max(self._punti.minimo, self.punteggio + self._punti.fondazione_tableau)
+            self._pubblica_spostamento(sorgente, destinazione)
+            if self.verboso:
+                print(f"Spostata 1 carta da {sorgente} a {destinazione}.")
+            return True
+        
+        # Movimento verso fondazione (sempre 1 carta)
+        if destinazione.startswith('fondazione_'):
+            pila_sorgente, carta_sorgente = self._get_sorgente(sorgente)
+            if not carta_sorgente:
+                if self.verboso:
+                    print(f"Sorgente non valida: {sorgente}. Nessuna carta disponibile.")
+                return False
+            
+            pila_destinazione = self._get_destinazione(destinazione)
+            if pila_destinazione is None:
+                if self.verboso:
+                    print(f"ERRORE: Impossibile trovare la pila di destinazione per {destinazione}")
+                return False
+
+            # Verifica validità mossa
+            carta_fondazione_in_cima = pila_destinazione.carta_in_cima()
+            if carta_fondazione_in_cima is None:
+                if carta_sorgente.valore != Valore.ASSO:
+                    return False
+            elif not carta_sorgente.puo_stare_su_fondazione(carta_fondazione_in_cima):
+                return False
+            
+            # Esegui il movimento
+            if sorgente == 'scarti':
+                carta_mossa = self.stock.rimuovi_carta()
+                pila_destinazione.aggiungi_carta(carta_mossa)
+                self.carte_in_fondazione += 1
+                self.punteggio += self._punti.scarti_fondazione
+                self._pubblica_spostamento(sorgente, destinazione)
+            elif sorgente.startswith('tableau'):
+                idx = int(sorgente[7:]) - 1
+                carta_mossa = self.tableau[idx].rimuovi_carta()
+                pila_destinazione.aggiungi_carta(carta_mossa)
+                self.carte_in_fondazione += 1
+                self.punteggio += self._punti.tableau_fondazione
+                self._pubblica_spostamento(sorgente, destinazione)
+                
+                # Rivela l'ultima carta se la colonna non è vuota
+                self._scopri_cima(self.tableau[idx])
+            
+            self._pubblica_vittoria()
+            if self.verboso:
+                print(f"Spostata 1 carta da {sorgente} a {destinazione}.")
+            return True
+        
+        # Movimento verso tableau
+        elif destinazione.startswith('tableau'):
+            pila_sorgente, carta_sorgente = self._get_sorgente(sorgente)
+            if not carta_sorgente:
+                if self.verboso:
+                    print(f"Sorgente non valida: {sorgente}. Nessuna carta disponibile.")
+                return False
+            
+            pila_destinazione = self._get_destinazione(destinazione)
+            if pila_destinazione is None:
+                if self.verboso:
+                    print(f"ERRORE: Impossibile trovare la pila di destinazione per {destinazione}")
+                return False
+
+            # Spostamento singola carta (conteggio = 1)
+            if conteggio == 1:
+                # Verifica validità mossa
+                carta_destinazione_in_cima = pila_destinazione.carta_in_cima()
+                if carta_destinazione_in_cima is None:
+                    if carta_sorgente.valore != Valore.RE:
+                        return False
+                elif not carta_sorgente.puo_stare_sopra(carta_destinazione_in_cima):
+                    return False
+                
+                # Esegui il movimento
+                if sorgente == 'scarti':
+                    carta_mossa = self.stock.rimuovi_carta()
+                    pila_destinazione.aggiungi_carta(carta_mossa)
+                    self.punteggio += self._punti.scarti_tableau
+                    self._pubblica_spostamento(sorgente, destinazione)
+                elif sorgente.startswith('tableau'):
+                    idx = int(sorgente[7:]) - 1
+                    carta_mossa = self.tableau[idx].rimuovi_carta()
+                    pila_destinazione.aggiungi_carta(carta_mossa)
+                    self._pubblica_spostamento(sorgente, destinazione)
+                    
+                    # Rivela l'ultima carta se la colonna non è vuota
+                    self._scopri_cima(self.tableau[idx])
+                
+                if self.verboso:
+                    print(f"Spostata 1 carta da {sorgente} a {destinazione}.")
+                return True
+            
+            # Spostamento multiplo carte (conteggio > 1)
+            elif conteggio > 1:
+                if not sorgente.startswith('tableau'):
+                    return False
+                    
+                idx = int(sorgente[7:]) - 1
+                pila_sorgente = self.tableau[idx]
+                
+                # Verifica che le carte siano scoperte e formino una sequenza valida
+                if not pila_sorgente.e_sequenza_valida(conteggio):
+                    return False
+
+                # Verifica che la prima carta possa essere posizionata sul target
+                prima_carta_da_spostare = pila_sorgente.carte[-conteggio]
+                carta_destinazione_in_cima = pila_destinazione.carta_in_cima()
+
+                if carta_destinazione_in_cima is None:
+                    if prima_carta_da_spostare.valore != Valore.RE:
+                        return False
+                elif not prima_carta_da_spostare.puo_stare_sopra(carta_destinazione_in_cima):
+                    return False
+                
+                # Esegui il movimento
+                pila_sorgente.sposta_sequenza(pila_destinazione, conteggio)
+                self._pubblica_spostamento(sorgente, destinazione, conteggio)
+                
+                # Rivela l'ultima carta se la colonna non è vuota
+                self._scopri_cima(self.tableau[idx])
+                
+                if self.verboso:
+                    print(f"Spostate {conteggio} carte da {sorgente} a {destinazione}.")
+                return True
+        
+        return False
+
+    def _get_sorgente(self, sorgente: str) -> tuple[Pila | None, Carta | None]:
+        """Restituisce la pila e la carta sorgente"""
+        
+        if sorgente == 'scarti':
+            carta = self.stock.carta_in_cima()
+            if not carta:
+                return None, None
+            return self.stock, carta
+        
+        if sorgente.startswith('tableau'):
+            idx = int(sorgente[7:]) - 1
+            if idx < 0 or idx >= 7 or not self.tableau[idx].carte:
+                return None, None
+            return self.tableau[idx], self.tableau[idx].carta_in_cima()
+        
+        if sorgente.startswith('fondazione_'):
+            seme = _SEME_FONDAZIONE.get(sorgente.lower())
+            if seme is None:
+                return None, None
+            return self.fondazioni[seme], self.fondazioni[seme].carta_in_cima()
+        
+        return None, None
+    
+    def _get_destinazione(self, destinazione: str) -> Pila | None:
+        """Restituisce la pila di destinazione"""
+        
+        if destinazione.startswith('tableau'):
+            idx = int(destinazione[7:]) - 1
+            if idx < 0 or idx >= 7:
+                return None
+            return self.tableau[idx]
+        
+        if destinazione.startswith('fondazione_'):
+            seme = _SEME_FONDAZIONE.get(destinazione.lower())
+            return self.fondazioni[seme] if seme is not None else None
+        
+        return None
+    
+    def get_tempo_trascorso(self) -> int:
+        """Restituisce il tempo trascorso in secondi"""
+        if not self.tempo_inizio:
+            return 0
+        return int(time.time() - self.tempo_inizio)
+    
+    def formatta_tempo(self, secondi: int) -> str:
+        """Formatta i secondi in HH:MM:SS"""
+        return str(timedelta(seconds=secondi))
+    
+    def ha_vinto(self) -> bool:
+        """Verifica se il giocatore ha vinto"""
+        if self.controllo_contatori:
+            self.verifica_contatori()
+        return self.carte_in_fondazione == 52
+    
+    def get_stato_gioco(self) -> dict:
+        """Restituisce lo stato corrente del gioco per la visualizzazione"""
+        return {
+            'tableau': [{'carte': pila.carte, 'conteggio': len(pila)} for pila in self.tableau],
+            'fondazioni': {seme.name: {'in_cima': pila.carta_in_cima(), 'conteggio': len(pila)} 
+                            for seme, pila in self.fondazioni.items()},
+            'scarti': self.stock.carta_in_cima(),  # Mostra solo l'ultima carta degli scarti
+            'conteggio_stock': self.stock.conteggio_stock(),
+            'conteggio_scarti': self.stock.conteggio_scarti(),
+            'punteggio': self.punteggio,
+            'tempo': self.get_tempo_trascorso()
+        }
+
+    def calcola_punteggio_finale(self, trascorso: int | None = None) -> int:
+        """Calcola il punteggio finale con bonus/penalità di tempo"""
+        if not self._punti.bonus_finali:
+            return self.punteggio
+        if trascorso is None:
+            trascorso = self.get_tempo_trascorso()
+        minuti = trascorso // 60
+        
+        # Punteggio base
+        punteggio_finale = self.punteggio
+        
+        # Bonus completamento
+        punteggio_finale += 100
+        
+        # Bonus tempo
+        if minuti < 5:
+            punteggio_finale += 350
+        elif minuti < 10:
+            punteggio_finale += 250
+        elif minuti < 15:
+            punteggio_finale += 150
+        elif minuti < 20:
+            punteggio_finale += 50
+        
+        # Penalità tempo (dopo 20 minuti)
+        if trascorso > 1200:  # 20 minuti
+            punteggio_finale -= ((trascorso - 1200) // 30) # 1 punto ogni 30 secondi 
+        
+        return max(0, punteggio_finale)
     
\ No newline at end of file
@@ -0,0 +1,184 @@
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("models/lotti.py richiede NumPy, dipendenza opzionale non inclusa in "
+                      "requirements.txt: pip install numpy") from e
+from models.carte import SEMI
+from models.gioco import GiocoSolitario, NOMI_TABLEAU, NOMI_FONDAZIONI
+from models.mosse import Mossa, MUOVI, PESCA
+from models.suggerimenti import PESO_FONDAZIONE, PESO_COPERTA, PESO_COLONNA_VUOTA, PESO_CARTA_STOCK
+
+# Rappresentazione a lotti di N partite in array NumPy di forma fissa, per valutare
+# molte posizioni insieme (simulazioni, difficoltà, addestramento di politiche).
+# Le carte sono codificate con Carta.codice (seme * 13 + valore), -1 = nessuna carta.
+#
+# Spazio delle mosse (indice piatto, uguale per tutte le partite del lotto):
+#     0                pesca
+#     1-7              scarti -> colonna j
+#     8                scarti -> fondazione
+#     9-15             colonna i -> fondazione
+#     16-43            fondazione del seme s -> colonna j       16 + s * 7 + j
+#     44-680           colonna i -> colonna j, k carte           44 + (i * 7 + j) * 13 + k - 1
+
+ALTEZZA_COLONNA = 19  # 6 carte coperte + 13 scoperte
+DIMENSIONE_TALLONE = 24
+VUOTO = -1
+
+MOSSA_PESCA = 0
+MOSSE_SCARTI_TABLEAU = 1
+MOSSA_SCARTI_FONDAZIONE = 8
+MOSSE_TABLEAU_FONDAZIONE = 9
+MOSSE_FONDAZIONE_TABLEAU = 16
+MOSSE_TABLEAU_TABLEAU = 44
+NUMERO_MOSSE = MOSSE_TABLEAU_TABLEAU + 7 * 7 * 13
+
+# Nelle tabelle l'indice 52 rappresenta "nessuna carta" (ed è sempre rifiutato)
+_NESSUNA = 52
+_CODICI = np.arange(52)
+_VALORE = np.append(_CODICI % 13, -1)
+_SEME = np.append(_CODICI // 13, 0)
+_ROSSA = np.append(_CODICI // 13 < 2, False)  # CUORI e QUADRI
+
+def _tabella_puo_stare_sopra() -> np.ndarray:
+    """Tabella [carta, carta sotto]: colori alternati e valore inferiore di uno"""
+    rossa = _ROSSA[:52]
+    tabella = np.zeros((53, 53), dtype=bool)
+    tabella[:52, :52] = (rossa[:, None] != rossa[None, :]) & (_VALORE[:52, None] + 1 == _VALORE[None, :52])
+    return tabella
+
+_PUO_STARE_SOPRA = _tabella_puo_stare_sopra()
+
+class LottoStati:
+    """N posizioni di gioco in array NumPy di forma fissa"""
+    def __init__(self, n: int):
+        self.tableau = np.full((n, 7, ALTEZZA_COLONNA), VUOTO, dtype=np.int8)
+        self.lunghezze = np.zeros((n, 7), dtype=np.int8)
+        self.coperte = np.zeros((n, 7), dtype=np.int8)  # Carte coperte (= indice della prima scoperta)
+        self.maschera_coperte = np.zeros((n, 7, ALTEZZA_COLONNA), dtype=bool)
+        self.fondazioni = np.zeros((n, 4), dtype=np.int8)  # Altezza raggiunta da ciascun seme
+        self.pila_del_seme = np.full((n, 4), VUOTO, dtype=np.int8)  # Fondazione che contiene il seme
+        self.tallone = np.full((n, DIMENSIONE_TALLONE), VUOTO, dtype=np.int8)  # Scarti + stock
+        self.lunghezza_tallone = np.zeros(n, dtype=np.int8)
+        self.cursore = np.zeros(n, dtype=np.int8)  # tallone[:cursore] sono gli scarti
+        self.ricicli_residui = np.zeros(n, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.lunghezze)
+
+    @classmethod
+    def da_partite(cls, partite: list[GiocoSolitario]) -> 'LottoStati':
+        """Impacchetta le partite negli array del lotto"""
+        lotto = cls(len(partite))
+        for n, gioco in enumerate(partite):
+            for i, pila in enumerate(gioco.tableau):
+                lotto.tableau[n, i, :len(pila.carte)] = [carta.codice for carta in pila.carte]
+                lotto.lunghezze[n, i] = len(pila.carte)
+                lotto.coperte[n, i] = pila.inizio_scoperte
+                lotto.maschera_coperte[n, i, :pila.inizio_scoperte] = True
+            for p, seme in enumerate(SEMI):
+                carte = gioco.fondazioni[seme].carte
+                if carte:
+                    seme_carte = carte[0].codice // 13
+                    lotto.fondazioni[n, seme_carte] = len(carte)
+                    lotto.pila_del_seme[n, seme_carte] = p
+            lotto.tallone[n, :len(gioco.stock.carte)] = [carta.codice for carta in gioco.stock.carte]
+            lotto.lunghezza_tallone[n] = len(gioco.stock.carte)
+            lotto.cursore[n] = gioco.stock.cursore
+            lotto.ricicli_residui[n] = gioco.ricicli_residui
+        return lotto
+
+    def _cime(self) -> tuple[np.ndarray, np.ndarray]:
+        """Carta in cima a ogni colonna (n, 7) e carte scoperte a partire dalla cima (n, 7, 13)"""
+        # Indice nella colonna della carta a profondità r dalla cima
+        posizioni = self.lunghezze[..., None] - 1 - np.arange(13, dtype=np.int8)
+        carte = np.take_along_axis(self.tableau, np.maximum(posizioni, 0), axis=2)
+        dal_cima = np.where(posizioni >= self.coperte[..., None], carte, _NESSUNA).astype(np.intp)
+        return dal_cima[..., 0], dal_cima
+
+    def punteggi(self) -> np.ndarray:
+        """Valutazione euristica di ogni posizione (la stessa di suggerimenti.valuta_posizione)"""
+        return (PESO_FONDAZIONE * self.fondazioni.sum(axis=1, dtype=np.int64)
+                + PESO_COPERTA * self.coperte.sum(axis=1, dtype=np.int64)
+                + PESO_COLONNA_VUOTA * (self.lunghezze == 0).sum(axis=1)
+                + PESO_CARTA_STOCK * self.lunghezza_tallone)
+
+    def mosse_legali(self) -> np.ndarray:
+        """Maschera (n, NUMERO_MOSSE) delle mosse permesse dalle regole in ogni posizione"""
+        n = len(self)
+        righe = np.arange(n)
+        maschera = np.zeros((n, NUMERO_MOSSE), dtype=bool)
+        cima, dal_cima = self._cime()
+        vuote = self.lunghezze == 0
+
+        def accetta(carte: np.ndarray, destinazioni: np.ndarray, vuote: np.ndarray) -> np.ndarray:
+            """La carta può andare sulla colonna (un re su una colonna vuota)"""
+            return _PUO_STARE_SOPRA[carte, destinazioni] | (vuote & (_VALORE[carte] == 12))
+
+        def sale_in_fondazione(carte: np.ndarray) -> np.ndarray:
+            """La carta è la prossima del suo seme in fondazione"""
+            altezze = np.take_along_axis(self.fondazioni, _SEME[carte].reshape(n, -1), axis=1).reshape(carte.shape)
+            return _VALORE[carte] == altezze
+
+        # Pesca: stock non vuoto o ricicli ancora permessi
+        stock = self.lunghezza_tallone.astype(np.int64) - self.cursore
+        maschera[:, MOSSA_PESCA] = (stock > 0) | ((self.cursore > 0) & (self.ricicli_residui > 0))
+
+        # Dagli scarti
+        scarti = np.where(self.cursore > 0, self.tallone[righe, np.maximum(self.cursore.astype(np.intp) - 1, 0)], _NESSUNA)
+        scarti = np.where(scarti < 0, _NESSUNA, scarti).astype(np.intp)
+        maschera[:, MOSSE_SCARTI_TABLEAU:MOSSE_SCARTI_TABLEAU + 7] = accetta(scarti[:, None], cima, vuote)
+        maschera[:, MOSSA_SCARTI_FONDAZIONE] = sale_in_fondazione(scarti[:, None])[:, 0]
+
+        # Dal tableau alle fondazioni
+        maschera[:, MOSSE_TABLEAU_FONDAZIONE:MOSSE_TABLEAU_FONDAZIONE + 7] = sale_in_fondazione(cima)
+
+        # Dalle fondazioni al tableau: la cima della fondazione del seme s è s * 13 + altezza - 1
+        altezze = self.fondazioni.astype(np.intp)
+        cime_fondazioni = np.where(altezze > 0, np.arange(4) * 13 + altezze - 1, _NESSUNA)
+        fondazione_tableau = accetta(cime_fondazioni[:, :, None], cima[:, None, :], vuote[:, None, :])
+        maschera[:, MOSSE_FONDAZIONE_TABLEAU:MOSSE_TABLEAU_TABLEAU] = fondazione_tableau.reshape(n, -1)
+
+        # Tra colonne: k carte dalla colonna i se formano una sequenza valida di carte scoperte.
+        # Nella sequenza valori e colori si alternano a partire dalla cima, quindi per ogni coppia
+        # di colonne l'unica profondità candidata è quella con il valore che va sulla destinazione
+        # (un re per le colonne vuote): il controllo resta (n, 7, 7) invece di (n, 7, 7, 13)
+        legami = _PUO_STARE_SOPRA[dal_cima[..., :-1], dal_cima[..., 1:]]
+        sequenza = np.where(vuote, 0, 1 + np.cumprod(legami, axis=2).sum(axis=2))
+        valori_cima = np.where(vuote, 13, _VALORE[cima])
+        rosse_cima = _ROSSA[cima]
+        profondita = valori_cima[:, None, :] - 1 - valori_cima[:, :, None]
+        colore_alterno = (rosse_cima[:, :, None] ^ (profondita & 1).astype(bool)) != rosse_cima[:, None, :]
+        possibili = ((profondita >= 0) & (profondita < sequenza[:, :, None])
+                     & (colore_alterno | vuote[:, None, :])
+                     & ~np.eye(7, dtype=bool))
+        tableau_tableau = possibili[..., None] & (profondita[..., None] == np.arange(13))
+        maschera[:, MOSSE_TABLEAU_TABLEAU:] = tableau_tableau.reshape(n, -1)
+        return maschera
+
+    def _fondazione_per_seme(self, n: int, seme: int) -> str:
+        """Nome della fondazione che contiene (o accoglierebbe) il seme nella posizione n"""
+        pila = self.pila_del_seme[n, seme]
+        if pila < 0:
+            occupate = set(self.pila_del_seme[n].tolist())
+            pila = next(p for p in range(4) if p not in occupate)
+        return NOMI_FONDAZIONI[SEMI[pila]]
+
+    def mossa(self, n: int, indice: int) -> Mossa:
+        """Traduce l'indice di una mossa della posizione n nella Mossa di GiocoSolitario"""
+        if indice == MOSSA_PESCA:
+            return Mossa(PESCA)
+        if indice < MOSSA_SCARTI_FONDAZIONE:
+            return Mossa(MUOVI, 'scarti', NOMI_TABLEAU[indice - MOSSE_SCARTI_TABLEAU])
+        if indice == MOSSA_SCARTI_FONDAZIONE:
+            seme = int(self.tallone[n, self.cursore[n] - 1]) // 13
+            return Mossa(MUOVI, 'scarti', self._fondazione_per_seme(n, seme))
+        if indice < MOSSE_FONDAZIONE_TABLEAU:
+            i = indice - MOSSE_TABLEAU_FONDAZIONE
+            seme = int(self.tableau[n, i, self.lunghezze[n, i] - 1]) // 13
+            return Mossa(MUOVI, NOMI_TABLEAU[i], self._fondazione_per_seme(n, seme))
+        if indice < MOSSE_TABLEAU_TABLEAU:
+            seme, j = divmod(indice - MOSSE_FONDAZIONE_TABLEAU, 7)
+            return Mossa(MUOVI, self._fondazione_per_seme(n, seme), NOMI_TABLEAU[j])
+        coppia, k = divmod(indice - MOSSE_TABLEAU_TABLEAU, 13)
+        i, j = divmod(coppia, 7)
+        return Mossa(MUOVI, NOMI_TABLEAU[i], NOMI_TABLEAU[j], k + 1)
@@ -0,0 +1,185 @@
+import functools
+import os
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# Strumentazione dei percorsi caldi: istogrammi di latenza e conteggi.
+#
+# Con SOLITARIO_METRICHE=1 (o main.py --metriche) ogni chiamata strumentata registra
+# la propria durata nell'istogramma (nome, etichetta) del registro globale. Gli
+# istogrammi hanno intervalli fissi in scala logaritmica (10 per decade da 100 ns a
+# 100 s): registrare una misura costa una ricerca binaria e i percentili si stimano
+# interpolando nell'intervallo, con un errore relativo inferiore al 26%.
+# Disattivata, una funzione strumentata costa un controllo del flag e una chiamata in
+# più, e misura() restituisce un contesto vuoto già costruito.
+# Le pause dell'interfaccia fatte con pausa() non entrano nelle misure in corso.
+
+ATTIVE = os.environ.get('SOLITARIO_METRICHE') == '1'
+
+INTERVALLI_PER_DECADE = 10
+LIMITI = [1e-7 * 10 ** (i / INTERVALLI_PER_DECADE) for i in range(9 * INTERVALLI_PER_DECADE + 1)]
+PERCENTILI = (0.50, 0.95, 0.99)
+
+_CONTESTO_VUOTO = nullcontext()
+_pause_totali = 0.0  # Secondi passati in pausa(), sottratti dalle misure che li contengono
+
+class Istogramma:
+    """Distribuzione delle durate (in secondi) di un'operazione"""
+    __slots__ = ('conteggi', 'totale', 'somma', 'minimo', 'massimo')
+
+    def __init__(self):
+        self.conteggi = [0] * (len(LIMITI) + 1)  # L'ultimo intervallo raccoglie le durate oltre LIMITI[-1]
+        self.totale = 0
+        self.somma = 0.0
+        self.minimo = float('inf')
+        self.massimo = 0.0
+
+    def registra(self, secondi: float):
+        """Aggiunge una misura"""
+        self.conteggi[bisect_left(LIMITI, secondi)] += 1
+        self.totale += 1
+        self.somma += secondi
+        if secondi < self.minimo:
+            self.minimo = secondi
+        if secondi > self.massimo:
+            self.massimo = secondi
+
+    def percentile(self, q: float) -> float:
+        """Stima del quantile q (0-1), interpolata linearmente nell'intervallo che lo contiene"""
+        if not self.totale:
+            return 0.0
+        obiettivo = q * self.totale
+        cumulato = 0
+        for i, conteggio in enumerate(self.conteggi):
+            if conteggio and cumulato + conteggio >= obiettivo:
+                inferiore = LIMITI[i - 1] if i else 0.0
+                superiore = LIMITI[i] if i < len(LIMITI) else self.massimo
+                stima = inferiore + (superiore - inferiore) * (obiettivo - cumulato) / conteggio
+                return min(max(stima, self.minimo), self.massimo)
+            cumulato += conteggio
+        return self.massimo
+
+    def media(self) -> float:
+        return self.somma / self.totale if self.totale else 0.0
+
+class RegistroMetriche:
+    """Istogrammi delle operazioni strumentate, indicizzati per (nome, etichetta)"""
+    def __init__(self):
+        self.istogrammi: dict[tuple[str, str], Istogramma] = {}
+
+    def registra(self, nome: str, etichetta: str, secondi: float):
+        """Aggiunge una misura all'istogramma (nome, etichetta), creandolo se serve"""
+        chiave = (nome, etichetta)
+        istogramma = self.istogrammi.get(chiave)
+        if istogramma is None:
+            istogramma = self.istogrammi[chiave] = Istogramma()
+        istogramma.registra(secondi)
+
+    def azzera(self):
+        self.istogrammi.clear()
+
+    def riepilogo(self) -> list[dict]:
+        """Conteggio, media, percentili e massimo di ogni istogramma, in secondi"""
+        righe = []
+        for (nome, etichetta), istogramma in sorted(self.istogrammi.items()):
+            riga = {'nome': nome, 'etichetta': etichetta, 'conteggio': istogramma.totale,
+                    'media': istogramma.media(), 'minimo': istogramma.minimo, 'massimo': istogramma.massimo}
+            for q in PERCENTILI:
+                riga[f'p{round(q * 100)}'] = istogramma.percentile(q)
+            righe.append(riga)
+        return righe
+
+    def json(self) -> str:
+        """Riepilogo e intervalli non vuoti di ogni istogramma in formato JSON"""
+        import json
+        metriche = []
+        for riga in self.riepilogo():
+            istogramma = self.istogrammi[(riga['nome'], riga['etichetta'])]
+            riga['intervalli'] = [[LIMITI[i] if i < len(LIMITI) else None, conteggio]
+                                  for i, conteggio in enumerate(istogramma.conteggi) if conteggio]
+            metriche.append(riga)
+        return json.dumps({'unita': 'secondi', 'metriche': metriche}, indent=2)
+
+    def prometheus(self) -> str:
+        """Istogrammi nel formato di testo di Prometheus (una famiglia per nome)"""
+        righe = []
+        nomi = sorted({nome for nome, _ in self.istogrammi})
+        for nome in nomi:
+            famiglia = f"solitario_{nome}_secondi"
+            righe.append(f"# HELP {famiglia} Durata di {nome} in secondi")
+            righe.append(f"# TYPE {famiglia} histogram")
+            for (nome_istogramma, etichetta), istogramma in sorted(self.istogrammi.items()):
+                if nome_istogramma != nome:
+                    continue
+                tipo = etichetta.replace('\\', '\\\\').replace('"', '\\"')
+                cumulato = 0
+                for limite, conteggio in zip(LIMITI, istogramma.conteggi):
+                    cumulato += conteggio
+                    righe.append(f'{famiglia}_bucket{{tipo="{tipo}",le="{limite:.3g}"}} {cumulato}')
+                righe.append(f'{famiglia}_bucket{{tipo="{tipo}",le="+Inf"}} {istogramma.totale}')
+                righe.append(f'{famiglia}_sum{{tipo="{tipo}"}} {istogramma.somma!r}')
+                righe.append(f'{famiglia}_count{{tipo="{tipo}"}} {istogramma.totale}')
+        return "\n".join(righe) + "\n"
+
+    def salva(self, percorso: str, formato: str = 'json'):
+        """Scrive il registro su file in formato 'json' o 'prometheus'"""
+        testo = self.prometheus() if formato == 'prometheus' else self.json()
+        os.makedirs(os.path.dirname(percorso) or '.', exist_ok=True)
+        with open(percorso, 'w', encoding='utf-8') as file:
+            file.write(testo)
+
+REGISTRO = RegistroMetriche()
+
+class _Cronometro:
+    """Contesto che registra la durata del blocco, pause escluse"""
+    __slots__ = ('nome', 'etichetta', 'inizio', 'pause')
+
+    def __init__(self, nome: str, etichetta: str):
+        self.nome = nome
+        self.etichetta = etichetta
+
+    def __enter__(self):
+        self.pause = _pause_totali
+        self.inizio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        durata = time.perf_counter() - self.inizio - (_pause_totali - self.pause)
+        REGISTRO.registra(self.nome, self.etichetta, durata)
+
+def misura(nome: str, etichetta: str = ''):
+    """Contesto che misura il blocco se le metriche sono attive (altrimenti non fa nulla)"""
+    if not ATTIVE:
+        return _CONTESTO_VUOTO
+    return _Cronometro(nome, etichetta)
+
+def strumentato(nome: str, etichetta=None):
+    """
+    Decoratore che misura ogni chiamata della funzione quando le metriche sono attive.
+    etichetta è una stringa fissa o una funzione che riceve gli stessi argomenti della
+    chiamata e restituisce l'etichetta (valutata solo a metriche attive)
+    """
+    def decoratore(funzione):
+        @functools.wraps(funzione)
+        def strumentata(*args, **kwargs):
+            if not ATTIVE:
+                return funzione(*args, **kwargs)
+            with _Cronometro(nome, etichetta(*args, **kwargs) if callable(etichetta) else etichetta or ''):
+                return funzione(*args, **kwargs)
+        return strumentata
+    return decoratore
+
+def pausa(secondi: float):
+    """time.sleep() che non viene conteggiato nelle misure in corso"""
+    global _pause_totali
+    inizio = time.perf_counter()
+    time.sleep(secondi)
+    _pause_totali += time.perf_counter() - inizio
+
+def formatta_durata(secondi: float) -> str:
+    """Durata con l'unità più leggibile (ns, µs, ms, s)"""
+    for unita, scala in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if secondi >= scala:
+            return f"{secondi / scala:.3g} {unita}"
+    return f"{secondi / 1e-9:.3g} ns"
@@ -0,0 +1,61 @@
+from typing import Iterator, NamedTuple
+
+# Tipi di mossa: coincidono con i comandi della CLI
+PESCA = 'p'
+MUOVI = 'm'
+AUTOCOMPLETA = 'a'
+ANNULLA = 'u'
+RIPETI = 'r'
+
+_TIPI = [PESCA, MUOVI, AUTOCOMPLETA, ANNULLA, RIPETI]
+_INDICE_TIPO = {tipo: i for i, tipo in enumerate(_TIPI)}
+
+# Nomi delle pile nel formato usato da GiocoSolitario.muovi_carta
+NOMI_PILE = (['scarti'] + [f'tableau{i}' for i in range(1, 8)] +
+             ['fondazione_cuori', 'fondazione_quadri', 'fondazione_fiori', 'fondazione_picche'])
+_INDICE_PILA = {nome: i for i, nome in enumerate(NOMI_PILE)}
+_PILA_SCONOSCIUTA = 15
+
+class Mossa(NamedTuple):
+    """Una mossa della partita, nel formato dei comandi della CLI"""
+    tipo: str
+    sorgente: str = ''
+    destinazione: str = ''
+    conteggio: int = 1
+
+    def __str__(self):
+        if self.tipo == MUOVI:
+            if self.conteggio == 1:
+                return f"m {self.sorgente} {self.destinazione}"
+            return f"m {self.sorgente} {self.destinazione} {self.conteggio}"
+        return self.tipo
+
+def codifica_mossa(mossa: Mossa) -> bytes:
+    """
+    Codifica una mossa in 2 byte:
+    tipo (4 bit) | sorgente (4 bit), destinazione (4 bit) | conteggio (4 bit)
+    """
+    if mossa.tipo != MUOVI:
+        return bytes((_INDICE_TIPO[mossa.tipo] << 4, 0))
+
+    sorgente = _INDICE_PILA.get(mossa.sorgente, _PILA_SCONOSCIUTA)
+    destinazione = _INDICE_PILA.get(mossa.destinazione, _PILA_SCONOSCIUTA)
+    # Conteggi fuori da 0-15 falliscono comunque come i valori limite
+    conteggio = min(max(mossa.conteggio, 0), 15)
+    return bytes((_INDICE_TIPO[MUOVI] << 4 | sorgente, destinazione << 4 | conteggio))
+
+def decodifica_mosse(dati: bytes) -> Iterator[Mossa]:
+    """Decodifica una sequenza di mosse codificate con codifica_mossa"""
+    for i in range(0, len(dati) - 1, 2):
+        primo, secondo = dati[i], dati[i + 1]
+        tipo = _TIPI[primo >> 4]
+        if tipo != MUOVI:
+            yield Mossa(tipo)
+            continue
+        sorgente, destinazione = primo & 0x0F, secondo >> 4
+        yield Mossa(
+            MUOVI,
+            NOMI_PILE[sorgente] if sorgente < len(NOMI_PILE) else '?',
+            NOMI_PILE[destinazione] if destinazione < len(NOMI_PILE) else '?',
+            secondo & 0x0F
+        )
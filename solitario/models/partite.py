@@ -0,0 +1,152 @@
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Callable, Optional
+from models.codifica import codifica_partita, decodifica_partita
+from models.gioco import GiocoSolitario
+from models.mosse import decodifica_mosse
+from models.regole import Regole
+
+class GestorePartite:
+    """
+    Ospita molte partite nello stesso processo entro un budget di memoria.
+    Le partite inattive vengono serializzate nel formato compatto di models/codifica.py
+    (posizione e registro delle mosse) e rimosse dalla RAM, per poi essere ripristinate
+    in modo trasparente al comando successivo. Gli sfratti per inattività sono controllati
+    a ogni creazione e accesso; gli osservatori iscritti non seguono la partita sfrattata.
+    """
+    def __init__(self, budget_memoria: Optional[int] = None,
+                 timeout_inattivita: Optional[float] = 300.0,
+                 limite_undo: Optional[int] = 50):
+        """
+        :param budget_memoria: Byte massimi occupati dalle partite residenti (None = nessun limite)
+        :param timeout_inattivita: Secondi dopo i quali una partita inattiva viene sfrattata
+        :param limite_undo: Profondità massima degli stack undo/redo di ogni partita
+        """
+        self.budget_memoria = budget_memoria
+        self.timeout_inattivita = timeout_inattivita
+        self.limite_undo = limite_undo
+        self._residenti: OrderedDict[int, GiocoSolitario] = OrderedDict()  # Ordine LRU
+        self._memoria: dict[int, int] = {}
+        self._ultimo_accesso: dict[int, float] = {}
+        self._sfrattate: dict[int, tuple[bytes, bool]] = {}  # Dati codificati e flag verboso
+        self._id = count(1)
+        self.sfratti = 0
+        self.ripristini = 0
+
+    def crea_partita(self, regole: Optional[Regole] = None) -> int:
+        """Crea una nuova partita (con la variante di regole indicata) e ne restituisce l'identificativo"""
+        id_partita = next(self._id)
+        gioco = GiocoSolitario(limite_undo=self.limite_undo, regole=regole)
+        self._residenti[id_partita] = gioco
+        self._memoria[id_partita] = gioco.memoria_stimata()
+        self._ultimo_accesso[id_partita] = time.monotonic()
+        self._applica_budget(escludi=id_partita)
+        self.sfratta_inattive()
+        return id_partita
+
+    def ottieni(self, id_partita: int) -> GiocoSolitario:
+        """Restituisce la partita, ripristinandola se era stata sfrattata"""
+        gioco = self._residenti.get(id_partita)
+        if gioco is None:
+            if id_partita not in self._sfrattate:
+                raise KeyError(f"Partita inesistente: {id_partita}")
+            gioco = self._ripristina(*self._sfrattate[id_partita])
+            del self._sfrattate[id_partita]
+            self._residenti[id_partita] = gioco
+            self._memoria[id_partita] = gioco.memoria_stimata()
+            self.ripristini += 1
+        else:
+            self._residenti.move_to_end(id_partita)
+        self._ultimo_accesso[id_partita] = time.monotonic()
+        self.sfratta_inattive()
+        return gioco
+
+    def esegui(self, id_partita: int, azione: Callable[[GiocoSolitario], object]):
+        """Esegue un comando su una partita e aggiorna la contabilità della memoria"""
+        gioco = self.ottieni(id_partita)
+        risultato = azione(gioco)
+        self._memoria[id_partita] = gioco.memoria_stimata()
+        self._applica_budget(escludi=id_partita)
+        return risultato
+
+    def chiudi(self, id_partita: int):
+        """Rimuove definitivamente una partita"""
+        self._residenti.pop(id_partita, None)
+        self._sfrattate.pop(id_partita, None)
+        self._memoria.pop(id_partita, None)
+        self._ultimo_accesso.pop(id_partita, None)
+
+    def sfratta(self, id_partita: int) -> int:
+        """Serializza una partita residente e la rimuove dalla RAM. Restituisce i byte occupati"""
+        gioco = self._residenti[id_partita]
+        # Prima la codifica: se fallisce la partita resta residente
+        dati = codifica_partita(gioco, includi_registro=True)
+        self._sfrattate[id_partita] = (dati, gioco.verboso)
+        del self._residenti[id_partita]
+        self._memoria.pop(id_partita, None)
+        self.sfratti += 1
+        return len(dati)
+
+    def _ripristina(self, dati: bytes, verboso: bool) -> GiocoSolitario:
+        """
+        Ricostruisce una partita sfrattata. Undo e redo non sono nel formato compatto: si
+        riottengono riproducendo il registro dal seed, e se la posizione riprodotta non
+        coincide si tiene quella decodificata (senza storico)
+        """
+        decodificata = decodifica_partita(dati, limite_undo=self.limite_undo)
+        gioco = GiocoSolitario(limite_undo=self.limite_undo, seed=decodificata.seed,
+                               regole=decodificata.regole)
+        gioco.verboso = False
+        for mossa in decodifica_mosse(decodificata.registro_mosse):
+            gioco.applica_mossa(mossa)
+        if gioco.chiave_posizione() != decodificata.chiave_posizione():
+            gioco = decodificata
+        gioco.punteggio = decodificata.punteggio
+        gioco.tempo_inizio = decodificata.tempo_inizio
+        gioco.verboso = verboso
+        return gioco
+
+    def sfratta_inattive(self) -> int:
+        """Sfratta tutte le partite inattive da più di timeout_inattivita secondi"""
+        if self.timeout_inattivita is None:
+            return 0
+        limite = time.monotonic() - self.timeout_inattivita
+        sfrattate = 0
+        # Le residenti sono in ordine di ultimo accesso: ci si ferma alla prima ancora attiva
+        for id_partita in list(self._residenti):
+            if self._ultimo_accesso[id_partita] >= limite:
+                break
+            self.sfratta(id_partita)
+            sfrattate += 1
+        return sfrattate
+
+    def memoria_residente(self) -> int:
+        """Byte stimati occupati dalle partite residenti"""
+        return sum(self._memoria.values())
+
+    def _applica_budget(self, escludi: Optional[int] = None):
+        """Sfratta le partite usate meno di recente finché si rientra nel budget"""
+        if self.budget_memoria is None:
+            return
+        occupata = self.memoria_residente()
+        for id_partita in list(self._residenti):
+            if occupata <= self.budget_memoria:
+                break
+            if id_partita == escludi:
+                continue
+            occupata -= self._memoria.get(id_partita, 0)
+            self.sfratta(id_partita)
+
+    def rapporto(self) -> dict:
+        """Restituisce un resoconto di partite residenti, memoria per partita e sfratti"""
+        return {
+            'residenti': len(self._residenti),
+            'sfrattate': len(self._sfrattate),
+            'memoria_residente': self.memoria_residente(),
+            'memoria_sfrattate': sum(len(dati) for dati, _ in self._sfrattate.values()),
+            'budget_memoria': self.budget_memoria,
+            'byte_per_partita': dict(self._memoria),
+            'sfratti': self.sfratti,
+            'ripristini': self.ripristini
+        }
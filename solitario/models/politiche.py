@@ -0,0 +1,142 @@
+import random
+from abc import ABC, abstractmethod
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, PESCA
+from models.suggerimenti import valuta_posizione
+
+# Politiche di gioco automatico.
+#
+# Una politica sceglie la prossima mossa tra le candidate: mosse legali e utili, mai
+# dalle fondazioni al tableau. Le usano i bot (models/bot.py) e le partite simulate
+# della stima Monte Carlo (models/probabilita.py), e attraverso queste la riserva di
+# distribuzioni vincibili e la valutazione della difficoltà.
+
+class Politica(ABC):
+    """Interfaccia delle politiche: sceglie la prossima mossa tra le candidate"""
+    nome = 'politica'
+
+    @abstractmethod
+    def scegli(self, gioco: GiocoSolitario, mosse: list[Mossa], rng: random.Random) -> Mossa:
+        """Mossa da giocare tra le candidate (mai vuote)"""
+
+class PoliticaCasuale(Politica):
+    """Una mossa candidata a caso"""
+    nome = 'casuale'
+
+    def scegli(self, gioco, mosse, rng):
+        return rng.choice(mosse)
+
+class PoliticaPriorita(Politica):
+    """Sceglie a caso tra le mosse con la priorità più alta (numero più basso)"""
+    @abstractmethod
+    def priorita(self, gioco: GiocoSolitario, mossa: Mossa) -> int:
+        """Priorità della mossa: 0 è la più alta"""
+
+    def scegli(self, gioco, mosse, rng):
+        migliori, priorita_migliore = [], None
+        for mossa in mosse:
+            priorita = self.priorita(gioco, mossa)
+            if priorita_migliore is None or priorita < priorita_migliore:
+                migliori, priorita_migliore = [mossa], priorita
+            elif priorita == priorita_migliore:
+                migliori.append(mossa)
+        return migliori[0] if len(migliori) == 1 else rng.choice(migliori)
+
+def scopre_carta(gioco: GiocoSolitario, mossa: Mossa) -> bool:
+    """La mossa lascia in cima alla colonna di partenza una carta coperta"""
+    if not mossa.sorgente.startswith('tableau'):
+        return False
+    pila = gioco.tableau[int(mossa.sorgente[7:]) - 1]
+    return len(pila.carte) - mossa.conteggio == pila.inizio_scoperte > 0
+
+class PoliticaFondazioniPrima(PoliticaPriorita):
+    """Avida: fondazioni, poi dagli scarti al tableau, poi tra colonne, la pesca per ultima"""
+    nome = 'fondazioni'
+
+    def priorita(self, gioco, mossa):
+        if mossa.tipo == PESCA:
+            return 3
+        if mossa.destinazione.startswith('fondazione_'):
+            return 0
+        return 1 if mossa.sorgente == 'scarti' else 2
+
+class PoliticaScopriPrima(PoliticaPriorita):
+    """Prima le mosse che scoprono una carta coperta, poi fondazioni, scarti, il resto e la pesca"""
+    nome = 'scopri'
+
+    def priorita(self, gioco, mossa):
+        if mossa.tipo == PESCA:
+            return 4
+        if scopre_carta(gioco, mossa):
+            return 0
+        if mossa.destinazione.startswith('fondazione_'):
+            return 1
+        return 2 if mossa.sorgente == 'scarti' else 3
+
+class PoliticaEuristica(PoliticaPriorita):
+    """Quella delle simulazioni Monte Carlo: fondazioni, mosse che scoprono una carta, scarti, il resto e la pesca"""
+    nome = 'euristica'
+
+    def priorita(self, gioco, mossa):
+        if mossa.tipo == PESCA:
+            return 4
+        if mossa.destinazione.startswith('fondazione_'):
+            return 0
+        if mossa.sorgente == 'scarti':
+            return 2
+        return 1 if scopre_carta(gioco, mossa) else 3
+
+class PoliticaLookahead(Politica):
+    """
+    Prova ogni mossa candidata e le risposte fino alla profondità indicata (con
+    esplora/ritira) e sceglie quella che porta alla posizione con la valutazione
+    euristica migliore (models/suggerimenti.py); a parità decidono le priorità di
+    PoliticaScopriPrima. Pesca solo quando non ci sono altre mosse
+    """
+    nome = 'lookahead'
+
+    def __init__(self, profondita: int = 3):
+        self.profondita = profondita
+        self._parita = PoliticaScopriPrima()
+
+    def scegli(self, gioco, mosse, rng):
+        # La pesca non cambia la valutazione: si pesca solo senza altre mosse
+        mosse_tavolo = [mossa for mossa in mosse if mossa.tipo != PESCA]
+        if not mosse_tavolo:
+            return mosse[0]
+        migliori, valore_migliore = [], None
+        for mossa in mosse_tavolo:
+            gioco.esplora(mossa)
+            valore = self._valuta(gioco, self.profondita - 1)
+            gioco.ritira()
+            if valore_migliore is None or valore > valore_migliore:
+                migliori, valore_migliore = [mossa], valore
+            elif valore == valore_migliore:
+                migliori.append(mossa)
+        return migliori[0] if len(migliori) == 1 else self._parita.scegli(gioco, migliori, rng)
+
+    def _valuta(self, gioco: GiocoSolitario, profondita: int) -> float:
+        """Valutazione migliore raggiungibile entro la profondità, senza pescare"""
+        valore = valuta_posizione(gioco)
+        if profondita <= 0 or gioco.ha_vinto():
+            return valore
+        for mossa in mosse_candidate(gioco):
+            if mossa.tipo == PESCA:
+                continue
+            gioco.esplora(mossa)
+            valore = max(valore, self._valuta(gioco, profondita - 1))
+            gioco.ritira()
+        return valore
+
+POLITICHE = {politica.nome: politica for politica in
+             (PoliticaCasuale, PoliticaFondazioniPrima, PoliticaScopriPrima, PoliticaEuristica, PoliticaLookahead)}
+
+def mosse_candidate(gioco: GiocoSolitario, prima_della_pesca: list[Mossa] | None = None) -> list[Mossa]:
+    """
+    Mosse tra cui sceglie una politica: utili e mai dalle fondazioni al tableau.
+    Se l'ultima mossa giocata è una pesca, passando le candidate di prima si ricalcolano
+    solo le mosse dagli scarti (GiocoSolitario.mosse_dopo_pesca)
+    """
+    if prima_della_pesca is not None:
+        return gioco.mosse_dopo_pesca(prima_della_pesca)
+    return gioco.mosse_legali(dalle_fondazioni=False, solo_utili=True)
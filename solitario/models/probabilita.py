@@ -0,0 +1,191 @@
+import os
+import random
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+from models.codifica import codifica_partita, decodifica_partita
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, MUOVI, PESCA
+from models.politiche import POLITICHE, PoliticaCasuale, PoliticaEuristica, mosse_candidate
+from models.regole import Regole
+from models.stallo import ControlloStallo
+from models.suggerimenti import mosse_utili
+
+# Stima Monte Carlo della probabilità di vittoria.
+#
+# Le carte che il giocatore non conosce vengono ridistribuite a caso tra le stesse
+# posizioni: le coperte del tableau insieme a quelle dello stock finché lo stock non è
+# stato visto; dopo un riciclo che rimescola gli scarti lo stock si mescola solo al suo
+# interno, senza rimescolamento è già noto. Su ogni distribuzione si gioca una partita
+# veloce con una politica di models/politiche.py (euristica per default). Ogni mossa
+# candidata viene provata sulle stesse distribuzioni: la migliore è quella con più
+# vittorie e la sua frequenza di vittoria è la stima riportata.
+
+PLAYOUT_PREDEFINITI = 200  # Partite simulate per mossa candidata
+MAX_MOSSE = 400  # Oltre questo numero di mosse una partita simulata è considerata persa
+DIMENSIONE_BLOCCO = 25  # Partite simulate per attività inviata al pool
+
+POLITICA_EURISTICA = PoliticaEuristica.nome  # Politiche di models/politiche.py
+POLITICA_CASUALE = PoliticaCasuale.nome
+
+class EsitoStima(NamedTuple):
+    """Risultato di una stima Monte Carlo"""
+    probabilita: float  # Frequenza di vittoria della mossa migliore
+    playout: int  # Partite simulate per mossa
+    migliore: Mossa | None
+    mosse: list[tuple[Mossa, float]]  # Mosse candidate con la loro frequenza di vittoria, dalla migliore
+
+def _gruppi_sconosciuti(gioco: GiocoSolitario) -> list[list[tuple[list, range, bool]]]:
+    """
+    Gruppi di posizioni con carte sconosciute al giocatore, ciascuno (carte, indici da
+    ridistribuire, carte scoperte): le carte si mescolano solo all'interno del proprio gruppo
+    """
+    coperte = [(pila.carte, range(pila.inizio_scoperte), False) for pila in gioco.tableau]
+    stock = (gioco.stock.carte, range(gioco.stock.cursore, len(gioco.stock.carte)), True)
+    if gioco.ricicli == 0:
+        # Lo stock non è ancora stato visto: le sue carte si confondono con le coperte
+        return [coperte + [stock]]
+    if gioco.regole.rimescola_scarti:
+        # Dopo un riciclo si sa quali carte sono nello stock, non in che ordine
+        return [coperte, [stock]]
+    # Lo stock torna nello stesso ordine: è già noto
+    return [coperte]
+
+def determinizza(gioco: GiocoSolitario, rng: random.Random) -> GiocoSolitario:
+    """Copia della partita con le carte sconosciute ridistribuite a caso tra le loro posizioni"""
+    copia = gioco.copia()
+    for posizioni in _gruppi_sconosciuti(copia):
+        sconosciute = [carte[i] for carte, indici, _ in posizioni for i in indici]
+        rng.shuffle(sconosciute)
+        carte_mescolate = iter(sconosciute)
+        for carte, indici, visibile in posizioni:
+            for i in indici:
+                carta = next(carte_mescolate)
+                carta.visibile = visibile
+                carte[i] = carta
+    return copia
+
+def simula(gioco: GiocoSolitario, rng: random.Random, politica: str = POLITICA_EURISTICA,
+           max_mosse: int = MAX_MOSSE) -> bool:
+    """
+    Gioca la partita fino alla fine con la politica indicata (modificandola).
+    La partita è persa quando non ci sono più mosse o quando ControlloStallo la riconosce
+    in stallo (verificato dopo ogni giro dello stock senza progressi)
+    """
+    scelta = POLITICHE[politica]()
+    controllo = ControlloStallo(gioco)
+    mossa = mosse = None
+    for _ in range(max_mosse):
+        if gioco.ha_vinto() or gioco.vittoria_certa():
+            return True
+        mosse = mosse_candidate(gioco, mosse if mossa is not None and mossa.tipo == PESCA else None)
+        if not mosse:
+            return False
+        mossa = scelta.scegli(gioco, mosse, rng)
+        if controllo.ferma(mossa, mosse):
+            return False
+        gioco.applica_mossa(mossa)
+    return False
+
+def _seme_stima(gioco: GiocoSolitario) -> int:
+    """Seme delle distribuzioni casuali: la stessa posizione produce sempre le stesse simulazioni"""
+    return zlib.crc32(gioco.chiave_posizione())
+
+def _simula_blocco(dati: bytes, mossa: Mossa, seme: int, primo: int, quanti: int,
+                   politica: str, max_mosse: int) -> int:
+    """Esegue un blocco di simulazioni dopo la mossa indicata e restituisce le vittorie (eseguito nel pool)"""
+    gioco = decodifica_partita(dati, limite_undo=0)
+    gioco.verboso = False
+    vittorie = 0
+    for indice in range(primo, primo + quanti):
+        rng = random.Random(seme * 1_000_003 + indice)
+        simulata = determinizza(gioco, rng)
+        simulata.applica_mossa(mossa)
+        vittorie += simula(simulata, rng, politica, max_mosse)
+    return vittorie
+
+class StimatoreVittoria:
+    """
+    Stima la probabilità di vittoria e la mossa migliore con simulazioni Monte Carlo
+    su un pool di processi. I risultati sono memorizzati per posizione, ricicli rimasti e
+    variante di regole.
+    Con processi=1 le simulazioni girano nel processo corrente.
+    """
+    def __init__(self, playout: int = PLAYOUT_PREDEFINITI, processi: int | None = None,
+                 politica: str = POLITICA_EURISTICA, max_mosse: int = MAX_MOSSE,
+                 dimensione_blocco: int = DIMENSIONE_BLOCCO, dimensione_cache: int = 256):
+        self.playout = playout
+        self.processi = processi or os.cpu_count() or 1
+        self.politica = politica
+        self.max_mosse = max_mosse
+        self.dimensione_blocco = dimensione_blocco
+        self.dimensione_cache = dimensione_cache
+        self._cache: OrderedDict[tuple[bytes, int, Regole], EsitoStima] = OrderedDict()
+        self._pool = None  # ProcessPoolExecutor, creato alla prima stima che lo richiede
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.chiudi()
+
+    def chiudi(self):
+        """Termina il pool di processi, se è stato avviato"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def stima(self, gioco: GiocoSolitario) -> EsitoStima:
+        """Stima la probabilità di vittoria della posizione e classifica le mosse candidate"""
+        chiave = (gioco.chiave_posizione(), gioco.ricicli_residui, gioco.regole)
+        if chiave in self._cache:
+            self._cache.move_to_end(chiave)
+            return self._cache[chiave]
+
+        if gioco.ha_vinto():
+            esito = EsitoStima(1.0, 0, None, [])
+        else:
+            mosse = [mossa for mossa in mosse_utili(gioco) if mossa.tipo in (MUOVI, PESCA)]
+            vittorie = self._simula(gioco, mosse)
+            classifica = sorted(((mossa, vinte / self.playout) for mossa, vinte in zip(mosse, vittorie)),
+                                key=lambda voce: voce[1], reverse=True)
+            if classifica:
+                esito = EsitoStima(classifica[0][1], self.playout, classifica[0][0], classifica)
+            else:
+                esito = EsitoStima(0.0, self.playout, None, [])
+
+        self._cache[chiave] = esito
+        if len(self._cache) > self.dimensione_cache:
+            self._cache.popitem(last=False)
+        return esito
+
+    def _simula(self, gioco: GiocoSolitario, mosse: list[Mossa]) -> list[int]:
+        """Vittorie per ogni mossa, con le simulazioni divise in blocchi"""
+        dati = codifica_partita(gioco)
+        seme = _seme_stima(gioco)
+        blocchi = [(i, primo, min(self.dimensione_blocco, self.playout - primo))
+                   for i in range(len(mosse))
+                   for primo in range(0, self.playout, self.dimensione_blocco)]
+        argomenti = [(dati, mosse[i], seme, primo, quanti, self.politica, self.max_mosse)
+                     for i, primo, quanti in blocchi]
+
+        if self.processi == 1:
+            risultati = [_simula_blocco(*argomento) for argomento in argomenti]
+        else:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=self.processi)
+            risultati = list(self._pool.map(_simula_blocco, *zip(*argomenti)))
+
+        vittorie = [0] * len(mosse)
+        for (i, _, _), vinte in zip(blocchi, risultati):
+            vittorie[i] += vinte
+        return vittorie
+
+def classifica_distribuzioni(semi: list[int], playout: int = 50, processi: int | None = None,
+                             regole: Regole | None = None) -> list[tuple[int, float]]:
+    """Ordina le distribuzioni iniziali dalla più difficile alla più facile secondo la stima di vittoria"""
+    with StimatoreVittoria(playout=playout, processi=processi) as stimatore:
+        stime = [(seme, stimatore.stima(GiocoSolitario(seed=seme, regole=regole)).probabilita)
+                 for seme in semi]
+    return sorted(stime, key=lambda voce: voce[1])
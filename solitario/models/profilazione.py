@@ -0,0 +1,123 @@
+import io
+import os
+from contextlib import nullcontext
+from datetime import datetime
+
+# Profilazione di una sessione o di un'esecuzione headless con cProfile e tracemalloc.
+#
+# Ogni esecuzione profilata scrive nella cartella dei profili tre file con lo stesso
+# prefisso (nome, data e pid):
+#   <prefisso>.pstats        statistiche binarie di cProfile (python -m pstats, snakeviz)
+#   <prefisso>.txt           funzioni ordinate per tempo cumulativo e per tempo proprio
+#   <prefisso>-memoria.txt   picco di memoria e righe con più allocazioni ancora vive
+# Nelle esecuzioni lunghe il campionatore profila solo una partita ogni N: le altre
+# girano senza alcun costo aggiuntivo. cProfile, pstats e tracemalloc si importano solo
+# quando un profilo viene davvero raccolto.
+
+CARTELLA_PREDEFINITA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profili")
+RIGHE_RAPPORTO = 30  # Funzioni e righe di allocazione riportate nei rapporti di testo
+
+def _filtri_memoria(tracemalloc, cProfile) -> tuple:
+    """Allocazioni del profilatore stesso, escluse dal rapporto di memoria"""
+    return (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    )
+
+class Profilatore:
+    """Contesto che profila il blocco con cProfile e tracemalloc e ne scrive i rapporti"""
+    def __init__(self, nome: str, cartella: str = CARTELLA_PREDEFINITA, righe: int = RIGHE_RAPPORTO):
+        self.nome = nome
+        self.cartella = cartella
+        self.righe = righe
+        self.file: list[str] = []  # Rapporti scritti all'uscita dal blocco
+        self._profilo = None
+        self._traccia_memoria = False
+
+    def __enter__(self):
+        import cProfile
+        import tracemalloc
+        # Se tracemalloc è già attivo (python -X tracemalloc) lo si lascia acceso all'uscita
+        self._traccia_memoria = not tracemalloc.is_tracing()
+        if self._traccia_memoria:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._profilo = cProfile.Profile()
+        self._profilo.enable()
+        return self
+
+    def __exit__(self, *_):
+        import cProfile
+        import tracemalloc
+        self._profilo.disable()
+        istantanea = tracemalloc.take_snapshot().filter_traces(_filtri_memoria(tracemalloc, cProfile))
+        attuale, picco = tracemalloc.get_traced_memory()
+        if self._traccia_memoria:
+            tracemalloc.stop()
+        try:
+            self._scrivi_rapporti(istantanea, attuale, picco)
+        except OSError as e:
+            print(f"Errore nella scrittura del profilo: {e}")
+
+    def _scrivi_rapporti(self, istantanea, attuale: int, picco: int):
+        """Scrive statistiche binarie, rapporto delle funzioni e rapporto delle allocazioni"""
+        import pstats
+        os.makedirs(self.cartella, exist_ok=True)
+        prefisso = os.path.join(self.cartella,
+                                f"{self.nome}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+        self._profilo.dump_stats(f"{prefisso}.pstats")
+
+        testo = io.StringIO()
+        statistiche = pstats.Stats(self._profilo, stream=testo).strip_dirs()
+        for ordinamento in (pstats.SortKey.CUMULATIVE, pstats.SortKey.TIME):
+            statistiche.sort_stats(ordinamento).print_stats(self.righe)
+        with open(f"{prefisso}.txt", 'w', encoding='utf-8') as file:
+            file.write(testo.getvalue())
+
+        with open(f"{prefisso}-memoria.txt", 'w', encoding='utf-8') as file:
+            file.write(f"Memoria tracciata: attuale {attuale / 1024:.1f} KiB, picco {picco / 1024:.1f} KiB\n\n")
+            file.write(f"Righe con più memoria allocata ancora in uso (prime {self.righe}):\n")
+            for statistica in istantanea.statistics('lineno')[:self.righe]:
+                file.write(f"{statistica}\n")
+
+        self.file = [f"{prefisso}.pstats", f"{prefisso}.txt", f"{prefisso}-memoria.txt"]
+
+class CampionatoreProfili:
+    """Profila una partita ogni N di un'esecuzione headless (ogni=0 non profila nulla)"""
+    def __init__(self, nome: str, ogni: int = 1, cartella: str = CARTELLA_PREDEFINITA):
+        self.nome = nome
+        self.ogni = ogni
+        self.cartella = cartella
+        self.profilate = 0
+
+    def partita(self, indice: int):
+        """Contesto per la partita indice: un Profilatore se è campionata, altrimenti vuoto"""
+        if self.ogni <= 0 or indice % self.ogni:
+            return nullcontext()
+        self.profilate += 1
+        return Profilatore(f"{self.nome}-{indice:06d}", self.cartella)
+
+def aggiungi_opzioni(parser):
+    """Aggiunge --profile, --profile-ogni e --profile-cartella alla riga di comando di un esecutore"""
+    parser.add_argument('--profile', action='store_true',
+                        help="profila l'esecuzione con cProfile e tracemalloc e ne salva i rapporti")
+    parser.add_argument('--profile-ogni', type=int, default=1, metavar='N',
+                        help="nelle esecuzioni a partite profila solo una partita ogni N (predefinito 1)")
+    parser.add_argument('--profile-cartella', default=CARTELLA_PREDEFINITA, metavar='CARTELLA',
+                        help="cartella dei rapporti (predefinita data/profili)")
+
+def profilatore(args, nome: str):
+    """Contesto che profila l'intera esecuzione se la riga di comando lo richiede"""
+    if not args.profile:
+        return nullcontext()
+    return Profilatore(nome, args.profile_cartella)
+
+def campionatore(args, nome: str) -> CampionatoreProfili | None:
+    """Campionatore per le esecuzioni a partite, se la riga di comando richiede la profilazione"""
+    if not args.profile:
+        return None
+    return CampionatoreProfili(nome, args.profile_ogni, args.profile_cartella)
@@ -0,0 +1,103 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+# Sistemi di punteggio
+PUNTEGGIO_STANDARD = 'standard'
+PUNTEGGIO_VEGAS = 'vegas'
+
+class Regole(NamedTuple):
+    """Variante delle regole scelta per una partita"""
+    carte_per_pesca: int = 1  # 1 o 3
+    limite_ricicli: int | None = None  # None = ricicli illimitati
+    rimescola_scarti: bool = True  # False = ordine classico: gli scarti tornano nello stock capovolti
+    punteggio: str = PUNTEGGIO_STANDARD
+
+    def testo(self) -> str:
+        """Rappresentazione testuale salvata nel database (nome della variante se è una di quelle note)"""
+        for nome, regole in VARIANTI.items():
+            if regole == self:
+                return nome
+        ricicli = '-' if self.limite_ricicli is None else self.limite_ricicli
+        ordine = 'mescola' if self.rimescola_scarti else 'classico'
+        return f"pesca={self.carte_per_pesca},ricicli={ricicli},ordine={ordine},punteggio={self.punteggio}"
+
+    @classmethod
+    def da_testo(cls, testo: str | None) -> 'Regole':
+        """Ricostruisce le regole da Regole.testo() (None o vuoto = regole standard)"""
+        if not testo:
+            return REGOLE_STANDARD
+        if testo in VARIANTI:
+            return VARIANTI[testo]
+        try:
+            campi = dict(parte.split('=', 1) for parte in testo.split(','))
+            return cls(
+                carte_per_pesca=int(campi['pesca']),
+                limite_ricicli=None if campi['ricicli'] == '-' else int(campi['ricicli']),
+                rimescola_scarti=campi['ordine'] == 'mescola',
+                punteggio=campi['punteggio']
+            )
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Regole non valide: {testo}") from e
+
+REGOLE_STANDARD = Regole()
+
+# Varianti proposte dalla CLI
+VARIANTI = {
+    'standard': REGOLE_STANDARD,
+    'classico': Regole(rimescola_scarti=False),
+    'pesca3': Regole(carte_per_pesca=3, rimescola_scarti=False),
+    'vegas': Regole(carte_per_pesca=3, limite_ricicli=2, rimescola_scarti=False, punteggio=PUNTEGGIO_VEGAS),
+    'vegas1': Regole(carte_per_pesca=1, limite_ricicli=0, rimescola_scarti=False, punteggio=PUNTEGGIO_VEGAS),
+}
+
+class Punti(NamedTuple):
+    """Punti assegnati per ogni azione da un sistema di punteggio"""
+    iniziale: int
+    minimo: int  # Le penalità non portano il punteggio sotto questo valore
+    pesca: int
+    riciclo: int
+    annulla: int | None  # None = l'undo ripristina il punteggio precedente
+    scarti_tableau: int
+    scarti_fondazione: int
+    tableau_fondazione: int
+    fondazione_tableau: int
+    bonus_finali: bool  # Bonus di completamento e di tempo nel punteggio finale
+
+_PUNTI = {
+    PUNTEGGIO_STANDARD: Punti(iniziale=0, minimo=0, pesca=2, riciclo=-20, annulla=-15,
+                              scarti_tableau=10, scarti_fondazione=15, tableau_fondazione=5,
+                              fondazione_tableau=-5, bonus_finali=True),
+    # Vegas: si "paga" il mazzo 52 punti e ogni carta in fondazione ne vale 5
+    PUNTEGGIO_VEGAS: Punti(iniziale=-52, minimo=-52, pesca=0, riciclo=0, annulla=None,
+                           scarti_tableau=0, scarti_fondazione=5, tableau_fondazione=5,
+                           fondazione_tableau=-5, bonus_finali=False),
+}
+
+# Ricicli "illimitati": confronto senza casi particolari per None
+_RICICLI_ILLIMITATI = 2 ** 31
+
+class RegoleCompilate(NamedTuple):
+    """Regole tradotte una volta sola nei valori usati direttamente dal motore di gioco"""
+    regole: Regole
+    carte_per_pesca: int
+    ricicli_massimi: int
+    rimescola_scarti: bool
+    punti: Punti
+
+@lru_cache(maxsize=None)
+def compila(regole: Regole) -> RegoleCompilate:
+    """Valida le regole e le specializza per il motore di gioco (una volta per variante)"""
+    if regole.carte_per_pesca not in (1, 3):
+        raise ValueError(f"Carte per pesca non valide: {regole.carte_per_pesca}")
+    if regole.limite_ricicli is not None and not 0 <= regole.limite_ricicli < 255:
+        raise ValueError(f"Limite ricicli non valido: {regole.limite_ricicli}")
+    if regole.punteggio not in _PUNTI:
+        raise ValueError(f"Sistema di punteggio sconosciuto: {regole.punteggio}")
+
+    return RegoleCompilate(
+        regole=regole,
+        carte_per_pesca=regole.carte_per_pesca,
+        ricicli_massimi=_RICICLI_ILLIMITATI if regole.limite_ricicli is None else regole.limite_ricicli,
+        rimescola_scarti=regole.rimescola_scarti,
+        punti=_PUNTI[regole.punteggio]
+    )
@@ -0,0 +1,61 @@
+import os
+from typing import Iterator, NamedTuple
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, decodifica_mosse
+from models.regole import Regole, REGOLE_STANDARD
+
+class ReplaySalvato(NamedTuple):
+    """Replay di una partita conclusa con i risultati dichiarati al salvataggio"""
+    sessione_id: int
+    seed: int
+    mosse: bytes
+    punteggio: int
+    durata: int
+    vinto: bool
+    regole: Regole = REGOLE_STANDARD
+
+class EsitoVerifica(NamedTuple):
+    """Risultato della verifica di un replay"""
+    sessione_id: int
+    valido: bool
+    punteggio: int
+    vinto: bool
+
+def _nuova_partita(seed: int, regole: Regole | None) -> GiocoSolitario:
+    """Crea una partita headless per la riproduzione"""
+    gioco = GiocoSolitario(seed=seed, regole=regole)
+    gioco.verboso = False
+    return gioco
+
+def riproduci(seed: int, mosse: bytes, regole: Regole | None = None) -> GiocoSolitario:
+    """Riproduce una partita alla massima velocità e restituisce lo stato finale"""
+    gioco = _nuova_partita(seed, regole)
+    for mossa in decodifica_mosse(mosse):
+        gioco.applica_mossa(mossa)
+    return gioco
+
+def passi_replay(seed: int, mosse: bytes, regole: Regole | None = None) -> Iterator[tuple[Mossa | None, GiocoSolitario]]:
+    """Riproduce una partita una mossa alla volta (la prima coppia è la distribuzione iniziale)"""
+    gioco = _nuova_partita(seed, regole)
+    yield None, gioco
+    for mossa in decodifica_mosse(mosse):
+        gioco.applica_mossa(mossa)
+        yield mossa, gioco
+
+def verifica_replay(replay: ReplaySalvato) -> EsitoVerifica:
+    """Riproduce un replay e controlla che punteggio ed esito coincidano con quelli salvati"""
+    gioco = riproduci(replay.seed, replay.mosse, replay.regole)
+    vinto = gioco.ha_vinto()
+    punteggio = gioco.calcola_punteggio_finale(replay.durata)
+    valido = vinto == bool(replay.vinto) and punteggio == replay.punteggio
+    return EsitoVerifica(replay.sessione_id, valido, punteggio, vinto)
+
+def verifica_tutti(replay: list[ReplaySalvato], processi: int | None = None) -> list[EsitoVerifica]:
+    """Verifica in parallelo un elenco di replay su un pool di processi"""
+    if not replay:
+        return []
+    processi = processi or os.cpu_count() or 1
+    blocco = max(1, len(replay) // (processi * 4))
+    from concurrent.futures import ProcessPoolExecutor  # Importato solo quando serve il pool
+    with ProcessPoolExecutor(max_workers=processi) as pool:
+        return list(pool.map(verifica_replay, replay, chunksize=blocco))
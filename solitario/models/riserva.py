@@ -0,0 +1,190 @@
+import os
+import random
+import sqlite3
+import threading
+from typing import NamedTuple
+from database.db import connetti
+from models.difficolta import (ValutazioneDifficolta, valuta_distribuzione, inserisci_valutazioni,
+                               valuta_semi, TENTATIVI_PREDEFINITI)
+from models.gioco import GiocoSolitario
+from models.regole import Regole, REGOLE_STANDARD
+
+# Riserva di distribuzioni vincibili.
+#
+# Un produttore in background valuta nuove distribuzioni su un pool di processi con
+# models/difficolta.py (le valutazioni finiscono anche in difficolta_distribuzioni) e
+# mette in riserva solo quelle vinte almeno una volta: la sequenza di mosse vincente
+# (verificabile con replay.riproduci) è la prova che la distribuzione è risolvibile. Una nuova partita preleva un seed già verificato con una sola query,
+# e quando la riserva scende sotto la soglia minima il produttore la riempie di nuovo.
+
+SOGLIA_MINIMA = 10  # Sotto questo numero di seed la riserva viene riempita
+DIMENSIONE_RISERVA = 30  # Seed per variante di regole a riserva piena
+SEMI_PER_BLOCCO = 2  # Seed verificati per attività inviata al pool
+
+class DistribuzioneVerificata(NamedTuple):
+    """Distribuzione vinta almeno una volta dal risolutore"""
+    seed: int
+    difficolta: float  # Frazione di partite simulate perse (0 = facile, 1 = quasi impossibile)
+    soluzione: bytes  # Mosse codificate della partita vincente
+
+def verifica_distribuzione(seed: int, regole: Regole | None = None,
+                           tentativi: int = TENTATIVI_PREDEFINITI) -> DistribuzioneVerificata | None:
+    """
+    Valuta la distribuzione con models.difficolta.valuta_distribuzione.
+    Restituisce la distribuzione con la sua difficoltà se almeno una partita è vinta, altrimenti None
+    """
+    return _verificata(valuta_distribuzione(seed, regole, tentativi))
+
+def _verificata(valutazione: ValutazioneDifficolta) -> DistribuzioneVerificata | None:
+    """Distribuzione da mettere in riserva: la difficoltà è la frazione di partite perse"""
+    if not valutazione.soluzione:
+        return None
+    return DistribuzioneVerificata(valutazione.seed, valutazione.perse, valutazione.soluzione)
+
+class RiservaDistribuzioni:
+    """
+    Seed verificati vincibili, salvati nella tabella distribuzioni_vincibili con la loro
+    difficoltà. Il prelievo non esegue mai il risolutore: se la riserva è vuota la partita
+    parte da un seed casuale e il riempimento prosegue in background.
+    """
+    def __init__(self, soglia_minima: int = SOGLIA_MINIMA, dimensione: int = DIMENSIONE_RISERVA,
+                 processi: int | None = None, tentativi: int = TENTATIVI_PREDEFINITI):
+        self.soglia_minima = soglia_minima
+        self.dimensione = dimensione
+        self.processi = processi or max(1, (os.cpu_count() or 1) - 1)
+        self.tentativi = tentativi
+        self._pool = None  # ProcessPoolExecutor, creato al primo riempimento
+        self._produttori: dict[Regole, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._chiusa = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.chiudi()
+
+    def chiudi(self):
+        """Ferma i produttori e termina il pool di processi"""
+        with self._lock:
+            self._chiusa = True
+            produttori = list(self._produttori.values())
+        # I blocchi non ancora avviati vengono annullati: restano solo quelli in corso
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        for produttore in produttori:
+            produttore.join()
+        self._pool = None
+
+    def conteggio(self, regole: Regole | None = None) -> int:
+        """Seed disponibili per la variante di regole"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM distribuzioni_vincibili WHERE regole = ?",
+                               ((regole or REGOLE_STANDARD).testo(),))
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return 0
+
+    def preleva(self, regole: Regole | None = None) -> DistribuzioneVerificata | None:
+        """Toglie dalla riserva la distribuzione verificata più vecchia (None se la riserva è vuota)"""
+        regole = regole or REGOLE_STANDARD
+        distribuzione = None
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                # Lettura e cancellazione nella stessa transazione: due processi non prelevano lo stesso seed
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("""
+                    SELECT id, seed, difficolta, soluzione FROM distribuzioni_vincibili
+                    WHERE regole = ? ORDER BY id LIMIT 1
+                """, (regole.testo(),))
+                riga = cursor.fetchone()
+                if riga:
+                    cursor.execute("DELETE FROM distribuzioni_vincibili WHERE id = ?", (riga[0],))
+                    distribuzione = DistribuzioneVerificata(*riga[1:])
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+        self.rifornisci(regole)
+        return distribuzione
+
+    def nuova_partita(self, regole: Regole | None = None, limite_undo: int | None = None) -> GiocoSolitario:
+        """Crea una partita da un seed della riserva, o da un seed casuale se la riserva è vuota"""
+        distribuzione = self.preleva(regole)
+        seed = distribuzione.seed if distribuzione else None
+        return GiocoSolitario(limite_undo=limite_undo, seed=seed, regole=regole)
+
+    def rifornisci(self, regole: Regole | None = None):
+        """Avvia il riempimento in background se la riserva è sotto la soglia minima"""
+        regole = regole or REGOLE_STANDARD
+        with self._lock:
+            produttore = self._produttori.get(regole)
+            if self._chiusa or (produttore is not None and produttore.is_alive()):
+                return
+            if self.conteggio(regole) >= self.soglia_minima:
+                return
+            produttore = threading.Thread(target=self._riempi, args=(regole,), daemon=True)
+            self._produttori[regole] = produttore
+            produttore.start()
+
+    def riempi(self, regole: Regole | None = None) -> int:
+        """Riempie la riserva fino alla dimensione configurata (bloccante). Restituisce i seed aggiunti"""
+        return self._riempi(regole or REGOLE_STANDARD)
+
+    def _riempi(self, regole: Regole) -> int:
+        """Verifica seed casuali a blocchi finché la riserva non è piena"""
+        from concurrent.futures import CancelledError
+        aggiunte = 0
+        rng = random.Random()
+        while not self._chiusa:
+            mancanti = self.dimensione - self.conteggio(regole)
+            if mancanti <= 0:
+                break
+            # Il risolutore vince circa metà delle distribuzioni: si verificano il doppio dei seed mancanti
+            semi = [rng.randrange(2 ** 32) for _ in range(mancanti * 2)]
+            try:
+                for valutazioni in self._verifica(semi, regole):
+                    aggiunte += self._salva(valutazioni, regole)
+                    if self._chiusa:
+                        break
+            except CancelledError:
+                break
+        return aggiunte
+
+    def _verifica(self, semi: list[int], regole: Regole):
+        """Distribuisce i seed ai processi e restituisce le valutazioni blocco per blocco"""
+        blocchi = [semi[i:i + SEMI_PER_BLOCCO] for i in range(0, len(semi), SEMI_PER_BLOCCO)]
+        if self.processi == 1:
+            return (valuta_semi(blocco, regole.testo(), self.tentativi) for blocco in blocchi)
+        with self._lock:
+            if self._chiusa:
+                return iter(())
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=self.processi)
+            futures = [self._pool.submit(valuta_semi, blocco, regole.testo(), self.tentativi)
+                       for blocco in blocchi]
+        return (future.result() for future in futures)
+
+    def _salva(self, valutazioni: list[ValutazioneDifficolta], regole: Regole) -> int:
+        """
+        Salva le valutazioni tra le difficoltà e aggiunge alla riserva le distribuzioni vinte.
+        Restituisce quante sono state inserite nella riserva
+        """
+        distribuzioni = [d for d in map(_verificata, valutazioni) if d is not None]
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                inserisci_valutazioni(cursor, valutazioni, regole)
+                cursor.executemany("""
+                    INSERT OR IGNORE INTO distribuzioni_vincibili (seed, regole, difficolta, soluzione)
+                    VALUES (?, ?, ?, ?)
+                """, [(d.seed, regole.testo(), d.difficolta, d.soluzione) for d in distribuzioni])
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Errore database: {e}")
+            return 0
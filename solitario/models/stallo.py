@@ -0,0 +1,178 @@
+from models.carte import PUO_STARE_SOPRA
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, PESCA
+
+# Rilevamento dei vicoli ciechi.
+#
+# La ricerca lavora su una versione rilassata della posizione: ogni carta di stock
+# e scarti è considerata giocabile in qualsiasi momento (con pesca da una carta e
+# ricicli illimitati ogni carta del tallone passa prima o poi in cima agli scarti;
+# con le altre varianti il modello è solo più permissivo della partita reale).
+# Le posizioni raggiungibili nel modello rilassato includono quindi tutte quelle
+# reali: se nessuna di esse scopre una carta coperta o porta le fondazioni oltre
+# il livello attuale, la partita non può più essere vinta.
+
+BUDGET_PREDEFINITO = 2000  # Posizioni massime esplorate prima di rinunciare
+BUDGET_ARRESTO = 100  # Budget delle verifiche di ControlloStallo: frequenti, devono costare poco
+
+_PROGRESSO = object()
+
+# Posizione rilassata: (colonne ordinate, altezze delle fondazioni per seme, tallone)
+# dove ogni colonna è (numero di carte coperte, codici delle carte scoperte)
+_Colonna = tuple[int, tuple[int, ...]]
+_Posizione = tuple[tuple[_Colonna, ...], tuple[int, ...], frozenset[int]]
+
+def _accetta(colonna: _Colonna, codice: int) -> bool:
+    """Verifica se la carta può essere appoggiata sulla colonna"""
+    coperte, scoperte = colonna
+    if scoperte:
+        return PUO_STARE_SOPRA[codice][scoperte[-1]]
+    return coperte == 0 and codice % 13 == 12  # Solo i re sulle colonne vuote
+
+def _posizione_rilassata(gioco: GiocoSolitario) -> _Posizione:
+    """Converte la partita nella rappresentazione rilassata usata dalla ricerca"""
+    colonne = []
+    for pila in gioco.tableau:
+        coperte = pila.inizio_scoperte
+        colonne.append((coperte, tuple(carta.codice for carta in pila.carte[coperte:])))
+    altezze = [0] * 4
+    for pila in gioco.fondazioni.values():
+        if pila.carte:
+            altezze[pila.carte[0].codice // 13] = len(pila.carte)
+    tallone = frozenset(carta.codice for carta in gioco.stock.carte)
+    return tuple(sorted(colonne)), tuple(altezze), tallone
+
+def _successori(posizione: _Posizione, livello: int):
+    """Genera le posizioni raggiungibili con una mossa, o _PROGRESSO se una mossa fa progredire la partita"""
+    colonne, altezze, tallone = posizione
+    in_fondazione = sum(altezze)
+
+    def sposta(colonne_nuove, altezze_nuove=altezze, tallone_nuovo=tallone):
+        return tuple(sorted(colonne_nuove)), altezze_nuove, tallone_nuovo
+
+    def sale_in_fondazione(codice):
+        return altezze[codice // 13] == codice % 13
+
+    def altezze_con(codice, delta):
+        nuove = list(altezze)
+        nuove[codice // 13] += delta
+        return tuple(nuove)
+
+    # Dal tableau: in fondazione o sequenze verso altre colonne
+    for i, (coperte, scoperte) in enumerate(colonne):
+        for k in range(len(scoperte)):
+            prima = scoperte[k]
+            rimaste = (coperte, scoperte[:k])
+            scopre = k == 0 and coperte > 0
+
+            if k == len(scoperte) - 1 and sale_in_fondazione(prima):
+                if scopre or in_fondazione + 1 > livello:
+                    yield _PROGRESSO
+                    return
+                yield sposta(colonne[:i] + (rimaste,) + colonne[i + 1:], altezze_con(prima, 1))
+
+            for j, destinazione in enumerate(colonne):
+                if j == i or not _accetta(destinazione, prima):
+                    continue
+                if scopre:
+                    yield _PROGRESSO
+                    return
+                if k == 0 and not destinazione[1]:
+                    continue  # Re da una colonna vuota a un'altra: nessun effetto
+                nuove = list(colonne)
+                nuove[i] = rimaste
+                nuove[j] = (destinazione[0], destinazione[1] + scoperte[k:])
+                yield sposta(nuove)
+
+    # Dal tallone
+    for codice in tallone:
+        if sale_in_fondazione(codice):
+            if in_fondazione + 1 > livello:
+                yield _PROGRESSO
+                return
+            yield sposta(colonne, altezze_con(codice, 1), tallone - {codice})
+        for j, destinazione in enumerate(colonne):
+            if _accetta(destinazione, codice):
+                nuove = list(colonne)
+                nuove[j] = (destinazione[0], destinazione[1] + (codice,))
+                yield sposta(nuove, altezze, tallone - {codice})
+
+    # Dalle fondazioni al tableau
+    for seme, altezza in enumerate(altezze):
+        if altezza == 0:
+            continue
+        codice = seme * 13 + altezza - 1
+        for j, destinazione in enumerate(colonne):
+            if _accetta(destinazione, codice):
+                nuove = list(colonne)
+                nuove[j] = (destinazione[0], destinazione[1] + (codice,))
+                yield sposta(nuove, altezze_con(codice, -1))
+
+def e_in_stallo(gioco: GiocoSolitario, budget_nodi: int = BUDGET_PREDEFINITO) -> bool:
+    """
+    Verifica se non restano mosse produttive: nessuna sequenza di mosse, attraverso
+    cicli completi dello stock e stati ripetuti, scopre una carta coperta o porta
+    nuove carte in fondazione.
+
+    :param budget_nodi: Posizioni massime esplorate; se la ricerca non si conclude
+                        entro il budget la partita non viene considerata in stallo
+    :return: True solo se la partita è certamente persa
+    """
+    if gioco.ha_vinto():
+        return False
+
+    iniziale = _posizione_rilassata(gioco)
+    livello = sum(iniziale[1])
+    da_visitare = [iniziale]
+    visti = {iniziale}
+    while da_visitare:
+        for successore in _successori(da_visitare.pop(), livello):
+            if successore is _PROGRESSO:
+                return False
+            if successore not in visti:
+                if len(visti) >= budget_nodi:
+                    return False
+                visti.add(successore)
+                da_visitare.append(successore)
+    return True
+
+class ControlloStallo:
+    """
+    Criterio di arresto comune delle partite giocate in automatico (simulazioni Monte
+    Carlo, bot, riserva e difficoltà). Conta le mosse senza progressi (nessuna carta
+    scoperta o portata in fondazione): quando ne passano quante un giro completo dello
+    stock, la partita è persa se il giro è stato di sole pescate obbligate (ogni carta
+    del tallone è già passata in cima senza poter essere giocata: con una carta per
+    pesca o senza rimescolamento il giro successivo non cambia nulla), altrimenti lo
+    decide e_in_stallo. La ricerca costa quindi al più una volta per giro senza
+    progressi, non a ogni mossa
+    """
+    __slots__ = ('gioco', 'budget_nodi', '_mosse', '_solo_pescate', '_progresso')
+
+    def __init__(self, gioco: GiocoSolitario, budget_nodi: int = BUDGET_ARRESTO):
+        self.gioco = gioco
+        self.budget_nodi = budget_nodi
+        self._azzera()
+
+    def _azzera(self):
+        self._mosse = 0
+        self._solo_pescate = True
+        self._progresso = (self.gioco.carte_in_fondazione, self.gioco.carte_coperte, len(self.gioco.stock.carte))
+
+    def ferma(self, mossa: Mossa, candidate: list[Mossa]) -> bool:
+        """
+        Da chiamare con la mossa scelta tra le candidate, prima di giocarla.
+        Restituisce True se la partita va considerata persa
+        """
+        gioco = self.gioco
+        if (gioco.carte_in_fondazione, gioco.carte_coperte, len(gioco.stock.carte)) != self._progresso:
+            self._azzera()
+        self._mosse += 1
+        if mossa.tipo != PESCA or len(candidate) > 1:
+            self._solo_pescate = False
+        if self._mosse <= len(gioco.stock.carte) + 1:
+            return False
+        regole = gioco.regole
+        ciclo_chiuso = self._solo_pescate and (regole.carte_per_pesca == 1 or not regole.rimescola_scarti)
+        self._azzera()  # Nuovo controllo solo dopo un altro giro senza progressi
+        return ciclo_chiuso or e_in_stallo(gioco, self.budget_nodi)
@@ -0,0 +1,151 @@
+import os
+from typing import NamedTuple, Optional
+from database import db
+from database.db import connetti
+from models.metriche import misura
+
+# Statistiche delle sessioni di gioco lette dai riepiloghi pre-aggregati.
+#
+# Le tabelle riepiloghi_giornalieri, riepiloghi_settimanali e riepiloghi_utenti
+# contengono partite, vittorie, punteggio totale e durata totale per giorno, per
+# settimana e per giocatore; il trigger aggiorna_riepiloghi (database/db.py) le
+# aggiorna nella stessa transazione di ogni nuova sessione. I rapporti leggono solo
+# i riepiloghi, per chiave primaria: il loro costo non cresce con le sessioni salvate.
+# La compattazione sposta le sessioni vecchie (e i loro replay) nel database di
+# archivio senza toccare i riepiloghi, che continuano a contarle.
+
+ARCHIVIO_PREDEFINITO = os.path.join(db.DATA_DIR, "archivio.db")
+BLOCCO_COMPATTAZIONE = 10_000  # Sessioni spostate per transazione
+
+class Riepilogo(NamedTuple):
+    """Aggregato delle sessioni di un periodo o di un giocatore"""
+    chiave: str  # Giorno (AAAA-MM-GG), settimana (AAAA-SS) o username
+    partite: int
+    vittorie: int
+    punteggio_medio: float
+    durata_media: float  # Secondi
+
+    @property
+    def percentuale_vittorie(self) -> float:
+        return 100 * self.vittorie / self.partite if self.partite else 0.0
+
+# Colonne comuni alle letture dei riepiloghi, nell'ordine di Riepilogo (senza la chiave)
+_COLONNE = "games, wins, total_score * 1.0 / games, total_duration * 1.0 / games"
+
+class GestoreStatistiche:
+    """Rapporti sui riepiloghi delle sessioni e compattazione delle sessioni vecchie"""
+    def giornalieri(self, giorni: int = 14) -> list[Riepilogo]:
+        """Riepiloghi degli ultimi giorni con almeno una partita, dal più recente"""
+        return self._leggi(f"""
+            SELECT giorno, {_COLONNE} FROM riepiloghi_giornalieri
+            ORDER BY giorno DESC LIMIT ?
+        """, (giorni,))
+
+    def settimanali(self, settimane: int = 8) -> list[Riepilogo]:
+        """Riepiloghi delle ultime settimane con almeno una partita, dalla più recente"""
+        return self._leggi(f"""
+            SELECT settimana, {_COLONNE} FROM riepiloghi_settimanali
+            ORDER BY settimana DESC LIMIT ?
+        """, (settimane,))
+
+    def utente(self, user_id: int) -> Optional[Riepilogo]:
+        """Riepilogo di tutte le partite di un giocatore (None se non ne ha)"""
+        righe = self._leggi(f"""
+            SELECT u.username, {_COLONNE} FROM riepiloghi_utenti r
+            JOIN utenti u ON u.id = r.user_id
+            WHERE r.user_id = ?
+        """, (user_id,))
+        return righe[0] if righe else None
+
+    def totali(self) -> Optional[Riepilogo]:
+        """Riepilogo di tutte le partite, sommando i riepiloghi settimanali (None se non ce ne sono)"""
+        righe = self._leggi("""
+            SELECT 'totale', sum(games), sum(wins), sum(total_score) * 1.0 / sum(games),
+                   sum(total_duration) * 1.0 / sum(games)
+            FROM riepiloghi_settimanali
+            HAVING sum(games) > 0
+        """, ())
+        return righe[0] if righe else None
+
+    def _leggi(self, query: str, parametri: tuple) -> list[Riepilogo]:
+        try:
+            with misura('db', 'statistiche'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, parametri)
+                return [Riepilogo(*riga) for riga in cursor.fetchall()]
+        except Exception as e:
+            print(f"Errore nella lettura delle statistiche: {e}")
+            return []
+
+    def ricostruisci(self) -> bool:
+        """Ricalcola i riepiloghi dalle sessioni non archiviate (dopo modifiche manuali al database)"""
+        try:
+            with connetti() as conn:
+                db.ricostruisci_riepiloghi(conn.cursor())
+            return True
+        except Exception as e:
+            print(f"Errore nel ricalcolo delle statistiche: {e}")
+            return False
+
+    def compatta(self, giorni: int, archivio: str = ARCHIVIO_PREDEFINITO,
+                 blocco: int = BLOCCO_COMPATTAZIONE) -> int:
+        """
+        Sposta nel database di archivio le sessioni iniziate più di `giorni` giorni fa,
+        con i loro replay, a blocchi di `blocco` sessioni per transazione. Un blocco è
+        copiato e cancellato in un'unica transazione su entrambi i database: interrompere
+        la compattazione non perde né duplica sessioni. Restituisce le sessioni spostate
+        """
+        spostate = 0
+        try:
+            os.makedirs(os.path.dirname(archivio) or '.', exist_ok=True)
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("ATTACH DATABASE ? AS archivio", (archivio,))
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS archivio.sessioni_gioco (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    start_time TIMESTAMP NOT NULL,
+                    end_time TIMESTAMP,
+                    score INTEGER,
+                    duration INTEGER,
+                    won BOOLEAN,
+                    regole TEXT NOT NULL
+                )
+                """)
+                cursor.execute("""
+                CREATE TABLE IF NOT EXISTS archivio.replay_partite (
+                    sessione_id INTEGER PRIMARY KEY,
+                    seed INTEGER NOT NULL,
+                    mosse BLOB NOT NULL
+                )
+                """)
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS da_archiviare (id INTEGER PRIMARY KEY)")
+                limite = f"-{int(giorni)} days"
+                while True:
+                    cursor.execute("DELETE FROM da_archiviare")
+                    cursor.execute("""
+                        INSERT INTO da_archiviare
+                        SELECT id FROM sessioni_gioco
+                        WHERE start_time < datetime('now', ?)
+                        ORDER BY start_time LIMIT ?
+                    """, (limite, blocco))
+                    if cursor.rowcount <= 0:
+                        break
+                    spostate += cursor.rowcount
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO archivio.sessioni_gioco
+                        SELECT id, user_id, start_time, end_time, score, duration, won, regole
+                        FROM sessioni_gioco WHERE id IN (SELECT id FROM da_archiviare)
+                    """)
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO archivio.replay_partite
+                        SELECT sessione_id, seed, mosse
+                        FROM replay_partite WHERE sessione_id IN (SELECT id FROM da_archiviare)
+                    """)
+                    cursor.execute("DELETE FROM replay_partite WHERE sessione_id IN (SELECT id FROM da_archiviare)")
+                    cursor.execute("DELETE FROM sessioni_gioco WHERE id IN (SELECT id FROM da_archiviare)")
+                    conn.commit()
+        except Exception as e:
+            print(f"Errore nella compattazione delle sessioni: {e}")
+        return spostate
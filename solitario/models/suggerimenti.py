@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, PESCA
+
+BUDGET_PREDEFINITO = 0.05  # Secondi massimi per un suggerimento
+PROFONDITA_MASSIMA = 4
+
+# Pesi della valutazione euristica
+PESO_FONDAZIONE = 10.0
+PESO_COPERTA = -6.0
+PESO_COLONNA_VUOTA = 2.0
+PESO_CARTA_STOCK = -0.2
+COSTO_MOSSA = 0.01  # A parità di valore preferisce le sequenze più corte ed evita i cicli
+
+class _TempoScaduto(Exception):
+    """Interrompe la ricerca quando il budget di tempo è esaurito"""
+
+def valuta_posizione(gioco: GiocoSolitario) -> float:
+    """Valutazione euristica: premia fondazioni e colonne vuote, penalizza carte coperte e stock"""
+    valore = PESO_FONDAZIONE * gioco.carte_in_fondazione + PESO_COPERTA * gioco.carte_coperte
+    for pila in gioco.tableau:
+        if not pila.carte:
+            valore += PESO_COLONNA_VUOTA
+    valore += PESO_CARTA_STOCK * len(gioco.stock.carte)
+    return valore
+
+def mosse_utili(gioco: GiocoSolitario) -> list[Mossa]:
+    """Mosse legali escluse quelle tra colonne che non fanno progredire la partita"""
+    return gioco.mosse_legali(solo_utili=True)
+
+class MotoreSuggerimenti:
+    """
+    Classifica le mosse legali con una valutazione euristica e una ricerca
+    ad approfondimento iterativo entro un budget di tempo. I risultati sono
+    memorizzati per posizione, ricicli rimasti e regole: suggerimenti ripetuti o dopo
+    un undo sono immediati.
+    """
+    def __init__(self, budget: float = BUDGET_PREDEFINITO, dimensione_cache: int = 512):
+        self.budget = budget
+        self.dimensione_cache = dimensione_cache
+        self._cache: OrderedDict[tuple, list[tuple[Mossa, float]]] = OrderedDict()
+
+    def suggerisci(self, gioco: GiocoSolitario) -> Mossa | None:
+        """Restituisce la mossa migliore, o None se non ci sono mosse"""
+        classifica = self.classifica(gioco)
+        return classifica[0][0] if classifica else None
+
+    def classifica(self, gioco: GiocoSolitario) -> list[tuple[Mossa, float]]:
+        """Restituisce le mosse legali ordinate dalla migliore alla peggiore con il loro valore"""
+        # La stessa disposizione delle carte può avere mosse diverse con un altro numero
+        # di ricicli rimasti (la pesca che ricicla) o con altre regole
+        chiave = (gioco.chiave_posizione(), gioco.ricicli_residui, gioco.regole)
+        if chiave in self._cache:
+            self._cache.move_to_end(chiave)
+            return self._cache[chiave]
+
+        scadenza = time.perf_counter() + self.budget
+        copia = gioco.copia()
+        mosse = mosse_utili(copia)
+        classifica = [(mossa, 0.0) for mossa in mosse]
+
+        # Approfondimento iterativo: si tiene l'ultima profondità completata in tempo
+        for profondita in range(1, PROFONDITA_MASSIMA + 1):
+            try:
+                valori = {}
+                visti = {}
+                for mossa in mosse:
+                    copia.esplora(mossa)
+                    valori[mossa] = self._cerca(copia, profondita - 1, scadenza, visti) - COSTO_MOSSA
+                    copia.ritira()
+            except _TempoScaduto:
+                break
+            # La pesca a parità di valore viene dopo le altre mosse
+            classifica = sorted(((mossa, valori[mossa]) for mossa in mosse),
+                                key=lambda voce: (voce[1], voce[0].tipo != PESCA), reverse=True)
+
+        self._cache[chiave] = classifica
+        if len(self._cache) > self.dimensione_cache:
+            self._cache.popitem(last=False)
+        return classifica
+
+    def _cerca(self, gioco: GiocoSolitario, profondita: int, scadenza: float,
+               visti: dict[tuple[bytes, int], float]) -> float:
+        """Valore della posizione con una ricerca in profondità limitata"""
+        if time.perf_counter() > scadenza:
+            raise _TempoScaduto()
+        if profondita == 0 or gioco.ha_vinto():
+            return valuta_posizione(gioco)
+
+        chiave = (gioco.chiave_canonica(), profondita)
+        if chiave in visti:
+            return visti[chiave]
+
+        migliore = valuta_posizione(gioco)
+        for mossa in mosse_utili(gioco):
+            gioco.esplora(mossa)
+            migliore = max(migliore, self._cerca(gioco, profondita - 1, scadenza, visti) - COSTO_MOSSA)
+            gioco.ritira()
+        visti[chiave] = migliore
+        return migliore
@@ -0,0 +1,227 @@
+import zlib
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+from database.db import connetti
+from models.gioco import GiocoSolitario
+from models.regole import Regole, REGOLE_STANDARD
+from models.replay import ReplaySalvato, EsitoVerifica, verifica_tutti
+
+# Tornei e sfida del giorno: tutti i partecipanti giocano la stessa distribuzione.
+#
+# Ogni invio salva punteggio e mosse in partecipazioni_tornei; la classifica
+# (classifiche_tornei) contiene il miglior risultato di ogni giocatore ed è
+# aggiornata a ogni invio solo se il nuovo risultato è migliore. L'indice
+# (torneo, punteggio, durata) restituisce la classifica già ordinata: la lettura
+# delle prime posizioni e il calcolo della posizione di un giocatore non ordinano
+# mai tutte le partecipazioni.
+
+class Torneo(NamedTuple):
+    """Un torneo con la distribuzione condivisa"""
+    id: int
+    nome: str
+    seed: int
+    regole: Regole
+    giorno: str | None  # Data ISO della sfida del giorno, None per gli altri tornei
+    fine: str | None  # Dopo questa data non si accettano invii (None = sempre aperto)
+
+class VoceClassifica(NamedTuple):
+    """Miglior risultato di un giocatore in un torneo"""
+    posizione: int
+    username: str
+    punteggio: int
+    durata: int
+    vinto: bool
+
+class Partecipazione(NamedTuple):
+    """Risultato inviato per un torneo"""
+    torneo_id: int
+    user_id: int
+    punteggio: int
+    durata: int
+    vinto: bool
+    mosse: bytes
+
+def seed_del_giorno(giorno: date) -> int:
+    """Seed della sfida del giorno: uguale per tutti senza bisogno di coordinamento"""
+    return zlib.crc32(f"sfida-{giorno.isoformat()}".encode())
+
+def partecipazione(torneo: Torneo, user_id: int, gioco: GiocoSolitario,
+                   durata: Optional[int] = None) -> Partecipazione:
+    """Risultato della partita nel formato degli invii, con il punteggio finale del gioco"""
+    if durata is None:
+        durata = gioco.get_tempo_trascorso()
+    return Partecipazione(torneo.id, user_id, gioco.calcola_punteggio_finale(durata), durata,
+                          gioco.ha_vinto(), bytes(gioco.registro_mosse))
+
+class GestoreTornei:
+    """Gestisce tornei, invii dei risultati e classifiche"""
+    def crea_torneo(self, nome: str, seed: int, regole: Optional[Regole] = None,
+                    fine: Optional[str] = None) -> int | None:
+        """Crea un torneo sulla distribuzione indicata e ne restituisce l'identificativo"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO tornei (nome, seed, regole, fine) VALUES (?, ?, ?, ?)
+                """, (nome, seed, (regole or REGOLE_STANDARD).testo(), fine))
+                conn.commit()
+                return cursor.lastrowid
+        except Exception as e:
+            print(f"Errore nella creazione del torneo: {e}")
+            return None
+
+    def sfida_del_giorno(self, giorno: Optional[date] = None) -> Torneo | None:
+        """Restituisce la sfida del giorno, creandola al primo accesso"""
+        giorno = giorno or date.today()
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                # Più processi possono arrivare insieme: vince il primo inserimento
+                cursor.execute("""
+                    INSERT OR IGNORE INTO tornei (nome, seed, regole, giorno, fine)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (f"Sfida del {giorno.isoformat()}", seed_del_giorno(giorno), REGOLE_STANDARD.testo(),
+                      giorno.isoformat(), (giorno + timedelta(days=1)).isoformat()))
+                conn.commit()
+                cursor.execute("SELECT id FROM tornei WHERE giorno = ?", (giorno.isoformat(),))
+                return self.get_torneo(cursor.fetchone()[0])
+        except Exception as e:
+            print(f"Errore nel recupero della sfida del giorno: {e}")
+            return None
+
+    def get_torneo(self, torneo_id: int) -> Torneo | None:
+        """Restituisce il torneo, o None se non esiste"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, nome, seed, regole, giorno, fine FROM tornei WHERE id = ?
+                """, (torneo_id,))
+                riga = cursor.fetchone()
+                if riga is None:
+                    return None
+                id_torneo, nome, seed, regole, giorno, fine = riga
+                return Torneo(id_torneo, nome, seed, Regole.da_testo(regole), giorno, fine)
+        except Exception as e:
+            print(f"Errore nel recupero del torneo: {e}")
+            return None
+
+    def nuova_partita(self, torneo: Torneo, limite_undo: int | None = None) -> GiocoSolitario:
+        """Crea la partita del torneo: stessa distribuzione e stesse regole per tutti"""
+        return GiocoSolitario(limite_undo=limite_undo, seed=torneo.seed, regole=torneo.regole)
+
+    def invia_risultato(self, risultato: Partecipazione) -> int | None:
+        """Registra un risultato e aggiorna la classifica. Restituisce l'id della partecipazione"""
+        identificativi = self.invia_risultati([risultato])
+        return identificativi[0] if identificativi else None
+
+    def invia_risultati(self, risultati: list[Partecipazione]) -> list[int]:
+        """
+        Registra più risultati in un'unica transazione (nessun invio viene salvato se uno
+        fallisce). I risultati per tornei chiusi vengono ignorati.
+        Restituisce gli id delle partecipazioni registrate
+        """
+        identificativi = []
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                for risultato in risultati:
+                    cursor.execute("""
+                        INSERT INTO partecipazioni_tornei (torneo_id, user_id, score, duration, won, mosse)
+                        SELECT id, ?, ?, ?, ?, ? FROM tornei
+                        WHERE id = ? AND (fine IS NULL OR fine > datetime('now', 'localtime'))
+                    """, (risultato.user_id, risultato.punteggio, risultato.durata, risultato.vinto,
+                          risultato.mosse, risultato.torneo_id))
+                    if not cursor.rowcount:
+                        continue
+                    id_partecipazione = cursor.lastrowid
+                    # La classifica cambia solo se il risultato migliora quello del giocatore
+                    cursor.execute("""
+                        INSERT INTO classifiche_tornei (torneo_id, user_id, score, duration, won, partecipazione_id)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (torneo_id, user_id) DO UPDATE SET
+                            score = excluded.score,
+                            duration = excluded.duration,
+                            won = excluded.won,
+                            partecipazione_id = excluded.partecipazione_id
+                        WHERE excluded.score > classifiche_tornei.score
+                           OR (excluded.score = classifiche_tornei.score
+                               AND excluded.duration < classifiche_tornei.duration)
+                    """, (risultato.torneo_id, risultato.user_id, risultato.punteggio, risultato.durata,
+                          risultato.vinto, id_partecipazione))
+                    identificativi.append(id_partecipazione)
+                conn.commit()
+            return identificativi
+        except Exception as e:
+            print(f"Errore nell'invio dei risultati: {e}")
+            return []
+
+    def get_classifica(self, torneo_id: int, limite: int = 15, inizio: int = 0) -> list[VoceClassifica]:
+        """Restituisce una pagina della classifica del torneo (letta in ordine dall'indice)"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT u.username, c.score, c.duration, c.won
+                    FROM classifiche_tornei c
+                    JOIN utenti u ON c.user_id = u.id
+                    WHERE c.torneo_id = ?
+                    ORDER BY c.score DESC, c.duration ASC, c.partecipazione_id ASC
+                    LIMIT ? OFFSET ?
+                """, (torneo_id, limite, inizio))
+                return [VoceClassifica(inizio + i, username, punteggio, durata, bool(vinto))
+                        for i, (username, punteggio, durata, vinto) in enumerate(cursor.fetchall(), 1)]
+        except Exception as e:
+            print(f"Errore nel recupero della classifica: {e}")
+            return []
+
+    def get_posizione(self, torneo_id: int, user_id: int) -> int | None:
+        """Posizione del giocatore in classifica (None se non ha partecipato)"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT score, duration, partecipazione_id FROM classifiche_tornei
+                    WHERE torneo_id = ? AND user_id = ?
+                """, (torneo_id, user_id))
+                riga = cursor.fetchone()
+                if riga is None:
+                    return None
+                punteggio, durata, id_partecipazione = riga
+                # Conteggio sull'intervallo dell'indice che precede il giocatore
+                cursor.execute("""
+                    SELECT COUNT(*) FROM classifiche_tornei
+                    WHERE torneo_id = ? AND (score > ?
+                        OR (score = ? AND (duration < ? OR (duration = ? AND partecipazione_id < ?))))
+                """, (torneo_id, punteggio, punteggio, durata, durata, id_partecipazione))
+                return cursor.fetchone()[0] + 1
+        except Exception as e:
+            print(f"Errore nel calcolo della posizione: {e}")
+            return None
+
+    def get_replay(self, torneo_id: int, solo_vittorie: bool = True) -> list[ReplaySalvato]:
+        """Replay delle partecipazioni del torneo (l'id della partecipazione fa da sessione)"""
+        try:
+            with connetti() as conn:
+                cursor = conn.cursor()
+                query = """
+                    SELECT p.id, t.seed, p.mosse, p.score, p.duration, p.won, t.regole
+                    FROM partecipazioni_tornei p
+                    JOIN tornei t ON p.torneo_id = t.id
+                    WHERE p.torneo_id = ?
+                """
+                if solo_vittorie:
+                    query += " AND p.won"
+                cursor.execute(query + " ORDER BY p.id", (torneo_id,))
+                return [
+                    ReplaySalvato(id_partecipazione, seed, mosse, punteggio, durata, bool(vinto),
+                                  Regole.da_testo(regole))
+                    for id_partecipazione, seed, mosse, punteggio, durata, vinto, regole in cursor.fetchall()
+                ]
+        except Exception as e:
+            print(f"Errore nel recupero dei replay del torneo: {e}")
+            return []
+
+    def verifica(self, torneo_id: int, processi: int | None = None) -> list[EsitoVerifica]:
+        """Riproduce in parallelo le partecipazioni vincenti e ne controlla esito e punteggio"""
+        return verifica_tutti(self.get_replay(torneo_id), processi)
@@ -1,131 +1,207 @@
-import sqlite3
-import hashlib
-import getpass
-from typing import Optional
-from database.db import NOME_DB
-
-class GestoreUtenti:
-    """Gestisce l'autenticazione e la registrazione degli utenti"""
-    def __init__(self):
-        self.utente_corrente = None
-    
-    def registra(self, username: str, password: str = None) -> bool:
-        """Registra un nuovo utente"""
-        if not username:
-            return False
-        
-        try:
-            # Se password non è fornita, chiedila con getpass
-            if password is None:
-                password = getpass.getpass("Scegli una password: ")
-            
-            if not password:
-                return False
-            
-            with sqlite3.connect(NOME_DB) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO utenti (username, password_hash) VALUES (?, ?)",
-                    (username, self._hash_password(password))
-                )
-                conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            print("Username già esistente.")
-            return False
-        except Exception as e:
-            print(f"Errore durante la registrazione: {e}")
-            return False
-    
-    def login(self, username: str, password: str = None) -> bool:
-        """Effettua il login di un utente"""
-        try:
-            # Se password non è fornita, chiedila con getpass
-            if password is None:
-                password = getpass.getpass("Password: ")
-            
-            with sqlite3.connect(NOME_DB) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id, password_hash FROM utenti WHERE username = ?",
-                    (username,)
-                )
-                risultato = cursor.fetchone()
-                
-                if risultato and risultato[1] == self._hash_password(password):
-                    self.utente_corrente = {
-                        'id': risultato[0],
-                        'username': username
-                    }
-                    return True
-        except Exception as e:
-            print(f"Errore durante il login: {e}")
-        
-        return False
-    
-    def logout(self):
-        """Effettua il logout dell'utente corrente"""
-        self.utente_corrente = None
-    
-    def e_loggato(self) -> bool:
-        """Verifica se un utente è loggato"""
-        return self.utente_corrente is not None
-    
-    def get_utente_corrente(self) -> dict | None:
-        """Restituisce le informazioni dell'utente corrente"""
-        return self.utente_corrente
-    
-    def _hash_password(self, password: str) -> str:
-        """Hash della password (in un'app reale, usare bcrypt o PBKDF2)"""
-        return hashlib.sha256(password.encode('utf-8')).hexdigest()
-
-    def get_punteggi_migliori(self, limite=15) -> list:
-        """Restituisce i migliori punteggi dal database"""
-        try:
-            with sqlite3.connect(NOME_DB) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT u.username, pm.score, pm.duration, pm.achieved_at 
-                    FROM punteggi_migliori pm
-                    JOIN utenti u ON pm.user_id = u.id
-                    ORDER BY pm.score DESC, pm.duration ASC
-                    LIMIT ?
-                """, (limite,))
-                return cursor.fetchall()
-        except Exception as e:
-            print(f"Errore nel recupero dei punteggi migliori: {e}")
-            return []
-    
-    def get_sessioni_gioco(self, user_id: Optional[int] = None, limite=20) -> list:
-        """Restituisce le sessioni di gioco dal database"""
-        try:
-            with sqlite3.connect(NOME_DB) as conn:
-                cursor = conn.cursor()
-                
-                query = """
-                    SELECT 
-                        s.id, 
-                        u.username, 
-                        s.start_time, 
-                        s.end_time, 
-                        s.score, 
-                        s.duration, 
-                        s.won
-                    FROM sessioni_gioco s
-                    JOIN utenti u ON s.user_id = u.id
-                """
-                
-                params = []
-                
-                if user_id is not None:
-                    query += " WHERE s.user_id = ?"
-                    params.append(user_id)
-                
-                query += " ORDER BY s.start_time DESC LIMIT ?"
-                params.append(limite)
-                
-                cursor.execute(query, params)
-                return cursor.fetchall()
-        except Exception as e:
-            print(f"Errore nel recupero delle sessioni di gioco: {e}")
-            return []
+import sqlite3
+from typing import Optional
+from database.db import connetti
+from models.metriche import misura
+from models.regole import Regole
+from models.replay import ReplaySalvato
+
+class GestoreUtenti:
+    """Gestisce l'autenticazione e la registrazione degli utenti"""
+    def __init__(self):
+        self.utente_corrente = None
+    
+    def registra(self, username: str, password: str = None) -> bool:
+        """Registra un nuovo utente"""
+        if not username:
+            return False
+        
+        try:
+            # Se password non è fornita, chiedila con getpass
+            if password is None:
+                from getpass import getpass
+                password = getpass("Scegli una password: ")
+            
+            if not password:
+                return False
+            
+            with misura('db', 'registra'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO utenti (username, password_hash) VALUES (?, ?)",
+                    (username, self._hash_password(password))
+                )
+                conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            print("Username già esistente.")
+            return False
+        except Exception as e:
+            print(f"Errore durante la registrazione: {e}")
+            return False
+    
+    def login(self, username: str, password: str = None) -> bool:
+        """Effettua il login di un utente"""
+        try:
+            # Se password non è fornita, chiedila con getpass
+            if password is None:
+                from getpass import getpass
+                password = getpass("Password: ")
+            
+            with misura('db', 'login'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id, password_hash FROM utenti WHERE username = ?",
+                    (username,)
+                )
+                risultato = cursor.fetchone()
+                
+                if risultato and risultato[1] == self._hash_password(password):
+                    self.utente_corrente = {
+                        'id': risultato[0],
+                        'username': username
+                    }
+                    return True
+        except Exception as e:
+            print(f"Errore durante il login: {e}")
+        
+        return False
+    
+    def logout(self):
+        """Effettua il logout dell'utente corrente"""
+        self.utente_corrente = None
+    
+    def e_loggato(self) -> bool:
+        """Verifica se un utente è loggato"""
+        return self.utente_corrente is not None
+    
+    def get_utente_corrente(self) -> dict | None:
+        """Restituisce le informazioni dell'utente corrente"""
+        return self.utente_corrente
+    
+    def _hash_password(self, password: str) -> str:
+        """Hash della password (in un'app reale, usare bcrypt o PBKDF2)"""
+        import hashlib  # Importato al primo login: non rallenta l'avvio
+        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+    def get_punteggi_migliori(self, limite=15) -> list:
+        """Restituisce i migliori punteggi dal database"""
+        try:
+            with misura('db', 'get_punteggi_migliori'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT u.username, pm.score, pm.duration, pm.achieved_at 
+                    FROM punteggi_migliori pm
+                    JOIN utenti u ON pm.user_id = u.id
+                    ORDER BY pm.score DESC, pm.duration ASC
+                    LIMIT ?
+                """, (limite,))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Errore nel recupero dei punteggi migliori: {e}")
+            return []
+    
+    def get_sessioni_gioco(self, user_id: Optional[int] = None, limite=20) -> list:
+        """Restituisce le sessioni di gioco dal database"""
+        try:
+            with misura('db', 'get_sessioni_gioco'), connetti() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    SELECT 
+                        s.id, 
+                        u.username, 
+                        s.start_time, 
+                        s.end_time, 
+                        s.score, 
+                        s.duration, 
+                        s.won,
+                        s.regole
+                    FROM sessioni_gioco s
+                    JOIN utenti u ON s.user_id = u.id
+                """
+                
+                params = []
+                
+                if user_id is not None:
+                    query += " WHERE s.user_id = ?"
+                    params.append(user_id)
+                
+                query += " ORDER BY s.start_time DESC LIMIT ?"
+                params.append(limite)
+                
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Errore nel recupero delle sessioni di gioco: {e}")
+            return []
+
+    def get_replay(self, sessione_id: Optional[int] = None, user_id: Optional[int] = None,
+                   limite: Optional[int] = None) -> list[ReplaySalvato]:
+        """Restituisce i replay salvati, dal più recente"""
+        try:
+            with misura('db', 'get_replay'), connetti() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                    SELECT r.sessione_id, r.seed, r.mosse, s.score, s.duration, s.won, s.regole
+                    FROM replay_partite r
+                    JOIN sessioni_gioco s ON r.sessione_id = s.id
+                    WHERE 1 = 1
+                """
+                params = []
+                
+                if sessione_id is not None:
+                    query += " AND r.sessione_id = ?"
+                    params.append(sessione_id)
+                if user_id is not None:
+                    query += " AND s.user_id = ?"
+                    params.append(user_id)
+                
+                query += " ORDER BY r.sessione_id DESC"
+                if limite is not None:
+                    query += " LIMIT ?"
+                    params.append(limite)
+                
+                cursor.execute(query, params)
+                return [ReplaySalvato(*riga[:6], Regole.da_testo(riga[6])) for riga in cursor.fetchall()]
+        except Exception as e:
+            print(f"Errore nel recupero dei replay: {e}")
+            return []
+
+    def salva_partita(self, user_id: int, dati: bytes) -> bool:
+        """Salva (o sovrascrive) la partita in corso dell'utente"""
+        try:
+            with misura('db', 'salva_partita'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO partite_salvate (user_id, dati, saved_at)
+                    VALUES (?, ?, datetime('now'))
+                    ON CONFLICT(user_id) DO UPDATE SET dati = excluded.dati, saved_at = excluded.saved_at
+                """, (user_id, dati))
+                conn.commit()
+            return True
+        except Exception as e:
+            print(f"Errore nel salvataggio della partita: {e}")
+            return False
+
+    def carica_partita(self, user_id: int) -> bytes | None:
+        """Restituisce i dati della partita salvata dell'utente, se esiste"""
+        try:
+            with misura('db', 'carica_partita'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT dati FROM partite_salvate WHERE user_id = ?", (user_id,))
+                risultato = cursor.fetchone()
+                return risultato[0] if risultato else None
+        except Exception as e:
+            print(f"Errore nel caricamento della partita: {e}")
+            return None
+
+    def elimina_partita(self, user_id: int):
+        """Elimina la partita salvata dell'utente"""
+        try:
+            with misura('db', 'elimina_partita'), connetti() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM partite_salvate WHERE user_id = ?", (user_id,))
+                conn.commit()
+        except Exception as e:
+            print(f"Errore nell'eliminazione della partita salvata: {e}")
\ No newline at end of file
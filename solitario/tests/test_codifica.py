@@ -0,0 +1,47 @@
+import random
+import unittest
+from models.codifica import codifica_partita, decodifica_partita
+from models.gioco import GiocoSolitario
+from models.regole import VARIANTI
+
+def partita_in_corso(seed: int, regole, mosse: int = 120) -> GiocoSolitario:
+    """Partita dopo `mosse` mosse legali a caso (pescate e ricicli compresi)"""
+    gioco = GiocoSolitario(seed=seed, regole=regole)
+    gioco.verboso = False
+    rng = random.Random(seed)
+    for _ in range(mosse):
+        candidate = gioco.mosse_legali()
+        if not candidate:
+            break
+        gioco.applica_mossa(rng.choice(candidate))
+    return gioco
+
+class TestCodifica(unittest.TestCase):
+    def assertStessaPartita(self, decodificata: GiocoSolitario, gioco: GiocoSolitario):
+        self.assertEqual(decodificata.chiave_posizione(), gioco.chiave_posizione())
+        self.assertEqual(decodificata.punteggio, gioco.punteggio)
+        self.assertEqual(decodificata.ricicli, gioco.ricicli)
+        self.assertEqual(decodificata.regole, gioco.regole)
+        self.assertEqual(decodificata.seed, gioco.seed)
+        self.assertEqual(decodificata.stock.cursore, gioco.stock.cursore)
+        self.assertEqual(decodificata.carte_in_fondazione, gioco.carte_in_fondazione)
+        self.assertEqual(decodificata.mosse_legali(), gioco.mosse_legali())
+
+    def test_andata_e_ritorno_in_ogni_variante(self):
+        for nome, regole in VARIANTI.items():
+            for seed in (0, 7):
+                with self.subTest(variante=nome, seed=seed):
+                    gioco = partita_in_corso(seed, regole)
+                    con_registro = decodifica_partita(codifica_partita(gioco, includi_registro=True))
+                    self.assertStessaPartita(con_registro, gioco)
+                    self.assertEqual(con_registro.registro_mosse, gioco.registro_mosse)
+
+                    senza_registro = decodifica_partita(codifica_partita(gioco))
+                    self.assertStessaPartita(senza_registro, gioco)
+                    self.assertEqual(senza_registro.registro_mosse, bytearray())
+
+    def test_ricodifica_identica(self):
+        for nome, regole in VARIANTI.items():
+            with self.subTest(variante=nome):
+                dati = codifica_partita(partita_in_corso(3, regole), includi_registro=True)
+                self.assertEqual(codifica_partita(decodifica_partita(dati), includi_registro=True), dati)
@@ -0,0 +1,34 @@
+from models.difficolta import GestoreDifficolta, valuta_distribuzione, IRRISOLTA
+from models.regole import REGOLE_STANDARD
+from models.replay import riproduci
+from models.riserva import RiservaDistribuzioni, verifica_distribuzione
+from tests.utilita import TestConDatabase
+
+TENTATIVI = 4
+
+class TestRiservaEDifficolta(TestConDatabase):
+    def test_verifica_usa_la_valutazione_di_difficolta(self):
+        for seed in range(6):
+            valutazione = valuta_distribuzione(seed, tentativi=TENTATIVI)
+            verificata = verifica_distribuzione(seed, tentativi=TENTATIVI)
+            if valutazione.fascia == IRRISOLTA:
+                self.assertIsNone(verificata)
+            else:
+                self.assertEqual((verificata.difficolta, verificata.soluzione),
+                                 (valutazione.perse, valutazione.soluzione))
+
+    def test_riempimento_salva_anche_le_difficolta(self):
+        with RiservaDistribuzioni(dimensione=2, processi=1, tentativi=TENTATIVI) as riserva:
+            self.assertGreaterEqual(riserva.riempi(), 2)
+            riservate = self.righe("SELECT seed, difficolta, soluzione FROM distribuzioni_vincibili")
+            valutate = {riga[0]: riga[1:] for riga in
+                        self.righe("SELECT seed, perse, soluzione FROM difficolta_distribuzioni")}
+            for seed, difficolta, soluzione in riservate:
+                self.assertEqual(valutate[seed], (difficolta, soluzione))
+                self.assertTrue(riproduci(seed, soluzione).ha_vinto())
+
+            # I seed valutati dalla riserva non vengono rigiocati
+            difficolta = GestoreDifficolta(processi=1, tentativi=TENTATIVI)
+            self.assertEqual(difficolta.valuta(list(valutate), REGOLE_STANDARD), 0)
+            distribuzione = riserva.preleva()
+            self.assertIn(distribuzione.seed, valutate)
@@ -0,0 +1,50 @@
+import copy
+import pickle
+import unittest
+from models.eventi import CartaSpostata, StockPescato
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, PESCA
+from models.partite import GestorePartite
+
+class TestEventiESerializzazione(unittest.TestCase):
+    def setUp(self):
+        self.gioco = GiocoSolitario(seed=7)
+        self.gioco.verboso = False
+        self.eventi = []
+        # Una lambda non è serializzabile: la partita deve esserlo lo stesso
+        self.gioco.iscrivi(lambda evento: self.eventi.append(evento))
+
+    def test_pesca_pubblica_evento(self):
+        self.gioco.applica_mossa(Mossa(PESCA))
+        self.assertEqual(len(self.eventi), 1)
+        self.assertIsInstance(self.eventi[0], StockPescato)
+
+    def test_pickle_e_copy_escludono_gli_osservatori(self):
+        self.gioco.applica_mossa(Mossa(PESCA))
+        self.assertIsNone(copy.copy(self.gioco)._bus)
+        for duplicato in (pickle.loads(pickle.dumps(self.gioco)), copy.deepcopy(self.gioco),
+                          self.gioco.copia()):
+            self.assertIsNone(duplicato._bus)
+            self.assertEqual(duplicato.chiave_posizione(), self.gioco.chiave_posizione())
+            duplicato.pesca_dallo_stock()
+        self.assertEqual(len(self.eventi), 1)
+        self.assertIsNotNone(self.gioco._bus)
+
+    def test_sfratto_e_ripristino_con_osservatori(self):
+        gestore = GestorePartite()
+        id_partita = gestore.crea_partita()
+        gioco = gestore.ottieni(id_partita)
+        gioco.verboso = False
+        eventi = []
+        gioco.iscrivi(lambda evento: eventi.append(evento), CartaSpostata, StockPescato)
+        gestore.esegui(id_partita, lambda partita: partita.pesca_dallo_stock())
+        chiave = gioco.chiave_posizione()
+
+        gestore.sfratta(id_partita)
+        ripristinata = gestore.ottieni(id_partita)
+        self.assertEqual(ripristinata.chiave_posizione(), chiave)
+        self.assertEqual(gestore.rapporto()['ripristini'], 1)
+        # Gli osservatori vanno iscritti di nuovo sulla partita ripristinata
+        ripristinata.verboso = False
+        ripristinata.pesca_dallo_stock()
+        self.assertEqual(len(eventi), 1)
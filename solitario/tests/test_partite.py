@@ -0,0 +1,79 @@
+import struct
+import unittest
+from models.mosse import Mossa, MUOVI, PESCA
+from models.partite import GestorePartite
+from models.regole import VARIANTI
+
+def _gioca_qualche_mossa(gioco, mosse: int = 12):
+    """Pesca e sposta verso le fondazioni appena possibile, per avere registro e undo non vuoti"""
+    for _ in range(mosse):
+        verso_fondazione = [mossa for mossa in gioco.mosse_legali()
+                            if mossa.tipo == MUOVI and mossa.destinazione.startswith('fondazione_')]
+        gioco.applica_mossa(verso_fondazione[0] if verso_fondazione else Mossa(PESCA))
+
+class TestGestorePartite(unittest.TestCase):
+    def setUp(self):
+        self.gestore = GestorePartite(timeout_inattivita=60)
+
+    def _nuova(self, regole=None) -> int:
+        id_partita = self.gestore.crea_partita(regole)
+        gioco = self.gestore.ottieni(id_partita)
+        gioco.verboso = False
+        _gioca_qualche_mossa(gioco)
+        return id_partita
+
+    def test_sfratto_e_ripristino_conservano_la_partita(self):
+        for nome, regole in VARIANTI.items():
+            with self.subTest(variante=nome):
+                id_partita = self._nuova(regole)
+                gioco = self.gestore.ottieni(id_partita)
+                gioco.annulla()
+                prima = (gioco.chiave_posizione(), gioco.punteggio, gioco.ricicli,
+                         bytes(gioco.registro_mosse), len(gioco.stati_undo), len(gioco.stati_redo))
+
+                self.gestore.sfratta(id_partita)
+                ripristinata = self.gestore.ottieni(id_partita)
+                self.assertIsNot(ripristinata, gioco)
+                self.assertEqual(ripristinata.regole, regole)
+                self.assertFalse(ripristinata.verboso)
+                self.assertEqual((ripristinata.chiave_posizione(), ripristinata.punteggio,
+                                  ripristinata.ricicli, bytes(ripristinata.registro_mosse),
+                                  len(ripristinata.stati_undo), len(ripristinata.stati_redo)), prima)
+                # Lo storico è stato ricostruito: undo e redo portano alle stesse posizioni
+                gioco.ripeti()
+                ripristinata.ripeti()
+                gioco.annulla()
+                ripristinata.annulla()
+                gioco.annulla()
+                ripristinata.annulla()
+                self.assertEqual(ripristinata.chiave_posizione(), gioco.chiave_posizione())
+
+    def test_codifica_fallita_lascia_la_partita_residente(self):
+        id_partita = self._nuova()
+        gioco = self.gestore.ottieni(id_partita)
+        gioco.seed = -1  # Non rappresentabile come uint32
+        with self.assertRaises(struct.error):
+            self.gestore.sfratta(id_partita)
+        self.assertIs(self.gestore.ottieni(id_partita), gioco)
+        self.assertEqual(self.gestore.rapporto()['sfrattate'], 0)
+
+    def test_partite_inattive_sfrattate_al_primo_accesso(self):
+        inattiva = self._nuova()
+        attiva = self._nuova()
+        self.gestore._ultimo_accesso[inattiva] -= 120
+        self.gestore.ottieni(attiva)
+        rapporto = self.gestore.rapporto()
+        self.assertEqual((rapporto['residenti'], rapporto['sfrattate']), (1, 1))
+        self.assertIn(inattiva, self.gestore._sfrattate)
+        self.gestore.ottieni(inattiva)
+        self.assertEqual(self.gestore.rapporto()['ripristini'], 1)
+
+    def test_budget_di_memoria(self):
+        gestore = GestorePartite(budget_memoria=1)
+        partite = [gestore.crea_partita() for _ in range(3)]
+        # Resta residente solo l'ultima creata
+        self.assertEqual(gestore.rapporto()['residenti'], 1)
+        self.assertEqual(gestore.rapporto()['sfrattate'], 2)
+        self.assertLess(gestore.rapporto()['memoria_sfrattate'], 2 * 100)
+        gestore.ottieni(partite[0])
+        self.assertEqual(gestore.rapporto()['ripristini'], 1)
@@ -0,0 +1,45 @@
+import random
+import unittest
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, MUOVI, PESCA
+from models.politiche import POLITICHE, Politica, PoliticaEuristica, PoliticaPriorita, mosse_candidate
+from models.regole import VARIANTI
+
+class TestPolitiche(unittest.TestCase):
+    def test_le_classi_astratte_non_si_istanziano(self):
+        for classe in (Politica, PoliticaPriorita):
+            with self.subTest(classe=classe.__name__):
+                with self.assertRaises(TypeError):
+                    classe()
+
+    def test_candidate_dopo_una_pesca(self):
+        # Ricalcolare solo le mosse dagli scarti dà le stesse candidate del calcolo completo
+        for nome, regole in VARIANTI.items():
+            with self.subTest(variante=nome):
+                rng = random.Random(1)
+                gioco = GiocoSolitario(limite_undo=0, seed=5, regole=regole)
+                gioco.verboso = False
+                for _ in range(150):
+                    candidate = mosse_candidate(gioco)
+                    if not candidate:
+                        break
+                    mossa = rng.choice(candidate)
+                    gioco.applica_mossa(mossa)
+                    if mossa.tipo == PESCA:
+                        self.assertEqual(mosse_candidate(gioco, candidate), mosse_candidate(gioco))
+
+    def test_candidate_mai_dalle_fondazioni(self):
+        gioco = GiocoSolitario(limite_undo=0, seed=0)
+        candidate = mosse_candidate(gioco)
+        self.assertTrue(candidate)
+        self.assertFalse([mossa for mossa in candidate if mossa.sorgente.startswith('fondazione_')])
+
+    def test_priorita_euristica(self):
+        gioco = GiocoSolitario(limite_undo=0, seed=0)
+        politica = POLITICHE['euristica']()
+        self.assertIsInstance(politica, PoliticaEuristica)
+        self.assertEqual(politica.priorita(gioco, Mossa(MUOVI, 'scarti', 'fondazione_cuori')), 0)
+        self.assertEqual(politica.priorita(gioco, Mossa(MUOVI, 'scarti', 'tableau1')), 2)
+        self.assertEqual(politica.priorita(gioco, Mossa(PESCA)), 4)
+        # Colonna 2 della distribuzione: una carta coperta sotto quella scoperta
+        self.assertEqual(politica.priorita(gioco, Mossa(MUOVI, 'tableau2', 'tableau3')), 1)
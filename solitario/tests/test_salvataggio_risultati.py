@@ -0,0 +1,69 @@
+import contextlib
+import io
+from models.gioco import GiocoSolitario
+from models.replay import riproduci
+from models.utenti import GestoreUtenti
+from tests.utilita import TestConDatabase, partita_vinta
+from ui.cli import InterfacciaSolitario
+
+class TestSalvaRisultatoGioco(TestConDatabase):
+    def setUp(self):
+        super().setUp()
+        self.interfaccia = InterfacciaSolitario()
+        self.interfaccia.gestore_utenti = GestoreUtenti()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.interfaccia.gestore_utenti.registra("giocatore", "password")
+            self.interfaccia.gestore_utenti.login("giocatore", "password")
+        self.id_utente = self.interfaccia.gestore_utenti.get_utente_corrente()['id']
+
+    def salva(self, gioco: GiocoSolitario, vinto: bool) -> str:
+        self.interfaccia.gioco = gioco
+        uscita = io.StringIO()
+        with contextlib.redirect_stdout(uscita):
+            self.interfaccia.salva_risultato_gioco(vinto)
+        return uscita.getvalue()
+
+    def test_partita_vinta_salva_sessione_replay_e_record(self):
+        gioco = partita_vinta(0)
+        self.assertEqual(self.salva(gioco, True), "")
+
+        sessioni = self.righe("SELECT id, won, score FROM sessioni_gioco")
+        self.assertEqual(len(sessioni), 1)
+        sessione_id, vinto, punteggio = sessioni[0]
+        self.assertEqual(vinto, 1)
+        replay = self.righe("SELECT seed, mosse FROM replay_partite WHERE sessione_id = ?", (sessione_id,))
+        self.assertEqual(replay, [(0, bytes(gioco.registro_mosse))])
+        self.assertTrue(riproduci(0, replay[0][1]).ha_vinto())
+        self.assertEqual(self.righe("SELECT user_id, score FROM punteggi_migliori"), [(self.id_utente, punteggio)])
+
+    def test_vittoria_e_sconfitta_sono_entrambe_salvate(self):
+        self.salva(partita_vinta(0), True)
+        persa = GiocoSolitario(seed=1)
+        persa.verboso = False
+        persa.pesca_dallo_stock()
+        self.salva(persa, False)
+
+        self.assertEqual(self.righe("SELECT won FROM sessioni_gioco ORDER BY id"), [(1,), (0,)])
+        self.assertEqual(self.righe("SELECT count(*) FROM replay_partite"), [(2,)])
+        self.assertEqual(self.righe("SELECT games, wins FROM riepiloghi_utenti"), [(2, 1)])
+        # Il record resta quello della vittoria
+        self.assertEqual(len(self.righe("SELECT * FROM punteggi_migliori")), 1)
+
+    def test_la_partita_del_torneo_non_tocca_quella_salvata(self):
+        libera = GiocoSolitario(seed=5)
+        self.interfaccia.gioco = libera
+        self.interfaccia._salva_checkpoint()
+        salvata = self.interfaccia.gestore_utenti.carica_partita(self.id_utente)
+
+        torneo = self.interfaccia.gestore_tornei.sfida_del_giorno()
+        self.interfaccia.torneo_corrente = torneo
+        self.interfaccia.gioco = self.interfaccia.gestore_tornei.nuova_partita(torneo)
+        self.interfaccia.gioco.verboso = False
+        self.interfaccia.gioco.pesca_dallo_stock()
+        self.interfaccia._salva_checkpoint()
+        self.assertFalse(self.interfaccia._chiedi_salvataggio())  # Nessuna domanda: non si salva
+        self.interfaccia._elimina_partita_salvata()
+        self.salva(self.interfaccia.gioco, False)
+
+        self.assertEqual(self.interfaccia.gestore_utenti.carica_partita(self.id_utente), salvata)
+        self.assertEqual(self.righe("SELECT count(*) FROM partecipazioni_tornei WHERE torneo_id = ?", (torneo.id,)), [(1,)])
@@ -0,0 +1,38 @@
+import unittest
+from models.bot import gioca
+from models.politiche import PoliticaScopriPrima
+from models.gioco import GiocoSolitario
+from models.mosse import Mossa, MUOVI, PESCA
+from models.probabilita import MAX_MOSSE
+from models.regole import VARIANTI
+from models.stallo import ControlloStallo
+
+PESCA_MOSSA = Mossa(PESCA)
+ALTERNATIVA = Mossa(MUOVI, 'tableau1', 'tableau2')
+
+class TestControlloStallo(unittest.TestCase):
+    def _giro(self, regole, candidate: list[Mossa]) -> list[bool]:
+        """Risposte di ferma() a un giro dello stock di sole pescate (più una)"""
+        gioco = GiocoSolitario(limite_undo=0, seed=3, regole=regole)
+        controllo = ControlloStallo(gioco)
+        return [controllo.ferma(PESCA_MOSSA, candidate) for _ in range(len(gioco.stock.carte) + 2)]
+
+    def test_giro_di_pescate_obbligate(self):
+        for nome in ('standard', 'classico', 'pesca3'):
+            with self.subTest(variante=nome):
+                risposte = self._giro(VARIANTI[nome], [PESCA_MOSSA])
+                self.assertEqual(risposte, [False] * (len(risposte) - 1) + [True])
+
+    def test_pescate_volontarie_non_fermano_una_partita_viva(self):
+        # Con altre mosse disponibili decide e_in_stallo: la distribuzione iniziale non è in stallo
+        self.assertNotIn(True, self._giro(VARIANTI['standard'], [PESCA_MOSSA, ALTERNATIVA]))
+
+    def test_pesca3_con_rimescolamento_decide_e_in_stallo(self):
+        regole = VARIANTI['pesca3']._replace(rimescola_scarti=True)
+        self.assertNotIn(True, self._giro(regole, [PESCA_MOSSA]))
+
+    def test_bot_si_ferma_prima_del_limite_di_mosse(self):
+        # Seed 4: la politica 'scopri' resta con sole pescate e 5 carte nel tallone
+        esito = gioca(PoliticaScopriPrima(), 4)
+        self.assertFalse(esito.vinta)
+        self.assertLess(esito.mosse, MAX_MOSSE)
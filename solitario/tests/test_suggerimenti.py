@@ -0,0 +1,92 @@
+import random
+import unittest
+from models.gioco import GiocoSolitario
+from models.mosse import PESCA
+from models.probabilita import StimatoreVittoria, determinizza
+from models.regole import VARIANTI
+from models.suggerimenti import MotoreSuggerimenti
+
+def _esaurisci_stock(gioco: GiocoSolitario, ricicli: int):
+    """Pesca finché sono stati usati `ricicli` ricicli e lo stock è vuoto"""
+    while gioco.ricicli < ricicli or gioco.stock.conteggio_stock():
+        gioco.pesca_dallo_stock()
+
+def _partita(nome: str, seed: int = 4) -> GiocoSolitario:
+    gioco = GiocoSolitario(seed=seed, regole=VARIANTI[nome])
+    gioco.verboso = False
+    return gioco
+
+class TestCacheSuggerimenti(unittest.TestCase):
+    def setUp(self):
+        self.motore = MotoreSuggerimenti(budget=0.01)
+
+    def test_ricicli_esauriti_non_riusano_la_pesca(self):
+        regole = VARIANTI['vegas']
+        con_ricicli, senza_ricicli = _partita('vegas'), _partita('vegas')
+        _esaurisci_stock(con_ricicli, 0)
+        _esaurisci_stock(senza_ricicli, regole.limite_ricicli)
+        self.assertEqual(con_ricicli.chiave_posizione(), senza_ricicli.chiave_posizione())
+        self.assertEqual((con_ricicli.ricicli_residui, senza_ricicli.ricicli_residui), (regole.limite_ricicli, 0))
+
+        self.assertIn(PESCA, [mossa.tipo for mossa, _ in self.motore.classifica(con_ricicli)])
+        legali = set(senza_ricicli.mosse_legali())
+        for mossa, _ in self.motore.classifica(senza_ricicli):
+            self.assertIn(mossa, legali)
+        self.assertNotIn(PESCA, [mossa.tipo for mossa, _ in self.motore.classifica(senza_ricicli)])
+
+    def test_regole_diverse_stessa_distribuzione(self):
+        standard, pesca3 = _partita('standard'), _partita('pesca3')
+        self.assertEqual(standard.chiave_posizione(), pesca3.chiave_posizione())
+        self.motore.classifica(standard)
+        for mossa, _ in self.motore.classifica(pesca3):
+            self.assertIn(mossa, pesca3.mosse_legali())
+        self.assertEqual(len(self.motore._cache), 2)
+
+class TestCacheStimatore(unittest.TestCase):
+    def test_ricicli_esauriti_non_riusano_la_stima(self):
+        regole = VARIANTI['vegas']
+        con_ricicli, senza_ricicli = _partita('vegas'), _partita('vegas')
+        _esaurisci_stock(con_ricicli, 0)
+        _esaurisci_stock(senza_ricicli, regole.limite_ricicli)
+        with StimatoreVittoria(playout=4, processi=1) as stimatore:
+            self.assertIn(PESCA, [mossa.tipo for mossa, _ in stimatore.stima(con_ricicli).mosse])
+            self.assertNotIn(PESCA, [mossa.tipo for mossa, _ in stimatore.stima(senza_ricicli).mosse])
+
+class TestDeterminizzazione(unittest.TestCase):
+    def _dopo_un_riciclo(self, nome: str) -> GiocoSolitario:
+        gioco = _partita(nome)
+        while gioco.ricicli < 1:
+            gioco.pesca_dallo_stock()
+        gioco.pesca_dallo_stock()
+        return gioco
+
+    @staticmethod
+    def _coperte(gioco: GiocoSolitario) -> list[int]:
+        return sorted(carta.codice for pila in gioco.tableau for carta in pila.carte[:pila.inizio_scoperte])
+
+    @staticmethod
+    def _stock(gioco: GiocoSolitario) -> list[int]:
+        return [carta.codice for carta in gioco.stock.stock()]
+
+    def test_stock_rimescolato_resta_nello_stock(self):
+        gioco = self._dopo_un_riciclo('standard')
+        rng = random.Random(0)
+        ordini = set()
+        for _ in range(20):
+            simulata = determinizza(gioco, rng)
+            self.assertEqual(self._coperte(simulata), self._coperte(gioco))
+            self.assertEqual(sorted(self._stock(simulata)), sorted(self._stock(gioco)))
+            ordini.add(tuple(self._stock(simulata)))
+        self.assertGreater(len(ordini), 1)
+
+    def test_stock_che_si_ripete_resta_noto(self):
+        gioco = self._dopo_un_riciclo('pesca3')
+        simulata = determinizza(gioco, random.Random(0))
+        self.assertEqual(self._stock(simulata), self._stock(gioco))
+        self.assertEqual(self._coperte(simulata), self._coperte(gioco))
+
+    def test_prima_del_riciclo_stock_e_coperte_si_mescolano(self):
+        gioco = _partita('standard')
+        rng = random.Random(0)
+        mescolate = any(self._coperte(determinizza(gioco, rng)) != self._coperte(gioco) for _ in range(5))
+        self.assertTrue(mescolate)
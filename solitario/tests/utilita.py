@@ -0,0 +1,42 @@
+import os
+import random
+import tempfile
+import unittest
+from database import db
+from models.gioco import GiocoSolitario
+from models.regole import Regole
+
+class TestConDatabase(unittest.TestCase):
+    """Ogni test usa un database nuovo in una cartella temporanea al posto di data/solitario.db"""
+    def setUp(self):
+        self._cartella = tempfile.TemporaryDirectory()
+        self._originale = db.NOME_DB
+        db.NOME_DB = os.path.join(self._cartella.name, "test.db")
+
+    def tearDown(self):
+        db.NOME_DB = self._originale
+        self._cartella.cleanup()
+
+    def righe(self, query: str, parametri: tuple = ()) -> list[tuple]:
+        with db.connetti() as conn:
+            return conn.execute(query, parametri).fetchall()
+
+def partita_vinta(seed: int = 0, regole: Regole | None = None) -> GiocoSolitario:
+    """Gioca la distribuzione con la politica 'scopri' dei bot fino alla vittoria (seed 0: vincibile)"""
+    from models.politiche import PoliticaScopriPrima, mosse_candidate
+
+    gioco = GiocoSolitario(seed=seed, regole=regole)
+    gioco.verboso = False
+    politica = PoliticaScopriPrima()
+    rng = random.Random(seed)
+    while not gioco.ha_vinto():
+        if gioco.vittoria_certa():
+            gioco.autocompletamento()
+            break
+        candidate = mosse_candidate(gioco)
+        if not candidate:
+            break
+        gioco.applica_mossa(politica.scegli(gioco, candidate, rng))
+    if not gioco.ha_vinto():
+        raise AssertionError(f"La distribuzione {seed} non è stata vinta")
+    return gioco
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from colorama import Fore, Style
+
+# Schermate informative del menu (punteggi migliori, sistema di punteggio, tutorial,
+# statistiche).
+# Non servono per giocare: ui/cli.py le importa alla prima apertura, così non pesano
+# sull'avvio. Ogni funzione riceve l'InterfacciaSolitario che la mostra.
+
+def mostra_punteggi_migliori(interfaccia):
+    """Mostra i punteggi migliori con ASCII art"""
+    interfaccia.pulisci_schermo()
+    print(Fore.YELLOW + r"""
+ _   _ ___ ____ _   _   ____   ____ ___  ____  _____ ____  
+| | | |_ _/ ___| | | | / ___| / ___/ _ \|  _ \| ____/ ___| 
+| |_| || | |  _| |_| | \___ \| |  | | | | |_) |  _| \___ \ 
+|  _  || | |_| |  _  |  ___) | |__| |_| |  _ <| |___ ___) |
+|_| |_|___\____|_| |_| |____/ \____\___/|_| \_\_____|____/ 
+    """ + Style.RESET_ALL)
+
+    punteggi = interfaccia.gestore_utenti.get_punteggi_migliori()
+    if not punteggi:
+        print("\nAncora nessun punteggio migliore!")
+        return
+
+    print(f"\n{'Pos':<5}{'Giocatore':<15}{'Punteggio':<10}{'Tempo':<15}{'Data'}")
+    print("-" * 50)
+    for i, (username, punteggio, durata, data_ottenimento) in enumerate(punteggi, 1):
+        str_tempo = timedelta(seconds=durata)
+        str_data = datetime.strptime(data_ottenimento, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
+        print(f"{i:<5}{Fore.CYAN}{username:<15}{Style.RESET_ALL}{Fore.GREEN}{punteggio:<10}{Style.RESET_ALL}{str_tempo!s:<15}{str_data}")
+
+def mostra_info_punteggio(interfaccia):
+    """Mostra informazioni sul sistema di punteggio"""
+    interfaccia.pulisci_schermo()
+    print(Fore.YELLOW + r"""
+ ____   ____ ___  ____  ___ _   _  ____   ____   ___ ___ _   _ _____ ____  
+/ ___| / ___/ _ \|  _ \|_ _| \ | |/ ___| |  _ \ / _ \_ _| \ | |_   _/ ___| 
+\___ \| |  | | | | |_) || ||  \| | |  _  | |_) | | | | ||  \| | | | \___ \ 
+ ___) | |__| |_| |  _ < | || |\  | |_| | |  __/| |_| | || |\  | | |  ___) |
+|____/ \____\___/|_| \_\___|_| \_|\____| |_|    \___/___|_| \_| |_| |____/ 
+    """ + Style.RESET_ALL)
+
+    print(f"\n{Fore.CYAN}Nuovo Sistema di Punteggio:{Style.RESET_ALL}\n")
+    print(f"{Fore.GREEN}+10 punti{Style.RESET_ALL} - Per ogni carta spostata da scarti a tableau")
+    print(f"{Fore.GREEN}+15 punti{Style.RESET_ALL} - Per ogni carta spostata da scarti a fondazione")
+    print(f"{Fore.GREEN}+5 punti{Style.RESET_ALL}  - Per ogni carta spostata da tableau a fondazione")
+    print(f"{Fore.GREEN}+5 punti{Style.RESET_ALL}  - Per scoprire una carta coperta nel tableau")
+    print(f"{Fore.GREEN}+2 punti{Style.RESET_ALL}  - Per ogni carta pescata dallo stock")
+    print(f"{Fore.GREEN}+100 punti{Style.RESET_ALL} - Bonus per completamento il gioco")
+    print(f"\n{Fore.RED}-15 punti{Style.RESET_ALL} - Per ogni operazione di annullamento")
+    print(f"{Fore.RED}-20 punti{Style.RESET_ALL} - Per riciclare gli scarti nello stock")
+    print(f"{Fore.RED}-5 punti{Style.RESET_ALL} - Per spostare una carta dalla fondazione al tableau")
+
+    print("\n" + Fore.MAGENTA + "Bonus/Penalità Tempo:")
+    print("0-5 minuti: +350 punti")
+    print("5-10 minuti: +250 punti")
+    print("10-15 minuti: +150 punti")
+    print("15-20 minuti: +50 punti")
+    print("20+ minuti: -1 punto ogni 30 secondi oltre i 20 minuti" + Style.RESET_ALL)
+
+    print(f"\n{Fore.CYAN}Varianti Vegas:{Style.RESET_ALL} si parte da -52 punti, +5 per ogni carta in fondazione,")
+    print("-5 per ogni carta riportata nel tableau, nessun bonus finale; l'undo ripristina il punteggio.")
+
+    input("\nPremi Invio per tornare al menu principale...")
+
+def mostra_tutorial(interfaccia):
+    """Mostra un tutorial interattivo passo-passo"""
+    interfaccia.pulisci_schermo()
+    print(Fore.YELLOW + r"""
+ _____ _   _ _____ ___  ____  ___    _    _     
+|_   _| | | |_   _/ _ \|  _ \|_ _|  / \  | |    
+  | | | | | | | || | | | |_) || |  / _ \ | |    
+  | | | |_| | | || |_| |  _ < | | / ___ \| |___ 
+  |_|  \___/  |_| \___/|_| \_\___/_/   \_\_____|
+    """ + Style.RESET_ALL)
+
+    input("\nPremi Invio per iniziare il tutorial...")
+
+    # Passo 1: Introduzione
+    interfaccia.pulisci_schermo()
+    print(f"{Fore.CYAN}=== INTRODUZIONE AL SOLITARIO ==={Style.RESET_ALL}\n")
+    print("Lo scopo del gioco è spostare tutte le carte nelle 4 fondazioni")
+    print("(una per seme) in ordine dall'Asso al Re.\n")
+    input("\nPremi Invio per continuare...")
+
+    # Passo 2: Tableau
+    interfaccia.pulisci_schermo()
+    print(f"{Fore.CYAN}=== IL TABLEAU ==={Style.RESET_ALL}\n")
+    print("Le 7 colonne in basso sono il tableau. Puoi spostare le carte:")
+    print("- Le carte devono essere di colore alternato (rosso/nero)")
+    print("- Devono essere in ordine decrescente (Re, Donna, Jack, 10, ...)\n")
+    print("Esempio: puoi mettere il 9♠ (nero) sul 10♦ (rosso)")
+    input("\nPremi Invio per continuare...")
+
+    # Passo 3: Fondazioni
+    interfaccia.pulisci_schermo()
+    print(f"{Fore.CYAN}=== LE FONDAZIONI ==={Style.RESET_ALL}\n")
+    print("Le fondazioni si costruiscono dall'Asso al Re, tutte dello stesso seme.")
+    print("Esempio: A♥ → 2♥ → 3♥ → ... → K♥")
+    input("\nPremi Invio per continuare...")
+
+    # Passo 4: Stock e Scarti
+    interfaccia.pulisci_schermo()
+    print(f"{Fore.CYAN}=== STOCK E SCARTI ==={Style.RESET_ALL}\n")
+    print("Lo stock contiene le carte coperte rimanenti.")
+    print("Premi 'p' per pescare una carta dallo stock.")
+    print("Le carte pescate vanno negli scarti e possono essere usate.")
+    input("\nPremi Invio per continuare...")
+
+    # Passo 5: Comandi
+    interfaccia.pulisci_schermo()
+    print(f"{Fore.CYAN}=== COMANDI PRINCIPALI ==={Style.RESET_ALL}\n")
+    print("p - Pesca una carta dallo stock")
+    print("m - Muovi carte (es: 'm scarti fondazione_cuori')")
+    print("a - Autocompletamento (quando possibile)")
+    print("h - Suggerisci una mossa")
+    print("v - Stima la probabilità di vittoria")
+    print("u - Annulla ultima mossa")
+    print("r - Ripeti ultima mossa annullata")
+    print("q - Torna al menu principale")
+    input("\nPremi Invio per terminare il tutorial...")
+
+def _stampa_riepiloghi(titolo: str, riepiloghi: list):
+    """Tabella di riepiloghi (giorni, settimane o giocatori)"""
+    print(f"\n{Fore.CYAN}{titolo}{Style.RESET_ALL}")
+    if not riepiloghi:
+        print("Nessuna partita registrata.")
+        return
+    print(f"{'':<12}{'Partite':<10}{'Vittorie':<14}{'Punteggio medio':<18}{'Durata media'}")
+    print("-" * 66)
+    for riepilogo in riepiloghi:
+        vittorie = f"{riepilogo.vittorie} ({riepilogo.percentuale_vittorie:.0f}%)"
+        durata = str(timedelta(seconds=round(riepilogo.durata_media)))
+        print(f"{riepilogo.chiave:<12}{riepilogo.partite:<10}{vittorie:<14}{riepilogo.punteggio_medio:<18.1f}{durata}")
+
+def mostra_statistiche(interfaccia):
+    """Statistiche delle sessioni per giorno, per settimana e del giocatore, lette dai riepiloghi"""
+    from models.statistiche import GestoreStatistiche
+    statistiche = GestoreStatistiche()
+    interfaccia.pulisci_schermo()
+    print(f"{Fore.YELLOW}=== STATISTICHE ==={Style.RESET_ALL}")
+
+    totali = statistiche.totali()
+    _stampa_riepiloghi("Tutte le partite", [totali] if totali else [])
+    if interfaccia.gestore_utenti.e_loggato():
+        utente = statistiche.utente(interfaccia.gestore_utenti.get_utente_corrente()['id'])
+        _stampa_riepiloghi("Le tue partite", [utente] if utente else [])
+    _stampa_riepiloghi("Ultimi giorni", statistiche.giornalieri())
+    _stampa_riepiloghi("Ultime settimane (anno-settimana)", statistiche.settimanali())
+    input("\nPremi Invio per continuare...")